@@ -0,0 +1,188 @@
+"""
+Benchmark polint on synthetic PO catalogs.
+
+Usage: benchmark.py [options]
+       benchmark.py -h | --help
+
+Options:
+  -h, --help            show this help message and exit
+  --entries=COUNTS      numbers of entries in generated catalogs [default: 10000,100000]
+  --plurals=RATIO       ratio of entries with plural forms [default: 0.1]
+  --msgctxt=RATIO       ratio of entries with message context [default: 0.1]
+  --fuzzy=RATIO         ratio of fuzzy entries [default: 0.05]
+  --obsolete=RATIO      ratio of obsolete entries [default: 0.05]
+  --repeat=REPEAT       number of repetitions, the best time is reported [default: 3]
+  --save=FILE           save results as a JSON baseline
+  --compare=FILE        compare results to a JSON baseline
+  --threshold=RATIO     report slowdowns larger than the ratio as regressions [default: 1.1]
+"""
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+import polib
+from docopt import docopt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import polint  # noqa: E402
+
+HEADER = '''msgid ""
+msgstr ""
+"Project-Id-Version: polint-benchmark\\n"
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Plural-Forms: nplurals=3; plural=n==1 ? 0 : n>1 && n<5 ? 1 : 2;\\n"
+'''
+
+
+def generate_catalog(pofile, entries, plurals=0.1, msgctxt=0.1, fuzzy=0.05, obsolete=0.05, seed=42):
+    """Write a synthetic PO catalog.
+
+    Entries are sorted, so `unsorted` errors are rare as in maintained catalogs.
+
+    @param pofile: File object to write to
+    @param entries: Number of entries
+    @param plurals: Ratio of entries with plural forms
+    @param msgctxt: Ratio of entries with message context
+    @param fuzzy: Ratio of fuzzy entries
+    @param obsolete: Ratio of obsolete entries
+    @param seed: Seed of the random generator
+    """
+    rand = random.Random(seed)
+    pofile.write(HEADER)
+    width = len(str(entries))
+    for index in range(entries):
+        msgid = 'Message %0*d with some text' % (width, index)
+        lines = ['']
+        if rand.random() < obsolete:
+            lines.extend(('#~ msgid "%s"' % msgid, '#~ msgstr "Zpráva %d"' % index))
+            pofile.write('\n'.join(lines) + '\n')
+            continue
+        lines.append('#: src/module_%d.py:%d' % (index % 100, index))
+        if rand.random() < fuzzy:
+            lines.append('#, fuzzy, python-format')
+        if rand.random() < msgctxt:
+            lines.append('msgctxt "context"')
+        lines.append('msgid "%s"' % msgid)
+        if rand.random() < plurals:
+            lines.append('msgid_plural "%ss"' % msgid)
+            lines.extend('msgstr[%d] "Zpráva %d/%d"' % (i, index, i) for i in range(3))
+        else:
+            lines.append('msgstr "Zpráva %d"' % index)
+        pofile.write('\n'.join(lines) + '\n')
+
+
+def _best_time(function, repeat):
+    """Return the best time of the function."""
+    times = []
+    for dummy in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure_memory(filename):
+    """Validate the catalog and return the peak RSS in kilobytes.
+
+    It's expected to run in a fresh process, so the peak RSS reflects only the validation.
+    """
+    polint.Linter(filename).run_validators()
+    # Linux reports the peak RSS in kilobytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_scenario(filename, entries, repeat):
+    """Benchmark polint on the catalog and return results."""
+    results = {'entries': entries}
+    results['polib_parse'] = _best_time(lambda: polib.pofile(filename), repeat)
+    results['stream_parse'] = _best_time(lambda: list(polint.EntryStream(filename)), repeat)
+    results['run_validators'] = _best_time(lambda: polint.Linter(filename).run_validators(), repeat)
+
+    parsed = list(polint.EntryStream(filename))
+    validators = {}
+    for code, callback in polint.REGISTER.validators.items():
+        # Cross-file validators are called with indexes of files, not entries.
+        if polint.REGISTER.is_cross_file(code):
+            continue
+        batch = polint.REGISTER.is_batch(code)
+        validators[code] = _best_time(lambda: polint.apply_validator(callback, parsed, batch=batch), repeat)
+    results['validators'] = validators
+    results['entries_per_sec'] = entries / results['run_validators']
+    return results
+
+
+def _compare(results, baseline, threshold, output):
+    """Compare results with the baseline and return whether there is a regression."""
+    regression = False
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        timings = [(name, result[name], base.get(name)) for name in ('polib_parse', 'stream_parse', 'run_validators')]
+        timings.extend(('validator %s' % code, value, base.get('validators', {}).get(code))
+                       for code, value in result['validators'].items())
+        metrics = [(name, value, base_value, '%.3fs') for name, value, base_value in timings]
+        metrics.append(('peak RSS', result['peak_rss_kb'], base.get('peak_rss_kb'), '%d kB'))
+        for name, value, base_value, value_format in metrics:
+            if not base_value:
+                continue
+            ratio = value / base_value
+            marker = ''
+            if ratio > threshold:
+                regression = True
+                marker = ' REGRESSION'
+            values = (value_format + ' vs ' + value_format) % (value, base_value)
+            output.write('%s entries, %s: %s (%.2fx)%s\n' % (key, name, values, ratio, marker))
+    return regression
+
+
+def _format(result):
+    """Return human readable representation of the result."""
+    lines = ['%(entries)d entries: %(entries_per_sec).0f entries/s, peak RSS %(peak_rss_kb)d kB' % result,
+             '  polib parse:    %(polib_parse).3fs' % result,
+             '  stream parse:   %(stream_parse).3fs' % result,
+             '  run_validators: %(run_validators).3fs' % result]
+    lines.extend('  validator %s: %.3fs' % item for item in result['validators'].items())
+    return '\n'.join(lines) + '\n'
+
+
+def main(args=None, output=sys.stdout):
+    """Run the benchmark."""
+    options = docopt(__doc__, args)
+    ratios = {name: float(options['--' + name]) for name in ('plurals', 'msgctxt', 'fuzzy', 'obsolete')}
+    repeat = int(options['--repeat'])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for entries in (int(c) for c in options['--entries'].split(',')):
+            filename = os.path.join(directory, 'catalog-%d.po' % entries)
+            with open(filename, 'w', encoding='utf-8') as pofile:
+                generate_catalog(pofile, entries, **ratios)
+            # Measure peak memory of the validation in a fresh process, before anything else is parsed there.
+            with get_context('spawn').Pool(1) as pool:
+                peak_rss_kb = pool.apply(measure_memory, (filename, ))
+            with get_context('spawn').Pool(1) as pool:
+                result = pool.apply(run_scenario, (filename, entries, repeat))
+            result['peak_rss_kb'] = peak_rss_kb
+            output.write(_format(result))
+            results[str(entries)] = result
+
+    if options['--save']:
+        with open(options['--save'], 'w') as baseline_file:
+            json.dump({'version': polint.__version__, 'options': ratios, 'results': results}, baseline_file,
+                      indent=2)
+    if options['--compare']:
+        with open(options['--compare']) as baseline_file:
+            baseline = json.load(baseline_file)
+        if _compare(results, baseline['results'], float(options['--threshold']), output):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,31 +2,71 @@
 Validate gettext PO files.
 
 Usage: polint.py [options] <path>...
+       polint.py --watch [options] <path>...
+       polint.py --serve [options]
        polint.py -h | --help
        polint.py --version
 
 Positional arguments:
-  path                  PO file or directory to be linted
+  path                  PO or MO file or directory to be linted
 
 Options:
   -h, --help            show this help message and exit
   --version             show program's version number and exit
   --show-msg            print the message for each error
   -i, --ignore=IGNORE   skip errors (e.g. untranslated,location)
+  --fail-fast           stop linting after the first file with errors
+  --max-errors=N        stop linting once N errors are found
+  --baseline=FILE       report only errors which aren't recorded in FILE, it's created with current errors if missing
+  -j, --jobs=JOBS       number of files linted in parallel, 0 for number of CPUs [default: 1]
+  --split-size=SIZE     split files larger than SIZE MB into parts linted in parallel, 0 to disable [default: 64]
+  --collation=COLLATION
+                        collation of the unsorted check, one of codepoint, casefold or locale [default: codepoint]
+  --sort-moves          report entries which have to be moved to sort the file instead of entries out of order
+  --fix                 rewrite files to fix unsorted, location and obsolete errors and report the remaining ones
+  --cross-file          check duplicate, missing and inconsistent entries across the linted files
+  --cache-dir=DIR       cache results in a directory and skip unchanged files
+  --cache-size=SIZE     maximal size of the cache in MB [default: 100]
+  --no-cache            don't use the cache even if --cache-dir is set
+  --changed-since=REF   lint only files changed since git REF or untracked
+  --include=PATTERNS    search directories for files matching patterns (e.g. *.po,*.mo) [default: *.po]
+  --exclude-dir=PATTERNS
+                        don't search directories matching patterns (e.g. node_modules,build)
+  --gitignore           don't search files ignored by .gitignore files in searched directories
+  --profile=FORMAT      print timing of validators to standard error in table or json format
+  -f, --format=FORMAT   output format, one of text, jsonl or sarif [default: text]
+  --serve               run a daemon which lints files for clients
+  --daemon              lint files by a running daemon, lint them directly if there's none
+  --socket=PATH         path to the socket of the daemon
+  --watch               lint files again whenever they change and print new errors
+  --interval=SECONDS    interval between checks for changes in watch mode [default: 1]
 """
+import codecs
 import fnmatch
+import heapq
+import operator
 import os
+import re
+import struct
 import sys
-from collections import OrderedDict
-
-import polib
-from docopt import docopt
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
+from functools import partial
+from io import StringIO
+from itertools import chain, count, groupby, islice
 
 __version__ = '0.5'
 
 
 ################################################################################
 # Validators register
+# Fields of entries which validators may declare
+PO_FIELDS = ('msgid', 'msgstr', 'msgid_plural', 'msgstr_plural', 'msgctxt', 'previous_msgid', 'previous_msgid_plural',
+             'previous_msgctxt', 'tcomment', 'comment', 'occurrences', 'flags')
+
+
 class ValidatorRegister(object):
     """Validators register."""
 
@@ -36,6 +76,12 @@ class ValidatorRegister(object):
         self._errors = OrderedDict()
         # Dictionary of (code, callback) pairs
         self._validators = OrderedDict()
+        # Set of codes of batch validators
+        self._batch = set()
+        # Set of codes of cross-file validators
+        self._cross_file = set()
+        # Dictionary of (code, fields) pairs, fields are `None` if not declared
+        self._fields = {}
 
     @property
     def errors(self):
@@ -47,7 +93,7 @@ class ValidatorRegister(object):
         """Return dictionary of (error_code, callback) pairs."""
         return self._validators.copy()
 
-    def register(self, callback, error_code, error_description):
+    def register(self, callback, error_code, error_description, fields=None):
         """Register validator.
 
         @param callback: Function which performs validation.
@@ -56,174 +102,4019 @@ class ValidatorRegister(object):
         @type error_code: text
         @param error_description: Error description which will be reported if validation fails.
         @type error_description: text
-        @raises ValueError: If `error_code` is already registered.
+        @param fields: Names of entry fields read by the validator, see `PO_FIELDS`. If not declared, validator may read
+            any field. Line number and `obsolete` are always available.
+        @type fields: Iterable of strings
+        @raises ValueError: If `error_code` is already registered or a field is unknown.
         """
         if error_code in self._validators:
             raise ValueError('Validator for %s is already registered.' % error_code)
+        if fields is not None:
+            fields = frozenset(fields)
+            if not fields.issubset(PO_FIELDS):
+                raise ValueError('Unknown fields %s.' % ', '.join(sorted(fields.difference(PO_FIELDS))))
         self._errors[error_code] = error_description
         self._validators[error_code] = callback
+        self._fields[error_code] = fields
+
+    def register_batch(self, callback, error_code, error_description, fields=None):
+        """Register batch validator.
+
+        Batch validator is called with a list of entries and the entry which precedes them, or `None` for the first
+        batch of the file. It returns indices of the entries which failed the validation.
+
+        @param callback: Function which performs validation.
+        @type callback: function
+        @param error_code: Error code which will be reported if validation fails.
+        @type error_code: text
+        @param error_description: Error description which will be reported if validation fails.
+        @type error_description: text
+        @param fields: Names of entry fields read by the validator, see `register`.
+        @type fields: Iterable of strings
+        @raises ValueError: If `error_code` is already registered or a field is unknown.
+        """
+        self.register(callback, error_code, error_description, fields=fields)
+        self._batch.add(error_code)
+
+    def register_cross_file(self, callback, error_code, error_description):
+        """Register cross-file validator.
+
+        Cross-file validator is called once all files are linted with a list of their `FileIndex`es. It returns
+        iterable of (filename, line) pairs of the entries which failed the validation. Errors of entries which aren't
+        in the file are returned as (filename, 0, message, fingerprint) tuples, where the message describes the entry
+        and the fingerprint is its hash, see `entry_key`.
+
+        @param callback: Function which performs validation.
+        @type callback: function
+        @param error_code: Error code which will be reported if validation fails.
+        @type error_code: text
+        @param error_description: Error description which will be reported if validation fails.
+        @type error_description: text
+        @raises ValueError: If `error_code` is already registered.
+        """
+        self.register(callback, error_code, error_description, fields=())
+        self._cross_file.add(error_code)
+
+    def replace(self, callback, error_code):
+        """Replace callback of the registered validator, its description and other properties are kept.
+
+        @param callback: Function which performs validation.
+        @type callback: function
+        @param error_code: Error code of the validator
+        @type error_code: text
+        @raises KeyError: If `error_code` is not registered.
+        """
+        if error_code not in self._validators:
+            raise KeyError(error_code)
+        self._validators[error_code] = callback
+
+    def copy(self):
+        """Return a copy of the register."""
+        register = type(self)()
+        register._errors = self._errors.copy()
+        register._validators = self._validators.copy()
+        register._batch = self._batch.copy()
+        register._cross_file = self._cross_file.copy()
+        register._fields = self._fields.copy()
+        return register
+
+    def is_batch(self, error_code):
+        """Return whether validator for the error code is a batch validator."""
+        return error_code in self._batch
+
+    def is_cross_file(self, error_code):
+        """Return whether validator for the error code is a cross-file validator."""
+        return error_code in self._cross_file
+
+    def get_fields(self, error_codes):
+        """Return set of entry fields read by validators for the error codes.
+
+        @param error_codes: Codes of the validators
+        @type error_codes: Iterable of strings
+        @return: Set of fields or `None` if any of the validators may read any field.
+        """
+        fields = set()
+        for code in error_codes:
+            if self._fields[code] is None:
+                return None
+            fields.update(self._fields[code])
+        return fields
 
 
 REGISTER = ValidatorRegister()
 
+# Entry point group of third-party validators
+PLUGIN_GROUP = 'polint.validators'
 
-################################################################################
-# Linter
-class Status(object):
-    """Linting process status.
 
-    @ivar entry: Currently processed entry.
-    @ivar previous: Previously processed entry.
+def _may_have_entry_points(group):
+    """Return whether any distribution on `sys.path` may declare entry points in the group.
+
+    Metadata of distributions is searched directly, since `importlib.metadata` takes long to import. Paths which can't
+    be searched, e.g. zip files, are assumed to declare the entry points. Metadata of `.egg` directories on the path is
+    in their `EGG-INFO` directory.
     """
+    header = ('[%s]' % group).encode()
+    for path in sys.path:
+        try:
+            entries = os.scandir(path or os.curdir)
+        except NotADirectoryError:
+            return True
+        except OSError:
+            continue
+        is_egg = path.endswith('.egg')
+        with entries:
+            for entry in entries:
+                if not (entry.name.endswith(('.dist-info', '.egg-info')) or (is_egg and entry.name == 'EGG-INFO')):
+                    continue
+                try:
+                    with open(os.path.join(entry.path, 'entry_points.txt'), 'rb') as entry_points:
+                        if header in entry_points.read():
+                            return True
+                except OSError:
+                    continue
+    return False
 
-    def __init__(self):
-        """Initialize the register. Take no parameters."""
-        self.entry = None
-        self.previous = None
 
-    def step(self, entry):
-        """Move to the next entry.
+def get_plugins(group=PLUGIN_GROUP):
+    """Return entry points of third-party validators.
 
-        @param entry: The next entry.
-        """
-        self.previous = self.entry
-        self.entry = entry
+    @param group: Entry point group
+    @type group: text
+    @rtype: [importlib.metadata.EntryPoint, ...]
+    """
+    if not _may_have_entry_points(group):
+        return []
+    from importlib import metadata
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return list(entry_points.select(group=group))
+    # Python < 3.10
+    return list(entry_points.get(group, ()))
 
 
-class Linter(object):
-    """Linter performs the actual validation of the PO files.
+def load_plugins(register=REGISTER, exclude=None, group=PLUGIN_GROUP):
+    """Return register with third-party validators from entry points.
 
-    If opens the pofile and runs all registered validators on each entry.
+    Name of the entry point is the error code of the validator. The entry point refers to a function which is called
+    with the register and registers the validator for the code. Only plugins with codes which are neither excluded nor
+    registered yet are loaded.
 
-    @ivar errors: Dictionary of (entry, errors) pairs found in validation
-    @type errors: {POEntry: [text, text, ...], ...}
+    @param register: Validator register to be extended
+    @type register: ValidatorRegister
+    @param exclude: Set of validators to exclude
+    @type exclude: Set of strings
+    @param group: Entry point group
+    @type group: text
+    @return: Copy of the register with loaded validators or the register itself if no plugin is loaded.
+    @raises ValueError: If the plugin doesn't register the validator for its code.
     """
+    original = register
+    for entry_point in get_plugins(group):
+        code = entry_point.name
+        if code in (exclude or ()) or code in register.validators:
+            continue
+        if register is original:
+            register = register.copy()
+        entry_point.load()(register)
+        if code not in register.validators:
+            raise ValueError('Plugin %s did not register validator for %s.' % (entry_point.value, code))
+    return register
 
-    def __init__(self, pofile, exclude=None, register=REGISTER):
-        """Initialize Linter.
 
-        @param pofile: Filename or a file to be validated
-        @type pofile: text or file
-        @param exclude: Set of validators to exclude
-        @type exclude: Set of strings
-        @param register: Validator register to be used
-        @type register: ValidatorRegister
+################################################################################
+# Parser
+def _is_file(pofile):
+    """Return whether `pofile` is a name of an existing file, rather than a content of the file."""
+    try:
+        return os.path.isfile(pofile)
+    except (TypeError, ValueError):
+        return False
+
+
+class EntryStream(object):
+    """Stream of entries in a PO file.
+
+    Unlike `polib.pofile`, entries are parsed lazily and yielded one at a time, so the whole file is never kept in
+    memory. Parsing mimics `polib._POFileParser`, the header entry is not yielded, but it's available in
+    the `header` attribute once the stream gets past it.
+
+    @ivar header: Header entry of the file, if found.
+    @ivar header_comment: Comment which precedes the header entry.
+    """
+
+    keywords = {'msgctxt': 'ct', 'msgid': 'mi', 'msgstr': 'ms', 'msgid_plural': 'mp'}
+    previous_keywords = {'msgid_plural': 'pp', 'msgid': 'pm', 'msgctxt': 'pc'}
+    comments = {'#:': 'oc', '#,': 'fl', '#.': 'gc'}
+    # Dictionary of symbol: (states, next_state)
+    transitions = {
+        'tc': ((('st', 'he'), 'he'), (('gc', 'oc', 'fl', 'tc', 'pc', 'pm', 'pp', 'ms', 'mp', 'mx', 'mi'), 'tc')),
+        'gc': ((None, 'gc'), ),
+        'oc': ((None, 'oc'), ),
+        'fl': ((None, 'fl'), ),
+        'pc': ((None, 'pc'), ),
+        'pm': ((None, 'pm'), ),
+        'pp': ((None, 'pp'), ),
+        'ct': ((('st', 'he', 'gc', 'oc', 'fl', 'tc', 'pc', 'pm', 'pp', 'ms', 'mx'), 'ct'), ),
+        'mi': ((('st', 'he', 'gc', 'oc', 'fl', 'ct', 'tc', 'pc', 'pm', 'pp', 'ms', 'mx'), 'mi'), ),
+        'mp': ((('tc', 'gc', 'pc', 'pm', 'pp', 'mi'), 'mp'), ),
+        'ms': ((('mi', 'mp', 'tc'), 'ms'), ),
+        'mx': ((('mi', 'mx', 'mp', 'tc'), 'mx'), ),
+        'mc': ((('ct', 'mi', 'mp', 'ms', 'mx', 'pm', 'pp', 'pc'), 'mc'), ),
+    }
+    # Symbols which start a new entry if found after a message string.
+    entry_starts = ('tc', 'gc', 'oc', 'fl', 'pp', 'pm', 'pc', 'ct', 'mi')
+
+    def __init__(self, pofile, encoding=None, start=0, end=None, first_line=1):
+        """Initialize the stream.
+
+        Only a part of the file may be parsed, if `start` or `end` are set. The part has to start at the beginning of
+        an entry, the header is not searched for in the parts other than the first one.
+
+        @param pofile: Filename or a content of the file
+        @type pofile: text
+        @param encoding: Encoding of the file, detected from the header by default.
+        @type encoding: text
+        @param start: Offset of the part in bytes
+        @type start: int
+        @param end: Offset of the end of the part in bytes, end of the file by default.
+        @type end: int
+        @param first_line: Number of the line at the `start` offset
+        @type first_line: int
         """
         self.pofile = pofile
-        self.register = register
-        self.exclude = exclude or set()
-        self.errors = OrderedDict()
+        self.encoding = encoding
+        self.start = start
+        self.end = end
+        self.first_line = first_line
+        self.header = None
+        self.header_comment = ''
 
-    def run_validators(self):
-        """Run the checks."""
-        validators = tuple((code, v) for code, v in self.register.validators.items() if code not in self.exclude)
-        status = Status()
-        for entry in polib.pofile(self.pofile):
-            status.step(entry)
-            for code, callback in validators:
-                if not callback(status):
-                    entry_errors = self.errors.setdefault(status.entry, [])
-                    entry_errors.append(code)
+    def __iter__(self):
+        """Parse the file and yield its entries."""
+        import polib
+        self._unescape = polib.unescape
+        encoding = self.encoding or polib.detect_encoding(self.pofile)
+        if self.start or self.end is not None:
+            yield from self._parse(self._read_part(encoding))
+        elif _is_file(self.pofile):
+            try:
+                handle = open(self.pofile, encoding=encoding)
+            except LookupError:
+                handle = open(self.pofile, encoding=polib.default_encoding)
+            with handle:
+                yield from self._parse(handle)
+        else:
+            yield from self._parse(self.pofile.splitlines())
 
+    def _read_part(self, encoding):
+        """Yield lines of the file between the `start` and `end` offsets."""
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            import polib
+            encoding = polib.default_encoding
+        with open(self.pofile, 'rb') as handle:
+            handle.seek(self.start)
+            position = self.start
+            for line in handle:
+                if self.end is not None and position >= self.end:
+                    break
+                position += len(line)
+                yield line.decode(encoding)
 
-################################################################################
-# Validators
-#
-# All validators has to expect POEntry as their first argument and return whether the validation passed.
-def fuzzy_validator(status):
-    """Check if current entry is fuzzy."""
-    return 'fuzzy' not in status.entry.flags
+    def _parse(self, lines):
+        """Parse the lines and yield entries.
 
+        @param lines: Iterable of lines
+        """
+        self._state = 'st'
+        self._entry = self._new_entry(self.first_line if self.start else 0)
+        self._done = None
+        self._msgstr_index = 0
+        self._obsolete = False
+        self._line_number = self.first_line - 1
+        last_token = None
+        for line in lines:
+            self._line_number += 1
+            if self._line_number == 1 and line.startswith(codecs.BOM_UTF8.decode('utf-8')):
+                line = line[1:]
+            line = line.strip()
+            if not line:
+                continue
+            last_token = self._process_line(line)
+            if self._done is not None:
+                yield from self._finish(self._done)
+                self._done = None
+        if last_token is not None and not last_token.startswith('#'):
+            # The last entry is completed by the end of the file. Trailing comments are ignored.
+            yield from self._finish(self._entry)
 
-REGISTER.register(fuzzy_validator, 'fuzzy', 'translation is fuzzy')
+    def _new_entry(self, linenum):
+        """Return a new empty entry."""
+        import polib
+        return polib.POEntry(linenum=linenum)
 
+    def _finish(self, entry):
+        """Yield the completed entry, unless it's the header."""
+        if (self.header is None and not self.start and not entry.obsolete and entry.msgctxt is None
+                and entry.msgid == ''):
+            self.header = entry
+        else:
+            yield entry
 
-def obsolete_validator(status):
-    """Check if current entry is obsolete."""
-    return not status.entry.obsolete
+    def _syntax_error(self, detail=''):
+        """Return syntax error for the current line."""
+        fpath = '%s ' % self.pofile if _is_file(self.pofile) else ''
+        return IOError('Syntax error in po file %s(line %s)%s' % (fpath, self._line_number, detail))
 
+    def _check_quotes(self, token):
+        """Check the quoted string doesn't contain unescaped quotes."""
+        if re.search(r'([^\\]|^)"', token[1:-1]):
+            raise self._syntax_error(': unescaped double quote found')
 
-REGISTER.register(obsolete_validator, 'obsolete', 'entry is obsolete')
+    def _process_line(self, line):
+        """Process a single non-empty line and return its first token."""
+        tokens = line.split(None, 2)
+        if tokens[0] == '#~|':
+            return tokens[0]
+        if tokens[0] == '#~' and len(tokens) > 1:
+            line = line[3:].strip()
+            tokens = tokens[1:]
+            self._obsolete = True
+        else:
+            self._obsolete = False
 
+        if tokens[0] in self.keywords and len(tokens) > 1:
+            token = line[len(tokens[0]):].lstrip()
+            self._check_quotes(token)
+            self._process(self.keywords[tokens[0]], token)
+        elif line[:1] == '"':
+            self._check_quotes(line)
+            self._process('mc', line)
+        elif line[:7] == 'msgstr[':
+            self._process('mx', line)
+        elif tokens[0] == '#|':
+            self._process_previous(line, tokens)
+        elif tokens[0] in self.comments:
+            if len(tokens) > 1:
+                self._process(self.comments[tokens[0]], line)
+        elif tokens[0] == '#' or tokens[0].startswith('##'):
+            self._process('tc', line)
+        else:
+            raise self._syntax_error()
+        return tokens[0]
 
-def untranslated_validator(status):
-    """Check if current entry is translated."""
-    return status.entry.translated()
+    def _process_previous(self, line, tokens):
+        """Process the previous translation comment."""
+        if len(tokens) <= 1:
+            raise self._syntax_error()
+        line = line[2:].lstrip()
+        if tokens[1].startswith('"'):
+            self._process('mc', line)
+        elif len(tokens) == 2:
+            raise self._syntax_error(': invalid continuation line')
+        elif tokens[1] not in self.previous_keywords:
+            raise self._syntax_error(': unknown keyword %s' % tokens[1])
+        else:
+            self._process(self.previous_keywords[tokens[1]], line[len(tokens[1]):].lstrip())
 
+    def _process(self, symbol, token):
+        """Perform the transition of the state machine."""
+        for states, next_state in self.transitions[symbol]:
+            if states is None or self._state in states:
+                break
+        else:
+            raise self._syntax_error()
+        if symbol in self.entry_starts and self._state in ('ms', 'mx'):
+            self._done = self._entry
+            self._entry = self._new_entry(self._line_number)
+        try:
+            change_state = getattr(self, '_handle_%s' % next_state)(token)
+        except Exception as error:
+            raise self._syntax_error() from error
+        if change_state:
+            self._state = next_state
 
-REGISTER.register(untranslated_validator, 'untranslated', 'translation is missing')
+    def _handle_he(self, token):
+        """Handle a header comment."""
+        self._add_header_comment(token)
+        return True
 
+    def _add_header_comment(self, token):
+        """Add line of the header comment."""
+        if self.header_comment != '':
+            self.header_comment += '\n'
+        self.header_comment += token[2:]
 
-def no_location_validator(status):
-    """Check if current entry has no location data."""
-    return not status.entry.occurrences
+    def _handle_tc(self, token):
+        """Handle a translator comment."""
+        if self._entry.tcomment != '':
+            self._entry.tcomment += '\n'
+        tcomment = token.lstrip('#')
+        if tcomment.startswith(' '):
+            tcomment = tcomment[1:]
+        self._entry.tcomment += tcomment
+        return True
 
+    def _handle_gc(self, token):
+        """Handle a generated comment."""
+        if self._entry.comment != '':
+            self._entry.comment += '\n'
+        self._entry.comment += token[3:]
+        return True
 
-REGISTER.register(no_location_validator, 'location', 'entry contains location')
+    def _handle_oc(self, token):
+        """Handle a file:num occurrence."""
+        for occurrence in token[3:].split():
+            fil, sep, line = occurrence.rpartition(':')
+            if sep and line.isdigit():
+                self._entry.occurrences.append((fil, line))
+            else:
+                self._entry.occurrences.append((occurrence, ''))
+        return True
 
+    def _handle_fl(self, token):
+        """Handle a flags line."""
+        self._entry.flags += [c.strip() for c in token[3:].split(',')]
+        return True
 
-def sort_validator(status):
-    """Check if the entry is properly sorted."""
-    if status.previous is None:
-        # First entry is always correctly sorted.
+    def _handle_pp(self, token):
+        """Handle a previous msgid_plural line."""
+        self._entry.previous_msgid_plural = self._unescape(token[1:-1])
         return True
-    if status.previous.msgid == status.entry.msgid:
-        previous_msgctx = status.previous.msgctxt or ''
-        entry_msgctxt = status.entry.msgctxt or ''
-        return previous_msgctx < entry_msgctxt
-    else:
-        return status.previous.msgid < status.entry.msgid
 
+    def _handle_pm(self, token):
+        """Handle a previous msgid line."""
+        self._entry.previous_msgid = self._unescape(token[1:-1])
+        return True
+
+    def _handle_pc(self, token):
+        """Handle a previous msgctxt line."""
+        self._entry.previous_msgctxt = self._unescape(token[1:-1])
+        return True
+
+    def _handle_ct(self, token):
+        """Handle a msgctxt."""
+        self._entry.msgctxt = self._unescape(token[1:-1])
+        return True
+
+    def _handle_mi(self, token):
+        """Handle a msgid."""
+        self._entry.obsolete = self._obsolete
+        self._entry.msgid = self._unescape(token[1:-1])
+        return True
+
+    def _handle_mp(self, token):
+        """Handle a msgid plural."""
+        self._entry.msgid_plural = self._unescape(token[1:-1])
+        return True
+
+    def _handle_ms(self, token):
+        """Handle a msgstr."""
+        self._entry.msgstr = self._unescape(token[1:-1])
+        return True
+
+    def _handle_mx(self, token):
+        """Handle a msgstr plural."""
+        index = int(token[7])
+        self._entry.msgstr_plural[index] = self._unescape(token[token.find('"') + 1:-1])
+        self._msgstr_index = index
+        return True
+
+    # Dictionary of (state, attribute) pairs for continuation lines
+    continued = {'ct': 'msgctxt', 'mi': 'msgid', 'mp': 'msgid_plural', 'ms': 'msgstr', 'pp': 'previous_msgid_plural',
+                 'pm': 'previous_msgid', 'pc': 'previous_msgctxt'}
+
+    def _handle_mc(self, token):
+        """Handle a continuation line."""
+        token = self._unescape(token[1:-1])
+        if self._state == 'mx':
+            self._entry.msgstr_plural[self._msgstr_index] += token
+        elif self._state in self.continued:
+            attr = self.continued[self._state]
+            setattr(self._entry, attr, getattr(self._entry, attr) + token)
+        # Continuation doesn't change the state.
+        return False
+
+
+# Same as in `polib.detect_encoding`
+_CHARSET = re.compile(rb'"?Content-Type:.+? charset=([\w_\-:\.]+)')
 
-REGISTER.register(sort_validator, 'unsorted', 'entry is not sorted')
+
+def detect_encoding(buffer):
+    """Return encoding of the PO file detected from the header the same way as `polib.detect_encoding` does.
+
+    @param buffer: Content of the file
+    @type buffer: bytes or mmap.mmap
+    """
+    for match in _CHARSET.finditer(buffer):
+        encoding = match.group(1).strip().decode('utf-8')
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            continue
+        return encoding
+    import polib
+    return polib.default_encoding
+
+
+def _map_file(filename):
+    """Return read-only memory map of the file or `None` if the file is empty."""
+    import mmap
+    with open(filename, 'rb') as handle:
+        try:
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file can't be mapped.
+            return None
+
+
+def _is_ascii_compatible(encoding):
+    """Return whether ASCII characters are encoded as single bytes which never appear in other characters."""
+    if codecs.lookup(encoding).name == 'utf-8':
+        return True
+    try:
+        # Only single byte encodings decode every byte to a single character.
+        return (bytes(range(128)).decode(encoding) == ''.join(map(chr, range(128)))
+                and len(bytes(range(256)).decode(encoding, 'replace')) == 256)
+    except (LookupError, ValueError):
+        return False
+
+
+def _unescape_quoted(text):
+    """Return unescaped content of the quoted string."""
+    text = text[1:-1]
+    if '\\' not in text:
+        return text
+    import polib
+    return polib.unescape(text)
+
+
+def _decode_tcomment(text):
+    """Return translator comment from the comment line."""
+    tcomment = text.lstrip('#')
+    return tcomment[1:] if tcomment.startswith(' ') else tcomment
+
+
+def _decode_occurrences(text):
+    """Return list of (file, line) pairs from the occurrences line."""
+    occurrences = []
+    for occurrence in text[3:].split():
+        fil, sep, line = occurrence.rpartition(':')
+        if sep and line.isdigit():
+            occurrences.append((fil, line))
+        else:
+            occurrences.append((occurrence, ''))
+    return occurrences
+
+
+def _compile_transitions(transitions):
+    """Return dictionary of ((symbol, state), next_state) pairs from transitions of `EntryStream`."""
+    states = {'st'}
+    for rules in transitions.values():
+        for rule_states, next_state in rules:
+            states.update(rule_states or ())
+            states.add(next_state)
+    table = {}
+    for symbol, rules in transitions.items():
+        for state in states:
+            for rule_states, next_state in rules:
+                if rule_states is None or state in rule_states:
+                    table[symbol, state] = next_state
+                    break
+    return table
+
+
+class _LazyField(object):
+    """Field of `MappedEntry` which is decoded on the first access and stored in the entry."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, entry, owner=None):
+        if entry is None:
+            return self
+        if entry._parsed is not None and self.name not in entry._parsed:
+            raise AttributeError('Field %s of the entry was not parsed' % self.name)
+        try:
+            value = entry._decode_field(self.name)
+        except AttributeError as error:
+            # Otherwise it would be taken for a missing field.
+            raise RuntimeError('Field %s of the entry failed to decode' % self.name) from error
+        entry.__dict__[self.name] = value
+        return value
+
+
+class MappedEntry(object):
+    """Entry of a memory-mapped PO file.
+
+    Entry keeps only offsets of its lines in the buffer, fields are decoded once they're accessed and stored as
+    attributes of the entry. Other attributes are looked up in an equivalent `polib.POEntry`. If only some fields were
+    parsed, access to the other fields fails.
+
+    @ivar linenum: Line number of the entry
+    @ivar obsolete: Whether the entry is obsolete
+    """
+
+    # Dictionary of (field, (decoder, join, default)) pairs, `join` joins decoded lines or `None` to extend a list.
+    decoders = {
+        'msgid': (_unescape_quoted, '', ''),
+        'msgstr': (_unescape_quoted, '', ''),
+        'msgid_plural': (_unescape_quoted, '', ''),
+        'msgctxt': (_unescape_quoted, '', None),
+        'previous_msgid': (_unescape_quoted, '', None),
+        'previous_msgid_plural': (_unescape_quoted, '', None),
+        'previous_msgctxt': (_unescape_quoted, '', None),
+        'tcomment': (_decode_tcomment, '\n', ''),
+        'comment': (lambda text: text[3:], '\n', ''),
+        'occurrences': (_decode_occurrences, None, ()),
+        'flags': (lambda text: [c.strip() for c in text[3:].split(',')], None, ()),
+    }
+
+    def __init__(self, buffer, encoding, linenum, parsed=None):
+        """Initialize the entry.
+
+        @param buffer: Content of the file
+        @type buffer: mmap.mmap
+        @param encoding: Encoding of the file
+        @param linenum: Line number of the entry
+        @param parsed: Set of parsed fields, all fields by default.
+        @type parsed: frozenset
+        """
+        self.linenum = linenum
+        self.obsolete = False
+        self._buffer = buffer
+        self._encoding = encoding
+        self._parsed = parsed
+        # Dictionary of (field, [(start, end), ...]) pairs, plural translations are stored as 'msgstr[N]' fields.
+        self._spans = {}
+        self._entry = None
+
+    def add(self, field, start, end):
+        """Add a line of the field.
+
+        @param field: Name of the field
+        @param start: Offset of the line in the buffer
+        @param end: Offset of the end of the line in the buffer
+        """
+        spans = self._spans.get(field)
+        if spans is None:
+            self._spans[field] = [(start, end)]
+        else:
+            spans.append((start, end))
+
+    def _decode(self, field):
+        """Return list of decoded lines of the field."""
+        return [self._buffer[start:end].decode(self._encoding) for start, end in self._spans.get(field, ())]
+
+    def _decode_field(self, name):
+        """Return decoded value of the field."""
+        if name == 'msgstr_plural':
+            return {int(field[7:-1]): ''.join(_unescape_quoted(t[t.find('"'):]) for t in self._decode(field))
+                    for field in self._spans if field.startswith('msgstr[')}
+        decoder, join, default = self.decoders[name]
+        spans = self._spans.get(name)
+        if spans is None:
+            return list(default) if join is None else default
+        if len(spans) == 1:
+            start, end = spans[0]
+            if decoder is _unescape_quoted:
+                # Most of the strings are on a single line without escapes.
+                text = self._buffer[start + 1:end - 1].decode(self._encoding)
+                if '\\' not in text:
+                    return text
+                import polib
+                return polib.unescape(text)
+            value = decoder(self._buffer[start:end].decode(self._encoding))
+            return list(value) if join is None else value
+        if join is None:
+            return list(chain.from_iterable(decoder(text) for text in self._decode(name)))
+        return join.join(decoder(text) for text in self._decode(name))
+
+    msgid = _LazyField()
+    msgstr = _LazyField()
+    msgid_plural = _LazyField()
+    msgstr_plural = _LazyField()
+    msgctxt = _LazyField()
+    previous_msgid = _LazyField()
+    previous_msgid_plural = _LazyField()
+    previous_msgctxt = _LazyField()
+    tcomment = _LazyField()
+    comment = _LazyField()
+    occurrences = _LazyField()
+    flags = _LazyField()
+
+    def __getattr__(self, name):
+        """Look up the attribute in the equivalent `polib.POEntry`."""
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in PO_FIELDS:
+            # Only fields which were not parsed get here.
+            raise AttributeError('Field %s of the entry was not parsed' % name)
+        return getattr(self.to_entry(), name)
+
+    @property
+    def fuzzy(self):
+        """Return whether the entry is fuzzy."""
+        return 'fuzzy' in self.flags
+
+    def translated(self):
+        """Return whether the entry is translated, same as `polib.POEntry.translated`."""
+        if self.obsolete or self.fuzzy:
+            return False
+        if self.msgstr != '':
+            return True
+        if self.msgstr_plural:
+            return '' not in self.msgstr_plural.values()
+        return False
+
+    def to_entry(self):
+        """Return equivalent `polib.POEntry`."""
+        if self._entry is None:
+            import polib
+            kwargs = {name: getattr(self, name) for name in PO_FIELDS
+                      if self._parsed is None or name in self._parsed}
+            self._entry = polib.POEntry(linenum=self.linenum, obsolete=self.obsolete, encoding=self._encoding,
+                                        **kwargs)
+        return self._entry
+
+    def __str__(self):
+        """Return the entry in the PO format."""
+        return str(self.to_entry())
+
+    def __reduce__(self):
+        """Pickle the entry as `polib.POEntry`, the buffer can't be pickled."""
+        import polib
+        return polib.POEntry, (), self.to_entry().__dict__
+
+
+class MappedEntryStream(EntryStream):
+    """Stream of entries in a memory-mapped PO file.
+
+    Lines are scanned in the raw content of the file and entries only keep their offsets, text is decoded only when
+    validators access the fields. Content strings and files in encodings which aren't ASCII compatible are parsed by
+    `EntryStream`.
+
+    @ivar fields: Set of fields which are parsed, all fields if `None`.
+    """
+
+    def __init__(self, pofile, encoding=None, start=0, end=None, first_line=1, fields=None):
+        """Initialize the stream.
+
+        @param fields: Names of entry fields to be parsed, see `PO_FIELDS`. All fields are parsed by default.
+            Fields `msgid` and `msgctxt` are always parsed to find the header.
+        @type fields: Iterable of strings
+
+        See `EntryStream` for other parameters.
+        """
+        super().__init__(pofile, encoding, start=start, end=end, first_line=first_line)
+        self.fields = None if fields is None else frozenset(fields).union(('msgid', 'msgctxt'))
+
+    def __iter__(self):
+        """Parse the file and yield its entries."""
+        buffer = _map_file(self.pofile) if _is_file(self.pofile) else None
+        encoding = self.encoding
+        if buffer is not None:
+            encoding = encoding or detect_encoding(buffer)
+            if not _is_ascii_compatible(encoding):
+                buffer.close()
+                buffer = None
+        if buffer is None:
+            yield from self._parse_text(encoding)
+            return
+        self._buffer = buffer
+        self._buffer_encoding = encoding
+        yield from self._parse_buffer()
+
+    def _parse_text(self, encoding):
+        """Parse the file by `EntryStream` and yield its entries."""
+        stream = EntryStream(self.pofile, encoding, start=self.start, end=self.end, first_line=self.first_line)
+        for entry in stream:
+            self.header, self.header_comment = stream.header, stream.header_comment
+            yield entry
+        self.header, self.header_comment = stream.header, stream.header_comment
+
+    def _new_entry(self, linenum):
+        """Return a new empty entry."""
+        return MappedEntry(self._buffer, self._buffer_encoding, linenum, parsed=self.fields)
+
+    def _parse_buffer(self):
+        """Parse the lines of the buffer and yield entries."""
+        buffer = self._buffer
+        self._state = 'st'
+        self._entry = self._new_entry(self.first_line if self.start else 0)
+        self._done = None
+        self._msgstr_index = 0
+        self._obsolete = False
+        self._line_number = self.first_line - 1
+        position = self.start
+        if not position and buffer[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            position = len(codecs.BOM_UTF8)
+        end = len(buffer) if self.end is None else self.end
+        buffer.seek(position)
+        readline = buffer.readline
+        last_token = None
+        while position < end:
+            line = readline()
+            offset = position
+            position += len(line)
+            self._line_number += 1
+            stripped = line.strip()
+            if not stripped:
+                continue
+            last_token = self._process_line(stripped, offset + line.find(stripped[:1]))
+            if self._done is not None:
+                yield from self._finish(self._done)
+                self._done = None
+        if last_token is not None and not last_token.startswith(b'#'):
+            # The last entry is completed by the end of the file. Trailing comments are ignored.
+            yield from self._finish(self._entry)
+
+    # Bytes variants of the keywords
+    byte_keywords = {k.encode(): v for k, v in EntryStream.keywords.items()}
+    byte_previous_keywords = {k.encode(): v for k, v in EntryStream.previous_keywords.items()}
+    byte_comments = {k.encode(): v for k, v in EntryStream.comments.items()}
+
+    _unescaped_quote = re.compile(rb'(?<!\\)"')
+
+    def _check_quotes(self, token):
+        """Check the quoted string doesn't contain unescaped quotes."""
+        if self._unescaped_quote.search(token, 1, len(token) - 1):
+            raise self._syntax_error(': unescaped double quote found')
+
+    def _process_line(self, line, offset):
+        """Process a single non-empty line at the offset and return its first token."""
+        tokens = line.split(None, 2)
+        if tokens[0] == b'#~|':
+            return tokens[0]
+        if tokens[0] == b'#~' and len(tokens) > 1:
+            stripped = line[3:].lstrip()
+            offset += len(line) - len(stripped)
+            line = stripped
+            tokens = tokens[1:]
+            self._obsolete = True
+        else:
+            self._obsolete = False
+
+        end = offset + len(line)
+        if tokens[0] in self.byte_keywords and len(tokens) > 1:
+            token = line[len(tokens[0]):].lstrip()
+            self._check_quotes(token)
+            self._process(self.byte_keywords[tokens[0]], (end - len(token), end))
+        elif line[:1] == b'"':
+            self._check_quotes(line)
+            self._process('mc', (offset, end))
+        elif line[:7] == b'msgstr[':
+            self._process('mx', (offset, end))
+        elif tokens[0] == b'#|':
+            self._process_previous(line, tokens, offset)
+        elif tokens[0] in self.byte_comments:
+            if len(tokens) > 1:
+                self._process(self.byte_comments[tokens[0]], (offset, end))
+        elif tokens[0] == b'#' or tokens[0].startswith(b'##'):
+            self._process('tc', (offset, end))
+        else:
+            raise self._syntax_error()
+        return tokens[0]
+
+    def _process_previous(self, line, tokens, offset):
+        """Process the previous translation comment."""
+        if len(tokens) <= 1:
+            raise self._syntax_error()
+        end = offset + len(line)
+        line = line[2:].lstrip()
+        if tokens[1].startswith(b'"'):
+            self._process('mc', (end - len(line), end))
+        elif len(tokens) == 2:
+            raise self._syntax_error(': invalid continuation line')
+        elif tokens[1] not in self.byte_previous_keywords:
+            raise self._syntax_error(': unknown keyword %s' % tokens[1].decode(self._buffer_encoding))
+        else:
+            token = line[len(tokens[1]):].lstrip()
+            self._process(self.byte_previous_keywords[tokens[1]], (end - len(token), end))
+
+    # Dictionary of ((symbol, state), next_state) pairs
+    transition_table = _compile_transitions(EntryStream.transitions)
+    # Dictionary of (state, field) pairs
+    state_fields = dict(EntryStream.continued, tc='tcomment', gc='comment', oc='occurrences', fl='flags')
+
+    def _process(self, symbol, span):
+        """Perform the transition of the state machine and add the line to the entry if its field is parsed."""
+        state = self._state
+        next_state = self.transition_table.get((symbol, state))
+        if next_state is None:
+            raise self._syntax_error()
+        if symbol in self.entry_starts and state in ('ms', 'mx'):
+            self._done = self._entry
+            self._entry = self._new_entry(self._line_number)
+        if symbol == 'mc':
+            # Continuation doesn't change the state.
+            field = 'msgstr_plural' if state == 'mx' else self.state_fields.get(state)
+        else:
+            field = 'msgstr_plural' if next_state == 'mx' else self.state_fields.get(next_state)
+            if symbol == 'mx':
+                index = self._buffer[span[0] + 7] - ord('0')
+                if not 0 <= index <= 9:
+                    raise self._syntax_error()
+                self._msgstr_index = index
+            elif symbol == 'mi':
+                self._entry.obsolete = self._obsolete
+            elif next_state == 'he':
+                self._add_header_comment(self._buffer[span[0]:span[1]].decode(self._buffer_encoding))
+            self._state = next_state
+        if field is not None and (self.fields is None or field in self.fields):
+            if field == 'msgstr_plural':
+                field = 'msgstr[%d]' % self._msgstr_index
+            self._entry.add(field, *span)
+
+
+# Maximal number of fields other than `msgid` and `msgctxt`, for which `MappedEntryStream` is faster than `EntryStream`.
+# Its lines are tokenized by Python code, so it's slower once the most of the entry is decoded.
+MAPPED_FIELDS_MAX = 1
+
+
+def open_stream(pofile, encoding=None, start=0, end=None, first_line=1, fields=None):
+    """Return stream of entries which parses the fields fastest.
+
+    Only a few of the fields are parsed by `MappedEntryStream`, others by `EntryStream`.
+
+    @param fields: Names of entry fields to be parsed, see `PO_FIELDS`. All fields are parsed by default.
+    @type fields: Iterable of strings
+
+    See `EntryStream` for other parameters.
+    """
+    if fields is not None and len(set(fields).difference(('msgid', 'msgctxt'))) <= MAPPED_FIELDS_MAX:
+        return MappedEntryStream(pofile, encoding, start=start, end=end, first_line=first_line, fields=fields)
+    return EntryStream(pofile, encoding, start=start, end=end, first_line=first_line)
+
+
+# Lines which may end an entry and lines which may start a new one.
+_ENTRY_END = re.compile(rb'(#~\s+)?(msgstr|")')
+_ENTRY_START = re.compile(rb'(#~\s+)?msg(ctxt|id)\s|#($|\s|[.:,#]|\|\s+msg(ctxt|id)\s)')
+
+
+def _find_boundary(handle, offset):
+    """Return offset of the first entry after `offset` which is separated from the previous entry by a blank line.
+
+    @param handle: Binary file object
+    @return: Offset of the entry or `None` if there is no such entry.
+    """
+    handle.seek(offset)
+    # Skip the rest of the line, the offset may point into its middle.
+    position = offset + len(handle.readline())
+    # State is 'end' after a line which may end an entry and 'blank' after blank lines which follow it.
+    state = None
+    for line in handle:
+        line_start = position
+        position += len(line)
+        line = line.strip()
+        if not line:
+            if state == 'end':
+                state = 'blank'
+            continue
+        if state == 'blank' and _ENTRY_START.match(line):
+            return line_start
+        state = 'end' if _ENTRY_END.match(line) else None
+    return None
+
+
+def split_file(filename, parts):
+    """Split the file into byte ranges which can be parsed separately.
+
+    Ranges start at entries separated from the previous entry by a blank line, so fewer ranges may be returned.
+
+    @param filename: Name of the file
+    @type filename: text
+    @param parts: Requested number of ranges
+    @type parts: int
+    @return: List of (start, end, first_line) tuples, `end` of the last range is `None`.
+    """
+    size = os.path.getsize(filename)
+    starts = [0]
+    with open(filename, 'rb') as handle:
+        for part in range(1, parts):
+            offset = size * part // parts
+            if offset <= starts[-1]:
+                continue
+            start = _find_boundary(handle, offset)
+            if start is None:
+                break
+            starts.append(start)
+
+        first_lines = [1]
+        handle.seek(0)
+        for previous, start in zip(starts, starts[1:]):
+            newlines = 0
+            remaining = start - previous
+            while remaining:
+                block = handle.read(min(remaining, 1024 * 1024))
+                remaining -= len(block)
+                newlines += block.count(b'\n')
+            first_lines.append(first_lines[-1] + newlines)
+    return list(zip(starts, starts[1:] + [None], first_lines))
 
 
 ################################################################################
-# Polint command
-MSG_FORMAT = '%(filename)s:%(line)s: [%(error)s] %(description)s\n'
+# Compiled catalogs
+# Suffixes of files which are read as compiled catalogs
+MO_SUFFIXES = ('.mo', '.gmo')
+# Dictionary of (magic number, byte order) pairs of MO files
+_MO_MAGIC = {b'\xde\x12\x04\x95': '<', b'\x95\x04\x12\xde': '>'}
 
 
-def get_files(paths):
-    """Return only paths to files to be linted.
+def _is_mo(pofile):
+    """Return whether `pofile` is a name of a compiled catalog."""
+    return isinstance(pofile, str) and pofile.endswith(MO_SUFFIXES)
 
-    @param paths: List of files or directories to be linted.
+
+def _hashpjw(key):
+    """Return hash of the key used in hash tables of MO files, same as `hash_string` of GNU gettext."""
+    value = 0
+    for byte in key:
+        value = (value << 4) + byte
+        high = value & 0xf0000000
+        if high:
+            value ^= high >> 24
+            value ^= high
+    return value
+
+
+class MOEntry(object):
+    """Entry of a compiled catalog.
+
+    Entry keeps only its position in the catalog, fields are decoded once they're accessed and stored as attributes of
+    the entry. Compiled catalogs don't contain comments, flags nor obsolete entries.
+
+    @ivar catalog: Catalog of the entry
+    @ivar index: Index of the entry in the tables of the catalog
+    @ivar linenum: Position of the entry in the catalog, starting at 1
     """
-    for path in paths:
-        if os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                for filename in fnmatch.filter(files, '*.po'):
-                    yield os.path.join(root, filename)
+
+    obsolete = False
+    flags = ()
+    occurrences = ()
+    # All fields are available.
+    _parsed = None
+
+    def __init__(self, catalog, index):
+        """Initialize the entry.
+
+        @param catalog: Catalog of the entry
+        @type catalog: MOCatalog
+        @param index: Index of the entry in the tables of the catalog
+        @type index: int
+        """
+        self.catalog = catalog
+        self.index = index
+        self.linenum = index + 1
+        self._entry = None
+
+    @property
+    def key(self):
+        """Return raw key of the entry, i.e. msgctxt and msgid, by which gettext looks it up."""
+        return self.catalog.key(self.index)
+
+    def _decode_field(self, name):
+        """Decode all fields of the entry and return the value of the field."""
+        encoding = self.catalog.encoding
+        context, separator, original = self.catalog.original(self.index).decode(encoding).partition('\x04')
+        if not separator:
+            context, original = None, context
+        msgid, dummy, msgid_plural = original.partition('\x00')
+        translation = self.catalog.translation(self.index).decode(encoding)
+        if msgid_plural:
+            msgstr, msgstr_plural = '', dict(enumerate(translation.split('\x00')))
         else:
-            yield path
+            msgstr, msgstr_plural = translation, {}
+        self.__dict__.update(msgid=msgid, msgctxt=context, msgid_plural=msgid_plural, msgstr=msgstr,
+                             msgstr_plural=msgstr_plural)
+        return self.__dict__[name]
 
+    msgid = _LazyField()
+    msgctxt = _LazyField()
+    msgid_plural = _LazyField()
+    msgstr = _LazyField()
+    msgstr_plural = _LazyField()
 
-def main(args=None, output=sys.stdout):
-    """Run the polint.
+    def __getattr__(self, name):
+        """Look up the attribute in the equivalent `polib.POEntry`."""
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.to_entry(), name)
 
-    @param args: Command line arguments. Mainly for tests.
-    @param output: Standard output file object. Mainly for tests.
+    @property
+    def fuzzy(self):
+        """Return whether the entry is fuzzy, which it never is."""
+        return False
+
+    def translated(self):
+        """Return whether the entry is translated, i.e. none of its translations is empty."""
+        return all(self.catalog.translation(self.index).split(b'\x00'))
+
+    def to_entry(self):
+        """Return equivalent `polib.POEntry`."""
+        if self._entry is None:
+            import polib
+            self._entry = polib.POEntry(linenum=self.linenum, msgid=self.msgid, msgctxt=self.msgctxt,
+                                        msgid_plural=self.msgid_plural, msgstr=self.msgstr,
+                                        msgstr_plural=self.msgstr_plural, encoding=self.catalog.encoding)
+        return self._entry
+
+    def __str__(self):
+        """Return the entry in the PO format."""
+        return str(self.to_entry())
+
+
+class MOCatalog(object):
+    """Compiled catalog in the MO format.
+
+    The file is memory-mapped, strings are read from it only when they're accessed. Entries are looked up by the hash
+    table of the file the same way as gettext does. The header entry is not yielded, but it's available in the `header`
+    attribute.
+
+    @ivar filename: Name of the file
+    @ivar encoding: Encoding of the strings, detected from the header by default.
+    @ivar header: Header entry of the catalog, if found.
     """
-    options = docopt(__doc__, args, version=__version__)
 
-    exit_code = 0
-    if options.get('--ignore'):
-        exclude = {i for i in options['--ignore'].split(',')}
-    else:
-        exclude = None
-    for filename in get_files(options['<path>']):
-        linter = Linter(filename, exclude=exclude)
-        linter.run_validators()
-        if linter.errors:
-            exit_code = 1
-        error_defs = REGISTER.errors
-        for entry, errors in linter.errors.items():
-            for error in errors:
-                msg_data = {'filename': filename, 'line': entry.linenum, 'error': error,
-                            'description': error_defs[error]}
-                output.write(MSG_FORMAT % msg_data)
-            if options['--show-msg']:
-                output.write(str(entry))
-    sys.exit(exit_code)
+    def __init__(self, filename, encoding=None):
+        """Open the catalog.
+
+        @param filename: Name of the file
+        @type filename: text
+        @param encoding: Encoding of the strings, detected from the header by default.
+        @type encoding: text
+        @raises IOError: If the file isn't a valid MO file.
+        """
+        self.filename = filename
+        self._buffer = _map_file(filename)
+        if self._buffer is None or self._buffer[:4] not in _MO_MAGIC or len(self._buffer) < 28:
+            raise self._error('invalid magic number')
+        order = _MO_MAGIC[self._buffer[:4]]
+        revision, self._count, originals, translations, hash_size, hash_offset = struct.unpack_from(
+            order + '6I', self._buffer, 4)
+        if revision >> 16 > 1:
+            raise self._error('unknown revision %d' % revision)
+        # Tables of (length, offset) pairs of the strings
+        self._originals = self._read_table(order, originals, 2 * self._count)
+        self._translations = self._read_table(order, translations, 2 * self._count)
+        # gettext doesn't use hash tables which have less than 3 slots.
+        self._hash_table = self._read_table(order, hash_offset, hash_size) if hash_size > 2 else None
+        # Dictionary of (key, index) pairs of the first entries with the key, used if there is no hash table.
+        self._keys = None
+        try:
+            self._header_index = self._originals[::2].index(0)
+        except ValueError:
+            self._header_index = None
+        self.header = None if self._header_index is None else MOEntry(self, self._header_index)
+        if encoding is None:
+            import polib
+            encoding = polib.default_encoding if self.header is None else detect_encoding(self.translation(
+                self._header_index))
+        self.encoding = encoding
+
+    def _error(self, detail):
+        """Return error for the invalid file."""
+        return IOError('Invalid mo file %s: %s' % (self.filename, detail))
+
+    def _read_table(self, order, offset, size):
+        """Return array of `size` 32-bit integers at the offset."""
+        if offset + 4 * size > len(self._buffer):
+            raise self._error('table at %d exceeds the file' % offset)
+        table = array('I', self._buffer[offset:offset + 4 * size])
+        if (order == '<') != (sys.byteorder == 'little'):
+            table.byteswap()
+        return table
+
+    def _string(self, table, index):
+        """Return the string from the table."""
+        length, offset = table[2 * index], table[2 * index + 1]
+        if offset + length > len(self._buffer):
+            raise self._error('string at %d exceeds the file' % offset)
+        return self._buffer[offset:offset + length]
+
+    def original(self, index):
+        """Return raw original string of the entry, i.e. its msgctxt, msgid and msgid_plural."""
+        return self._string(self._originals, index)
+
+    def translation(self, index):
+        """Return raw translation of the entry, plural forms are separated by NUL characters."""
+        return self._string(self._translations, index)
+
+    def key(self, index):
+        """Return raw key of the entry, i.e. its original string without msgid_plural."""
+        return self.original(index).split(b'\x00', 1)[0]
+
+    def __len__(self):
+        """Return number of entries including the header."""
+        return self._count
+
+    def __iter__(self):
+        """Yield entries of the catalog other than the header."""
+        for index in range(self._count):
+            if index != self._header_index:
+                yield MOEntry(self, index)
+
+    def lookup(self, key):
+        """Return index of the entry gettext finds for the key or `None` if there is none.
+
+        @param key: Raw key, see `MOEntry.key`.
+        @type key: bytes
+        """
+        if self._hash_table is None:
+            if self._keys is None:
+                self._keys = {}
+                for index in range(self._count):
+                    self._keys.setdefault(self.key(index), index)
+            return self._keys.get(key)
+        size = len(self._hash_table)
+        value = _hashpjw(key)
+        slot = value % size
+        increment = 1 + value % (size - 2)
+        # Probe each slot at most once, in case the table is full.
+        for dummy in range(size):
+            index = self._hash_table[slot]
+            if not index:
+                return None
+            # Indices in the hash table start at 1.
+            if index <= self._count and self.key(index - 1) == key:
+                return index - 1
+            slot = (slot + increment) % size
+        return None
+
+
+################################################################################
+# Profiling
+class Profile(object):
+    """Timing statistics of the linting.
+
+    @ivar validators: Dictionary of (error_code, [calls, time, failures]) pairs
+    @ivar parse_times: Dictionary of (filename, time) pairs
+    """
+
+    formats = ('table', 'json')
+
+    def __init__(self):
+        """Initialize the profile. Take no parameters."""
+        self.validators = OrderedDict()
+        self.parse_times = OrderedDict()
+
+    def add_validator(self, code, calls, duration, failures):
+        """Add statistics of the validator.
+
+        @param code: Error code of the validator
+        @param calls: Number of entries validated by the validator, batch validators are called once for many entries.
+        @param duration: Cumulative time of the calls in seconds
+        @param failures: Number of failed validations
+        """
+        stats = self.validators.setdefault(code, [0, 0.0, 0])
+        stats[0] += calls
+        stats[1] += duration
+        stats[2] += failures
+
+    def add_parse_time(self, filename, duration):
+        """Add time spent by parsing of the file.
+
+        @param filename: Name of the file
+        @param duration: Parse time in seconds
+        """
+        self.parse_times[filename] = self.parse_times.get(filename, 0.0) + duration
+
+    def update(self, other):
+        """Add statistics from another profile."""
+        for code, stats in other.validators.items():
+            self.add_validator(code, *stats)
+        for filename, duration in other.parse_times.items():
+            self.add_parse_time(filename, duration)
+
+    def as_dict(self):
+        """Return profile as a dictionary."""
+        validators = OrderedDict((code, {'calls': calls, 'time': duration, 'failures': failures})
+                                 for code, (calls, duration, failures) in self.validators.items())
+        return {'validators': validators, 'parse_times': self.parse_times}
+
+    def write(self, output, format='table'):
+        """Write the profile.
+
+        @param output: File object to write to
+        @param format: Output format, either 'table' or 'json'
+        """
+        if format == 'json':
+            import json
+            json.dump(self.as_dict(), output, indent=2)
+            output.write('\n')
+            return
+        output.write('%-20s %10s %12s %10s\n' % ('validator', 'calls', 'time [s]', 'failures'))
+        for code, (calls, duration, failures) in self.validators.items():
+            output.write('%-20s %10d %12.6f %10d\n' % (code, calls, duration, failures))
+        output.write('\n%-53s %12s\n' % ('file', 'parse [s]'))
+        for filename, duration in self.parse_times.items():
+            output.write('%-53s %12.6f\n' % (filename, duration))
+
+
+################################################################################
+# Linter
+# Event which cancels linting in worker processes, see `_init_worker`.
+_CANCEL = None
+
+
+def _init_worker(cancel):
+    """Initialize the worker process with the event which cancels linting once it's set.
+
+    @type cancel: multiprocessing.Event
+    """
+    global _CANCEL
+    _CANCEL = cancel
+
+
+class Status(object):
+    """Linting process status.
+
+    Only the current and the previous entries are kept, validators can't look any further back.
+
+    @ivar entry: Currently processed entry.
+    @ivar previous: Previously processed entry.
+    """
+
+    def __init__(self):
+        """Initialize the register. Take no parameters."""
+        self.entry = None
+        self.previous = None
+
+    def step(self, entry):
+        """Move to the next entry.
+
+        @param entry: The next entry.
+        """
+        self.previous = self.entry
+        self.entry = entry
+
+
+class FailedEntry(object):
+    """Failing entry from the `ErrorList`.
+
+    The entry isn't kept in memory, its text is read from the file only once it's needed.
+
+    @ivar linenum: Line number of the entry
+    @type linenum: int
+    """
+
+    __slots__ = ('linenum', '_errors')
+
+    def __init__(self, linenum, errors):
+        """Initialize the entry.
+
+        @param linenum: Line number of the entry
+        @type linenum: int
+        @param errors: Errors which contain the entry
+        @type errors: ErrorList
+        """
+        self.linenum = linenum
+        self._errors = errors
+
+    def __str__(self):
+        """Return text of the entry."""
+        return self._errors.get_message(self.linenum)
+
+    def __repr__(self):
+        """Return representation of the entry."""
+        return '<%s line %d>' % (type(self).__name__, self.linenum)
+
+
+class ErrorList(object):
+    """Compact storage of errors found in a file.
+
+    Errors are stored in parallel arrays of line numbers, indices of interned error codes and fingerprints of
+    the failing entries, entries themselves are not kept. Iteration yields `FailedEntry` records of failing entries in
+    the order they were added.
+
+    @ivar pofile: Filename or a file the errors were found in, texts of failing entries are read from it.
+    @type pofile: text or file
+    """
+
+    __slots__ = ('pofile', '_lines', '_codes', '_fingerprints', '_code_names', '_code_indices', '_entries',
+                 '_messages')
+
+    def __init__(self, pofile=None):
+        """Initialize the list.
+
+        @param pofile: Filename or a file the errors are found in
+        @type pofile: text or file
+        """
+        self.pofile = pofile
+        self._lines = array('L')
+        self._codes = array('H')
+        self._fingerprints = array('Q')
+        self._code_names = []
+        self._code_indices = {}
+        self._entries = 0
+        # Texts of failing entries, they're read from the file once any of them is needed.
+        self._messages = {}
+
+    def add(self, line, code, fingerprint=0):
+        """Add error.
+
+        @param line: Line number of the failing entry
+        @type line: int
+        @param code: Error code
+        @type code: text
+        @param fingerprint: Fingerprint of the failing entry, see `entry_key`, 0 if unknown.
+        @type fingerprint: int
+        """
+        index = self._code_indices.get(code)
+        if index is None:
+            index = self._code_indices[code] = len(self._code_names)
+            self._code_names.append(code)
+        if not self._lines or self._lines[-1] != line:
+            self._entries += 1
+        self._lines.append(line)
+        self._codes.append(index)
+        self._fingerprints.append(fingerprint)
+
+    def __len__(self):
+        """Return number of failing entries."""
+        return self._entries
+
+    @property
+    def error_count(self):
+        """Return number of errors."""
+        return len(self._lines)
+
+    def __iter__(self):
+        """Yield `FailedEntry` records of failing entries."""
+        for entry, dummy in self.items():
+            yield entry
+
+    def items(self):
+        """Yield (entry, [error_code, ...]) pairs of failing entries, entries are `FailedEntry` records."""
+        for line, codes in self.lines():
+            yield FailedEntry(line, self), codes
+
+    def lines(self):
+        """Yield (line, [error_code, ...]) pairs of failing entries."""
+        code_names = self._code_names
+        for line, indices in groupby(zip(self._lines, self._codes), key=lambda e: e[0]):
+            yield line, [code_names[i] for dummy, i in indices]
+
+    def get_message(self, line):
+        """Return text of the failing entry on the line.
+
+        Texts of all failing entries are read from the file at once, see `Linter.get_messages`.
+        """
+        if line not in self._messages:
+            self._messages = Linter(self.pofile).get_messages(self._lines)
+        return self._messages.get(line, '')
+
+    def records(self):
+        """Yield (line, error_code, fingerprint) triples of errors in the order they were added.
+
+        Fingerprint is 0 if unknown.
+        """
+        code_names = self._code_names
+        for line, index, fingerprint in zip(self._lines, self._codes, self._fingerprints):
+            yield line, code_names[index], fingerprint
+
+    def fingerprints(self):
+        """Return dictionary of (line, fingerprint) pairs of failing entries with known fingerprints."""
+        return {line: fingerprint for line, fingerprint in zip(self._lines, self._fingerprints) if fingerprint}
+
+    def set_fingerprints(self, fingerprints):
+        """Set fingerprints of failing entries which are unknown.
+
+        @param fingerprints: Dictionary of (line, fingerprint) pairs
+        """
+        for position, line in enumerate(self._lines):
+            if not self._fingerprints[position]:
+                self._fingerprints[position] = fingerprints.get(line, 0)
+
+    def head(self, count):
+        """Return list of the first `count` errors.
+
+        @type count: int
+        @rtype: ErrorList
+        """
+        errors = type(self)(self.pofile)
+        errors._lines = self._lines[:count]
+        errors._codes = self._codes[:count]
+        errors._fingerprints = self._fingerprints[:count]
+        errors._code_names = list(self._code_names)
+        errors._code_indices = dict(self._code_indices)
+        errors._entries = sum(1 for dummy in groupby(errors._lines))
+        return errors
+
+    def extend(self, other, skip_line=None):
+        """Add errors from the other list.
+
+        @param other: Errors to be added
+        @type other: ErrorList
+        @param skip_line: Line number of the entry whose errors are not added, if any
+        @type skip_line: int
+        """
+        fingerprints = other.fingerprints()
+        for line, codes in other.lines():
+            if line != skip_line:
+                for code in codes:
+                    self.add(line, code, fingerprints.get(line, 0))
+
+    def replace(self, code, lines):
+        """Return errors where the error code is reported on the lines instead.
+
+        @param code: Error code
+        @type code: text
+        @param lines: Line numbers of entries which failed with the error code
+        @type lines: Iterable of ints
+        @rtype: ErrorList
+        """
+        lines = set(lines)
+        failures = OrderedDict((line, [c for c in codes if c != code or line in lines]) for line, codes in self.lines())
+        for line in lines:
+            if code not in failures.setdefault(line, []):
+                failures[line].append(code)
+        fingerprints = self.fingerprints()
+        errors = type(self)(self.pofile)
+        for line in sorted(failures):
+            for error_code in failures[line]:
+                errors.add(line, error_code, fingerprints.get(line, 0))
+        return errors
+
+
+class Linter(object):
+    """Linter performs the actual validation of the PO files.
+
+    If opens the pofile and runs all registered validators on each entry.
+
+    @ivar errors: Failing entries and their errors found in validation
+    @type errors: ErrorList
+    @ivar profile: Profile which collects timing of validators, if any.
+    @type profile: Profile or None
+    @ivar index: Index of the file for cross-file validators, if it's collected.
+    @type index: FileIndex or None
+    @ivar max_errors: Number of errors after which the validation stops, if any.
+    @type max_errors: int or None
+    @ivar fingerprints: Whether fingerprints of failing entries are stored with the errors
+    @type fingerprints: bool
+    """
+
+    chunk_size = 1000
+    # Codes which are not checked in templates collected for cross-file validators, their entries aren't translated.
+    template_exclude = frozenset(('untranslated', 'fuzzy'))
+
+    def __init__(self, pofile, exclude=None, register=REGISTER, profile=None, executor=None, parts=1, index=None,
+                 max_errors=None, fingerprints=False):
+        """Initialize Linter.
+
+        @param pofile: Filename or a file to be validated
+        @type pofile: text or file
+        @param exclude: Set of validators to exclude
+        @type exclude: Set of strings
+        @param register: Validator register to be used
+        @type register: ValidatorRegister
+        @param profile: Profile to collect timing of validators
+        @type profile: Profile
+        @param executor: Executor which validates parts of the file, if it's split.
+        @type executor: concurrent.futures.Executor
+        @param parts: Number of parts the file is split into
+        @type parts: int
+        @param index: Index to be filled with entries of the file for cross-file validators
+        @type index: FileIndex
+        @param max_errors: Number of errors after which the validation stops. Errors are checked after each chunk, so
+            more errors may be found. The whole file is validated if the index is collected.
+        @type max_errors: int
+        @param fingerprints: Whether to store fingerprints of failing entries with the errors, see `entry_key`.
+        @type fingerprints: bool
+        """
+        self.pofile = pofile
+        self.register = register
+        self.exclude = exclude or set()
+        self.profile = profile
+        self.executor = executor
+        self.parts = parts
+        self.index = index
+        self.max_errors = max_errors
+        self.fingerprints = fingerprints
+        self.errors = ErrorList(pofile)
+        # Fused function of the entry validators
+        self._fused = None
+
+    def is_stopped(self, errors=None):
+        """Return whether the validation should stop, because enough errors were found or linting was cancelled.
+
+        @param errors: Errors to be checked instead of the errors of the linter
+        @type errors: ErrorList
+        """
+        if _CANCEL is not None and _CANCEL.is_set():
+            return True
+        errors = self.errors if errors is None else errors
+        return self.max_errors is not None and self.index is None and errors.error_count >= self.max_errors
+
+    def _get_validators(self):
+        """Return tuple of (code, callback, batch) of enabled validators.
+
+        Compiled catalogs are validated by validators from `MO_REGISTER` with codes enabled in the register. Codes which
+        are checked across files, if the index is collected, are not checked again. Templates aren't checked by
+        `template_exclude` validators, if the index is collected.
+        """
+        exclude = self.exclude
+        if self.index is not None and self.index.is_template:
+            exclude = self.template_exclude.union(exclude)
+        if _is_mo(self.pofile):
+            return tuple((code, callback, True) for code, callback in MO_REGISTER.validators.items()
+                         if code in self.register.validators and code not in exclude
+                         and not (self.index is not None and self.register.is_cross_file(code)))
+        return tuple((code, callback, self.register.is_batch(code))
+                     for code, callback in self.register.validators.items()
+                     if code not in exclude and not self.register.is_cross_file(code))
+
+    def run_validators(self):
+        """Run the checks.
+
+        Entries are validated in chunks of `chunk_size` entries. If the linter has an executor, the file is split into
+        `parts` which are validated by the executor. Compiled catalogs are never split.
+        """
+        validators = self._get_validators()
+        # Dictionary of (code, [calls, time, failures]) pairs
+        stats = OrderedDict((code, [0, 0.0, 0]) for code, dummy, dummy in validators)
+        if self.executor is not None and self.parts > 1 and _is_file(self.pofile) and not _is_mo(self.pofile):
+            parse_time = self._run_parts(validators, stats)
+        elif _is_mo(self.pofile):
+            parse_time = self._validate(MOCatalog(self.pofile), validators, stats)[0]
+        else:
+            stream = open_stream(self.pofile, fields=self._get_fields(validators))
+            parse_time = self._validate(stream, validators, stats)[0]
+
+        if self.profile is not None:
+            self.profile.add_parse_time(self.pofile, parse_time)
+            for code, code_stats in stats.items():
+                self.profile.add_validator(code, *code_stats)
+
+    def _get_fields(self, validators):
+        """Return entry fields to be parsed for the validators and the index."""
+        fields = self.register.get_fields(v[0] for v in validators)
+        if fields is not None and self.index is not None:
+            fields.update(FileIndex.fields)
+        return fields
+
+    def _validate(self, stream, validators, stats):
+        """Validate entries from the stream.
+
+        @param stream: Stream of entries
+        @param validators: Enabled validators
+        @param stats: Dictionary of (code, [calls, time, failures]) pairs to be updated
+        @return: Tuple of (parse time, first entry, last entry), entries are `None` if there are none.
+        """
+        timer = time.perf_counter
+        parse_time = 0.0
+        first = previous = None
+        entries = iter(stream)
+        while True:
+            start = timer()
+            chunk = list(islice(entries, self.chunk_size))
+            parse_time += timer() - start
+            if not chunk:
+                break
+            self._check_chunk(chunk, previous, validators, stats)
+            if self.index is not None:
+                self.index.update(chunk)
+            if first is None:
+                first = chunk[0]
+            previous = chunk[-1]
+            if self.is_stopped():
+                break
+        if self.index is not None and stream.header is not None:
+            self.index.set_header(stream.header)
+        return parse_time, first, previous
+
+    def _check_chunk(self, chunk, previous, validators, stats=None):
+        """Run validators on the chunk of entries and store the errors.
+
+        Entry validators are run by a single fused function, see `fuse_validators`, unless the linter is profiled.
+
+        @param stats: Dictionary of (code, [calls, time, failures]) pairs to be updated, if any
+        """
+        timer = time.perf_counter
+        failures = defaultdict(list)
+        fused = None
+        if self.profile is None and any(not batch for dummy, dummy, batch in validators):
+            if self._fused is None:
+                self._fused = fuse_validators([callback for dummy, callback, batch in validators if not batch])
+            fused = iter(self._fused(chunk, previous))
+        for code, callback, batch in validators:
+            start = timer()
+            if fused is not None and not batch:
+                failed = next(fused)
+            else:
+                failed = apply_validator(callback, chunk, previous, batch=batch)
+            if stats is not None:
+                code_stats = stats[code]
+                code_stats[1] += timer() - start
+                code_stats[0] += len(chunk)
+                code_stats[2] += len(failed)
+            for index in failed:
+                failures[index].append(code)
+        for index in sorted(failures):
+            entry = chunk[index]
+            fingerprint = entry_key(entry) if self.fingerprints else 0
+            for code in failures[index]:
+                self.errors.add(entry.linenum, code, fingerprint)
+
+    def _run_parts(self, validators, stats):
+        """Split the file into parts, validate them by the executor and merge the results.
+
+        Parts are validated independently, so their first entries are validated again with the last entry of
+        the previous part to get the same results as if the file was validated at once.
+
+        @return: Parse time
+        """
+        import polib
+        buffer = _map_file(self.pofile)
+        encoding = polib.default_encoding if buffer is None else detect_encoding(buffer)
+        futures = [self.executor.submit(_lint_part, self.pofile, start, end, first_line, encoding,
+                                        exclude=self.exclude, register=self.register, index=self.index is not None,
+                                        max_errors=self.max_errors, profile=self.profile is not None,
+                                        fingerprints=self.fingerprints)
+                   for start, end, first_line in split_file(self.pofile, self.parts)]
+        parse_time = 0.0
+        previous = None
+        for future in futures:
+            errors, first, last, part_stats, part_time, part_index = future.result()
+            parse_time += part_time
+            if part_index is not None:
+                self.index.extend(part_index)
+            for code, code_stats in part_stats.items():
+                for i, value in enumerate(code_stats):
+                    stats[code][i] += value
+            if first is not None:
+                self._merge_part(errors, first, previous, validators)
+                previous = last
+            # Part which was stopped doesn't end by its last entry, so the following parts can't be merged.
+            if self.is_stopped() or self.is_stopped(errors):
+                for future in futures:
+                    future.cancel()
+                break
+        return parse_time
+
+    def _merge_part(self, errors, first, previous, validators):
+        """Add errors of the part, its first entry is validated again with the last entry of the previous part.
+
+        @param errors: Errors found in the part
+        @param first: First entry of the part
+        @param previous: Last entry of the previous part or `None` for the first part
+        """
+        if previous is None:
+            self.errors.extend(errors)
+        else:
+            self._check_chunk([first], previous, validators)
+            self.errors.extend(errors, skip_line=first.linenum)
+
+    def get_messages(self, lines):
+        """Return texts of entries on the lines.
+
+        The file is parsed again, so the entries don't have to be kept in memory during validation.
+
+        @param lines: Line numbers of the entries
+        @return: Dictionary of (line, text) pairs
+        """
+        lines = set(lines)
+        messages = {}
+        for entry in MOCatalog(self.pofile) if _is_mo(self.pofile) else EntryStream(self.pofile):
+            if entry.linenum in lines:
+                messages[entry.linenum] = str(entry)
+        return messages
+
+    def get_fingerprints(self, lines):
+        """Return fingerprints of entries on the lines, see `entry_key`.
+
+        The file is parsed again, like in `get_messages`.
+
+        @param lines: Line numbers of the entries
+        @return: Dictionary of (line, fingerprint) pairs
+        """
+        lines = set(lines)
+        fingerprints = {}
+        if _is_mo(self.pofile):
+            entries = MOCatalog(self.pofile)
+        else:
+            entries = MappedEntryStream(self.pofile, fields=())
+        for entry in entries:
+            if entry.linenum in lines:
+                fingerprints[entry.linenum] = entry_key(entry)
+        return fingerprints
+
+
+def _lint_part(pofile, start, end, first_line, encoding, exclude=None, register=REGISTER, index=False,
+               max_errors=None, profile=False, fingerprints=False):
+    """Validate a part of the file in a worker process.
+
+    @param index: Whether to collect index of the part
+    @param max_errors: Number of errors after which the validation of the part stops
+    @param profile: Whether the validators are profiled, they're not fused then.
+    @param fingerprints: Whether to store fingerprints of failing entries with the errors
+    @return: Tuple of (errors, first entry, last entry, stats, parse time, index)
+    """
+    linter = Linter(pofile, exclude=exclude, register=register, profile=Profile() if profile else None,
+                    index=FileIndex(pofile) if index else None, max_errors=max_errors, fingerprints=fingerprints)
+    validators = linter._get_validators()
+    stats = OrderedDict((code, [0, 0.0, 0]) for code, dummy, dummy in validators)
+    stream = open_stream(pofile, encoding, start=start, end=end, first_line=first_line,
+                         fields=linter._get_fields(validators))
+    parse_time, first, last = linter._validate(stream, validators, stats)
+    return linter.errors, first, last, stats, parse_time, linter.index
+
+
+def apply_validator(callback, entries, previous=None, batch=False):
+    """Run the validator on the entries and return indices of entries which failed.
+
+    @param callback: Validator
+    @param entries: List of entries to be validated
+    @param previous: Entry which precedes the `entries`
+    @param batch: Whether the validator is a batch validator
+    @rtype: [int, ...]
+    """
+    if batch:
+        return list(callback(entries, previous))
+    failed = []
+    status = Status()
+    status.entry = previous
+    for index, entry in enumerate(entries):
+        status.step(entry)
+        if not callback(status):
+            failed.append(index)
+    return failed
+
+
+# Template of the function which runs entry validators in a single pass over the entries
+_FUSED_TEMPLATE = """
+def fused(entries, previous):
+    %(failed)s = %(empty)s
+    status = Status()
+    status.entry = previous
+    for index, entry in enumerate(entries):
+        status.previous = status.entry
+        status.entry = entry
+%(checks)s
+    return %(failed)s
+"""
+_FUSED_CHECK = """        if not validator_%(number)d(status):
+            failed_%(number)d.append(index)"""
+
+
+def fuse_validators(callbacks):
+    """Return function which runs the entry validators in a single pass over the entries.
+
+    The function is compiled with the validators unrolled, so validating an entry costs a single step of the status
+    and a call of each validator.
+
+    @param callbacks: Entry validators
+    @type callbacks: [function, ...]
+    @return: Function called with a list of entries and the entry which precedes them. It returns a tuple with lists of
+        indices of entries which failed, one for each validator, see `apply_validator`.
+    """
+    numbers = range(len(callbacks))
+    source = _FUSED_TEMPLATE % {
+        'failed': ''.join('failed_%d, ' % i for i in numbers) or '()',
+        'empty': ''.join('[], ' for i in numbers) or '()',
+        'checks': '\n'.join(_FUSED_CHECK % {'number': i} for i in numbers)}
+    namespace = {'validator_%d' % i: callback for i, callback in enumerate(callbacks)}
+    namespace['Status'] = Status
+    exec(compile(source, '<fused validators>', 'exec'), namespace)
+    return namespace['fused']
+
+
+################################################################################
+# Validators
+#
+# Validators are called either with a `Status` and return whether the validation passed or, if registered as batch
+# validators, with a list of entries and the previous entry and return indices of entries which failed.
+def fuzzy_validator(status):
+    """Check if current entry is fuzzy."""
+    return 'fuzzy' not in status.entry.flags
+
+
+def fuzzy_batch_validator(entries, previous):
+    """Return indices of fuzzy entries."""
+    return [i for i, entry in enumerate(entries) if 'fuzzy' in entry.flags]
+
+
+REGISTER.register_batch(fuzzy_batch_validator, 'fuzzy', 'translation is fuzzy', fields=('flags', ))
+
+
+def obsolete_validator(status):
+    """Check if current entry is obsolete."""
+    return not status.entry.obsolete
+
+
+def obsolete_batch_validator(entries, previous):
+    """Return indices of obsolete entries."""
+    return [i for i, entry in enumerate(entries) if entry.obsolete]
+
+
+REGISTER.register_batch(obsolete_batch_validator, 'obsolete', 'entry is obsolete', fields=())
+
+
+def untranslated_validator(status):
+    """Check if current entry is translated."""
+    return status.entry.translated()
+
+
+def untranslated_batch_validator(entries, previous):
+    """Return indices of untranslated entries."""
+    return [i for i, entry in enumerate(entries) if not entry.translated()]
+
+
+REGISTER.register_batch(untranslated_batch_validator, 'untranslated', 'translation is missing',
+                        fields=('flags', 'msgstr', 'msgstr_plural'))
+
+
+def no_location_validator(status):
+    """Check if current entry has no location data."""
+    return not status.entry.occurrences
+
+
+def no_location_batch_validator(entries, previous):
+    """Return indices of entries with location data."""
+    return [i for i, entry in enumerate(entries) if entry.occurrences]
+
+
+REGISTER.register_batch(no_location_batch_validator, 'location', 'entry contains location',
+                        fields=('occurrences', ))
+
+
+def _is_sorted(previous, entry):
+    """Return whether the pair of entries is properly sorted."""
+    if previous.msgid == entry.msgid:
+        return (previous.msgctxt or '') < (entry.msgctxt or '')
+    else:
+        return previous.msgid < entry.msgid
+
+
+def sort_validator(status):
+    """Check if the entry is properly sorted."""
+    if status.previous is None:
+        # First entry is always correctly sorted.
+        return True
+    return _is_sorted(status.previous, status.entry)
+
+
+def _casefold_key(text):
+    """Return key which compares texts regardless of case and compatibility variants of characters."""
+    import unicodedata
+    return unicodedata.normalize('NFKD', text).casefold(), text
+
+
+def _locale_key(text):
+    """Return key which compares texts by the current locale."""
+    import locale
+    return locale.strxfrm(text)
+
+
+# Dictionary of (collation, function) pairs, function transforms strings for comparison
+COLLATIONS = OrderedDict((('codepoint', None), ('casefold', _casefold_key), ('locale', _locale_key)))
+
+
+def sort_key(entry, collate=None):
+    """Return key of the entry in sorted order.
+
+    @param entry: Entry
+    @param collate: Function which transforms strings for comparison, codepoints are compared by default.
+    """
+    if collate is None:
+        return entry.msgid, entry.msgctxt or ''
+    return collate(entry.msgid), collate(entry.msgctxt or '')
+
+
+class SortValidator(object):
+    """Batch validator which checks entries are properly sorted.
+
+    Sort key of each entry is computed once and compared to the key of its predecessor.
+
+    @ivar collation: Name of the collation, see `COLLATIONS`.
+    """
+
+    def __init__(self, collation='codepoint'):
+        """Initialize the validator.
+
+        @param collation: Name of the collation, see `COLLATIONS`.
+        @raises ValueError: If collation is unknown.
+        """
+        if collation not in COLLATIONS:
+            raise ValueError('Unknown collation %s.' % collation)
+        self.collation = collation
+
+    def __call__(self, entries, previous):
+        """Return indices of entries which are not properly sorted."""
+        collate = COLLATIONS[self.collation]
+        if collate is None:
+            keys = [(entry.msgid, entry.msgctxt or '') for entry in entries]
+        else:
+            keys = [sort_key(entry, collate) for entry in entries]
+        start = 1
+        if previous is not None:
+            keys.insert(0, sort_key(previous, collate))
+            start = 0
+        # First entry is always correctly sorted.
+        following = keys[1:]
+        if all(map(operator.lt, keys, following)):
+            # Fast path for sorted entries
+            return []
+        return [i for i, is_sorted in enumerate(map(operator.lt, keys, following), start) if not is_sorted]
+
+
+sort_batch_validator = SortValidator()
+
+
+def find_misplaced(pofile, collation='codepoint'):
+    """Return line numbers of the smallest set of entries which have to be moved to sort the file.
+
+    The other entries form the longest sorted subsequence of the file.
+
+    @param pofile: Filename or a content of the file
+    @param collation: Name of the collation, see `COLLATIONS`.
+    @rtype: [int, ...]
+    """
+    collate = COLLATIONS[collation]
+    lines = array('L')
+    # Index of the preceding entry in the longest sorted subsequence which ends by the entry
+    predecessors = array('l')
+    # Indices and keys of the last entries of the sorted subsequences of each length
+    tails = array('l')
+    tail_keys = []
+    for index, entry in enumerate(MappedEntryStream(pofile, fields=('msgid', 'msgctxt'))):
+        key = sort_key(entry, collate)
+        lines.append(entry.linenum)
+        length = bisect_left(tail_keys, key)
+        predecessors.append(tails[length - 1] if length else -1)
+        if length == len(tails):
+            tails.append(index)
+            tail_keys.append(key)
+        else:
+            tails[length] = index
+            tail_keys[length] = key
+    kept = set()
+    index = tails[-1] if tails else -1
+    while index >= 0:
+        kept.add(index)
+        index = predecessors[index]
+    return [line for index, line in enumerate(lines) if index not in kept]
+
+
+# Error code of the sort validator
+UNSORTED = 'unsorted'
+REGISTER.register_batch(sort_batch_validator, UNSORTED, 'entry is not sorted', fields=('msgid', 'msgctxt'))
+
+
+################################################################################
+# Cross-file validators
+_LANGUAGE = re.compile(r'^Language:[ \t]*(\S*)', re.MULTILINE)
+
+
+def _hash_texts(*texts):
+    """Return non-zero 64-bit hash of the texts, stable across processes."""
+    import hashlib
+    digest = hashlib.blake2b('\x04'.join(texts).encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+def entry_key(entry):
+    """Return hash of the msgctxt and msgid of the entry."""
+    if entry.msgctxt is None:
+        return _hash_texts(entry.msgid)
+    return _hash_texts(entry.msgctxt, entry.msgid)
+
+
+def translation_key(entry):
+    """Return hash of the translation of the entry or 0 if it isn't translated."""
+    if not entry.translated():
+        return 0
+    if entry.msgstr_plural:
+        return _hash_texts(*(entry.msgstr_plural[i] for i in sorted(entry.msgstr_plural)))
+    return _hash_texts(entry.msgstr)
+
+
+class FileIndex(object):
+    """Compact index of entries of a single file used by cross-file validators.
+
+    Entries are stored as hashes of their msgctxt and msgid and hashes of their translations in arrays, obsolete entries
+    are skipped.
+
+    @ivar filename: Name of the indexed file
+    @ivar language: Language from the header of the file, if any.
+    @ivar keys: Hashes of msgctxt and msgid of the entries, see `entry_key`.
+    @type keys: array
+    @ivar lines: Line numbers of the entries
+    @type lines: array
+    @ivar translations: Hashes of translations of the entries, see `translation_key`.
+    @type translations: array
+    """
+
+    # Entry fields read by the index
+    fields = ('msgid', 'msgctxt', 'msgstr', 'msgstr_plural', 'flags')
+
+    def __init__(self, filename):
+        """Initialize the empty index.
+
+        @param filename: Name of the indexed file
+        @type filename: text
+        """
+        self.filename = filename
+        self.language = None
+        self.keys = array('Q')
+        self.lines = array('L')
+        self.translations = array('Q')
+
+    @property
+    def is_template(self):
+        """Return whether the file is a template."""
+        return self.filename.endswith('.pot')
+
+    def set_header(self, header):
+        """Set properties of the file from its header entry."""
+        match = _LANGUAGE.search(header.msgstr)
+        self.language = match.group(1) if match and match.group(1) else None
+
+    def update(self, entries):
+        """Add entries to the index."""
+        for entry in entries:
+            if not entry.obsolete:
+                self.keys.append(entry_key(entry))
+                self.lines.append(entry.linenum)
+                self.translations.append(translation_key(entry))
+
+    def clear(self):
+        """Remove all entries from the index."""
+        self.__init__(self.filename)
+
+    def extend(self, other):
+        """Add entries from the index of another part of the file."""
+        self.keys.extend(other.keys)
+        self.lines.extend(other.lines)
+        self.translations.extend(other.translations)
+        if self.language is None:
+            self.language = other.language
+
+    def sort(self):
+        """Sort entries by their keys, entries with equal keys are kept in the order of lines."""
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.keys = array('Q', (self.keys[i] for i in order))
+        self.lines = array('L', (self.lines[i] for i in order))
+        self.translations = array('Q', (self.translations[i] for i in order))
+
+    def items(self):
+        """Return iterator of (key, line, translation) triples."""
+        return zip(self.keys, self.lines, self.translations)
+
+
+def index_file(filename):
+    """Return sorted index of the file."""
+    if _is_mo(filename):
+        stream = MOCatalog(filename)
+    else:
+        stream = MappedEntryStream(filename, fields=FileIndex.fields)
+    index = FileIndex(filename)
+    index.update(stream)
+    if stream.header is not None:
+        index.set_header(stream.header)
+    index.sort()
+    return index
+
+
+# Validators below are called with a list of sorted `FileIndex`es.
+def duplicate_validator(indexes):
+    """Yield (filename, line) pairs of entries which duplicate msgctxt and msgid of a previous entry in the file."""
+    for index in indexes:
+        for dummy_key, group in groupby(zip(index.keys, index.lines), key=operator.itemgetter(0)):
+            next(group)
+            for dummy_key, line in group:
+                yield index.filename, line
+
+
+REGISTER.register_cross_file(duplicate_validator, 'duplicate', 'entry is duplicate')
+
+
+def _find_template(filename, templates):
+    """Return index of the template of the file or `None` if there is none.
+
+    The template is searched in the directory of the file first, then by name of the file, i.e. the gettext domain.
+    """
+    dirname = os.path.dirname(filename)
+    domain = os.path.splitext(os.path.basename(filename))[0]
+    by_domain = None
+    for template in templates:
+        if os.path.dirname(template.filename) == dirname:
+            return template
+        if by_domain is None and os.path.splitext(os.path.basename(template.filename))[0] == domain:
+            by_domain = template
+    return by_domain
+
+
+def missing_validator(indexes):
+    """Yield errors of entries of templates which are missing in the translation files.
+
+    Errors are reported on line 0 of the translation file, the message points to the entry in the template.
+
+    @return: Generator of (filename, 0, message, fingerprint) tuples
+    """
+    templates = [i for i in indexes if i.is_template]
+    if not templates:
+        return
+    for index in indexes:
+        if index.is_template:
+            continue
+        template = _find_template(index.filename, templates)
+        if template is None:
+            continue
+        keys = index.keys
+        position = 0
+        for key, line in zip(template.keys, template.lines):
+            position = bisect_left(keys, key, position)
+            if position == len(keys) or keys[position] != key:
+                yield index.filename, 0, '%s:%d: missing entry\n' % (template.filename, line), key
+
+
+REGISTER.register_cross_file(missing_validator, 'missing', 'entry from the template is missing')
+
+
+def _translated_items(number, index):
+    """Yield (key, file number, line, translation) of translated entries in the index."""
+    for key, line, translation in index.items():
+        if translation:
+            yield key, number, line, translation
+
+
+def inconsistent_validator(indexes):
+    """Yield (filename, line) pairs of entries translated differently than in the first file of the same language.
+
+    Files without language in their header and templates are skipped.
+    """
+    languages = OrderedDict()
+    for file_number, index in enumerate(indexes):
+        if index.language is not None and not index.is_template:
+            languages.setdefault(index.language, []).append((file_number, index))
+    for files in languages.values():
+        if len(files) < 2:
+            continue
+        # Merge sorted indexes into a stream of (key, file number, line, translation) ordered by keys.
+        entries = heapq.merge(*(_translated_items(number, index) for number, index in files))
+        for dummy_key, group in groupby(entries, key=operator.itemgetter(0)):
+            dummy_key, first_number, dummy_line, first_translation = next(group)
+            for dummy_key, number, line, translation in group:
+                if number != first_number and translation != first_translation:
+                    yield indexes[number].filename, line
+
+
+REGISTER.register_cross_file(inconsistent_validator, 'inconsistent', 'translation differs from other files')
+
+
+def check_indexes(indexes, exclude=None, register=REGISTER, fingerprints=False):
+    """Run cross-file validators and return the errors found.
+
+    @param indexes: Sorted indexes of the linted files
+    @type indexes: [FileIndex, ...]
+    @param exclude: Set of validators to exclude
+    @type exclude: Set of strings
+    @param register: Validator register to be used
+    @type register: ValidatorRegister
+    @param fingerprints: Whether to include fingerprints of the failing entries in the errors
+    @type fingerprints: bool
+    @return: List of (filename, errors) pairs of files with errors, in the order of `indexes`.
+    """
+    failures = defaultdict(list)
+    for code, callback in register.validators.items():
+        if register.is_cross_file(code) and code not in (exclude or ()):
+            for failure in callback(indexes):
+                # Failure is either (filename, line) or (filename, line, message, fingerprint).
+                message, fingerprint = failure[2:] or ('', 0)
+                failures[failure[0]].append((failure[1], code, message, fingerprint))
+    result = []
+    for index in indexes:
+        if index.filename in failures:
+            keys = dict(zip(index.lines, index.keys)) if fingerprints else {}
+            errors = []
+            # Errors on the same line keep the order of the validator, e.g. of the template entries.
+            for line, code, message, fingerprint in sorted(failures.pop(index.filename), key=operator.itemgetter(0, 1)):
+                fingerprint = (fingerprint or keys.get(line)) if fingerprints else None
+                errors.append(LintError(index.filename, line, code, message or None, fingerprint))
+            result.append((index.filename, errors))
+    return result
+
+
+################################################################################
+# Compiled catalog validators
+#
+# Compiled catalogs are validated only by the batch validators from `MO_REGISTER`, which are run instead of
+# the validators with the same codes.
+def mo_sort_batch_validator(entries, previous):
+    """Return indices of entries of a compiled catalog which are not sorted by their raw keys.
+
+    gettext finds entries by binary search if the catalog has no hash table, which requires keys sorted by bytes.
+    """
+    keys = [entry.key for entry in entries]
+    start = 1
+    if previous is not None:
+        keys.insert(0, previous.key)
+        start = 0
+    following = keys[1:]
+    if all(map(operator.lt, keys, following)):
+        # Fast path for sorted entries
+        return []
+    return [i for i, is_sorted in enumerate(map(operator.lt, keys, following), start) if not is_sorted]
+
+
+def mo_duplicate_batch_validator(entries, previous):
+    """Return indices of entries of a compiled catalog which gettext doesn't find, since another entry has their key."""
+    failed = []
+    for i, entry in enumerate(entries):
+        found = entry.catalog.lookup(entry.key)
+        if found is not None and found != entry.index:
+            failed.append(i)
+    return failed
+
+
+MO_REGISTER = ValidatorRegister()
+MO_REGISTER.register_batch(untranslated_batch_validator, 'untranslated', REGISTER.errors['untranslated'], fields=())
+MO_REGISTER.register_batch(mo_sort_batch_validator, UNSORTED, REGISTER.errors[UNSORTED], fields=())
+MO_REGISTER.register_batch(mo_duplicate_batch_validator, 'duplicate', REGISTER.errors['duplicate'], fields=())
+
+
+################################################################################
+# Fixes
+# Error codes which can be fixed by `fix_file`
+FIXABLE = ('location', 'obsolete', UNSORTED)
+# Default number of entries sorted in memory by `fix_file`
+RUN_SIZE = 100000
+
+
+def _write_run(entries):
+    """Write sorted run of (key, text) pairs into a temporary file and return it."""
+    import pickle
+    import tempfile
+    run = tempfile.TemporaryFile()
+    for record in entries:
+        pickle.dump(record, run, pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    """Yield (key, text) pairs from the temporary file with a sorted run."""
+    import pickle
+    while True:
+        try:
+            yield pickle.load(run)
+        except EOFError:
+            return
+
+
+def _sort_external(records, run_size):
+    """Yield (key, text) pairs sorted by the key.
+
+    Runs of `run_size` records are sorted in memory, if there is more of them, they are merged from temporary files.
+    """
+    records = iter(records)
+    key = operator.itemgetter(0)
+    run = sorted(islice(records, run_size), key=key)
+    if len(run) < run_size:
+        # Everything fits into a single run.
+        yield from run
+        return
+    runs = []
+    try:
+        while run:
+            runs.append(_write_run(run))
+            run = sorted(islice(records, run_size), key=key)
+        yield from heapq.merge(*(_read_run(r) for r in runs), key=key)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _strip_occurrences(entries):
+    """Yield entries without their occurrences."""
+    for entry in entries:
+        entry.occurrences = []
+        yield entry
+
+
+def fix_file(filename, codes, collation='codepoint', run_size=RUN_SIZE):
+    """Rewrite the file to fix the errors in a single pass.
+
+    Obsolete entries are dropped, locations are stripped and entries are sorted, based on `codes`. Entries are sorted
+    on disk, if they don't fit into a single run. The file is replaced atomically once it's rewritten.
+
+    @param filename: Name of the file to be fixed
+    @type filename: text
+    @param codes: Error codes to be fixed, see `FIXABLE`
+    @type codes: Iterable of strings
+    @param collation: Name of the collation used to sort entries, see `COLLATIONS`.
+    @type collation: text
+    @param run_size: Number of entries sorted in memory
+    @type run_size: int
+    """
+    import polib
+    codes = set(codes)
+    encoding = polib.detect_encoding(filename)
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = polib.default_encoding
+    stream = EntryStream(filename, encoding=encoding)
+    entries = iter(stream)
+    # Parse the first entry to get the header.
+    first = next(entries, None)
+    entries = chain((first, ) if first is not None else (), entries)
+    if 'obsolete' in codes:
+        entries = (e for e in entries if not e.obsolete)
+    if 'location' in codes:
+        entries = _strip_occurrences(entries)
+    if UNSORTED in codes:
+        collate = COLLATIONS[collation]
+        texts = (text for dummy, text in _sort_external(((sort_key(e, collate), str(e)) for e in entries), run_size))
+    else:
+        texts = (str(e) for e in entries)
+    if stream.header is not None:
+        texts = chain((_format_header_comment(stream.header_comment) + str(stream.header), ), texts)
+    _replace_file(filename, texts, encoding)
+
+
+def _format_header_comment(comment):
+    """Return header comment formatted the same way as `polib.POFile` does."""
+    if not comment:
+        return ''
+    lines = []
+    for line in comment.split('\n'):
+        if not line:
+            lines.append('#\n')
+        elif line[:1] in (',', ':'):
+            lines.append('#%s\n' % line)
+        else:
+            lines.append('# %s\n' % line)
+    return ''.join(lines)
+
+
+def _replace_file(filename, texts, encoding):
+    """Atomically replace content of the file by entries separated by blank lines.
+
+    @param texts: Iterable of formatted entries
+    """
+    import tempfile
+    handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        with open(handle, 'w', encoding=encoding) as output:
+            for index, text in enumerate(texts):
+                if index:
+                    output.write('\n')
+                output.write(text)
+        os.chmod(tmp_path, os.stat(filename).st_mode & 0o7777)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+################################################################################
+# Cache
+class ResultCache(object):
+    """On-disk cache of linting results.
+
+    Results are stored in separate files keyed by the content of the linted file, enabled validators and polint
+    version. The least recently used results are removed once the cache exceeds its size.
+
+    @ivar directory: Directory with the cached results
+    @ivar max_size: Maximal size of the cache in bytes
+    """
+
+    suffix = '.json'
+    # Version of the format of stored results
+    format = 2
+
+    def __init__(self, directory, max_size=100 * 1024 * 1024):
+        """Initialize the cache.
+
+        @param directory: Directory with the cached results, it's created if it doesn't exist.
+        @type directory: text
+        @param max_size: Maximal size of the cache in bytes
+        @type max_size: int
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, filename, codes, show_msg=False, options=None):
+        """Return the cache key for the file.
+
+        @param filename: Name of the linted file
+        @type filename: text
+        @param codes: Codes of the enabled validators
+        @type codes: Iterable of strings
+        @param show_msg: Whether results contain entry texts
+        @type show_msg: bool
+        @param options: Other options which affect the results
+        @type options: Dictionary of JSON serializable values
+        """
+        import hashlib
+        import json
+        key = hashlib.sha256()
+        with open(filename, 'rb') as pofile:
+            for block in iter(lambda: pofile.read(1024 * 1024), b''):
+                key.update(block)
+        key.update(json.dumps([sorted(codes), show_msg, sorted((options or {}).items()), __version__,
+                               self.format]).encode())
+        return key.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key, filename):
+        """Return cached errors or `None` if result is not cached.
+
+        @param key: Cache key
+        @param filename: Name of the linted file
+        @rtype: LintResult or None
+        """
+        import json
+        path = self._path(key)
+        try:
+            with open(path) as cache_file:
+                data = json.load(cache_file)
+            # Mark the result as recently used.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        result = LintResult(filename)
+        for line, codes, message, fingerprint in data:
+            for code in codes:
+                result.errors.add(line, code, fingerprint)
+            if message is not None:
+                result.messages[line] = message
+        return result
+
+    def set(self, key, result):
+        """Store errors in the cache.
+
+        @param key: Cache key
+        @param result: Errors found in the file
+        @type result: LintResult
+        """
+        import json
+        import tempfile
+
+        # Errors are stored as [line, [code, ...], message, fingerprint] lists for each failing entry.
+        fingerprints = result.errors.fingerprints()
+        data = [[line, codes, result.messages.get(line), fingerprints.get(line, 0)]
+                for line, codes in result.errors.lines()]
+        handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        with os.fdopen(handle, 'w') as cache_file:
+            json.dump(data, cache_file)
+        os.replace(tmp_path, self._path(key))
+
+    def prune(self):
+        """Remove least recently used results until the cache fits into its size."""
+        cached = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(self.suffix):
+                    stat = entry.stat()
+                    cached.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(c[1] for c in cached)
+        for dummy_mtime, file_size, path in sorted(cached):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already removed by someone else.
+                pass
+            size -= file_size
+
+
+class MemoryCache(object):
+    """In-memory cache of linting results.
+
+    Results are keyed by the file name, its modification time and size, enabled validators and polint version.
+    The least recently used results are removed once the cache exceeds its size.
+
+    @ivar max_entries: Maximal number of cached results
+    """
+
+    def __init__(self, max_entries=10000):
+        """Initialize the cache.
+
+        @param max_entries: Maximal number of cached results
+        @type max_entries: int
+        """
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+
+    def get_key(self, filename, codes, show_msg=False, options=None):
+        """Return the cache key for the file.
+
+        @param filename: Name of the linted file
+        @type filename: text
+        @param codes: Codes of the enabled validators
+        @type codes: Iterable of strings
+        @param show_msg: Whether results contain entry texts
+        @type show_msg: bool
+        @param options: Other options which affect the results
+        @type options: Dictionary of JSON serializable values
+        """
+        stat = os.stat(filename)
+        return (os.path.realpath(filename), stat.st_mtime_ns, stat.st_size, tuple(sorted(codes)), show_msg,
+                tuple(sorted((options or {}).items())))
+
+    def get(self, key, filename):
+        """Return cached errors or `None` if result is not cached.
+
+        @param key: Cache key
+        @param filename: Name of the linted file
+        @rtype: LintResult or None
+        """
+        data = self._results.get(key)
+        if data is None:
+            return None
+        self._results.move_to_end(key)
+        return LintResult(filename, *data)
+
+    def set(self, key, result):
+        """Store errors in the cache.
+
+        @param key: Cache key
+        @param result: Errors found in the file
+        @type result: LintResult
+        """
+        self._results[key] = (result.errors, result.messages)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def prune(self):
+        """Do nothing, the cache is pruned as results are added."""
+
+
+################################################################################
+# Baseline
+class Baseline(object):
+    """Known errors which aren't reported.
+
+    Errors are keyed by the file, error code and fingerprint of the failing entry, see `entry_key`, so they match
+    even if the entry moves within the file. Files are identified by their paths relative to the baseline file.
+
+    The baseline file consists of a header, names of error codes and files separated by NUL characters, offsets of
+    records of each file and the records themselves, stored as an array of fingerprints and an array of indices of
+    error codes. Only the names are decoded when the baseline is loaded, records of a file are decoded once the file is
+    filtered.
+
+    @ivar path: Path to the baseline file
+    @ivar loaded: Whether the baseline was loaded from the file
+    """
+
+    magic = b'POLINTBL'
+    version = 1
+    # Magic, version, number of codes, number of files, number of records and size of names in bytes
+    _header = struct.Struct('<8sIIIII')
+
+    def __init__(self, path):
+        """Initialize an empty baseline.
+
+        @param path: Path to the baseline file
+        @type path: text
+        """
+        self.path = path
+        self.loaded = False
+        self._directory = os.path.dirname(os.path.abspath(path))
+        self._codes = []
+        # Dictionary of (name, file number) pairs of the loaded files
+        self._files = {}
+        self._offsets = array('I', [0])
+        self._fingerprints = array('Q')
+        self._code_indices = array('H')
+        # Dictionary of (name, {(code, fingerprint), ...}) pairs of decoded files
+        self._records = {}
+
+    @classmethod
+    def load(cls, path):
+        """Load the baseline from the file.
+
+        @param path: Path to the baseline file
+        @type path: text
+        @rtype: Baseline
+        @raise ValueError: If the file isn't a valid baseline file.
+        """
+        with open(path, 'rb') as baseline_file:
+            data = memoryview(baseline_file.read())
+        if len(data) < cls._header.size:
+            raise ValueError('Invalid baseline file %s: file is truncated' % path)
+        magic, version, codes, files, records, names_size = cls._header.unpack_from(data)
+        if magic != cls.magic or version != cls.version:
+            raise ValueError('Invalid baseline file %s: unknown format' % path)
+        offset = cls._header.size + names_size
+        if len(data) != offset + 4 * (files + 1) + 10 * records:
+            raise ValueError('Invalid baseline file %s: size of the file doesn\'t match' % path)
+        names = str(data[cls._header.size:offset], 'utf-8').split('\0') if names_size else []
+        if len(names) != codes + files:
+            raise ValueError('Invalid baseline file %s: number of names doesn\'t match' % path)
+
+        baseline = cls(path)
+        baseline._codes = names[:codes]
+        baseline._files = dict(zip(names[codes:], range(files)))
+        baseline._offsets = array('I')
+        for table, size in ((baseline._offsets, 4 * (files + 1)), (baseline._fingerprints, 8 * records),
+                            (baseline._code_indices, 2 * records)):
+            table.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big':
+                table.byteswap()
+            offset += size
+        baseline.loaded = True
+        return baseline
+
+    def _name(self, filename):
+        """Return name of the file in the baseline."""
+        return os.path.relpath(os.path.abspath(filename), self._directory).replace(os.sep, '/')
+
+    def _get_records(self, name):
+        """Return set of (code, fingerprint) pairs of the file."""
+        records = self._records.get(name)
+        if records is None:
+            records = self._records[name] = set()
+            number = self._files.get(name)
+            if number is not None:
+                start, end = self._offsets[number], self._offsets[number + 1]
+                codes = self._codes
+                records.update(zip((codes[i] for i in self._code_indices[start:end]), self._fingerprints[start:end]))
+        return records
+
+    def add(self, filename, errors):
+        """Add errors found in the file to the baseline.
+
+        @param filename: Name of the linted file
+        @type filename: text
+        @param errors: Errors found in the file, errors without fingerprint are skipped.
+        @type errors: LintResult or [LintError, ...]
+        """
+        records = self._get_records(self._name(filename))
+        records.update((e.code, e.fingerprint) for e in errors if e.fingerprint is not None)
+
+    def filter(self, filename, errors):
+        """Return errors found in the file which aren't in the baseline.
+
+        @param filename: Name of the linted file
+        @type filename: text
+        @param errors: Errors found in the file
+        @type errors: LintResult or [LintError, ...]
+        @rtype: [LintError, ...]
+        """
+        if not errors:
+            return errors
+        records = self._get_records(self._name(filename))
+        return [e for e in errors if (e.code, e.fingerprint) not in records]
+
+    def save(self):
+        """Save the baseline to its file."""
+        names = sorted(set(self._files).union(self._records))
+        codes = OrderedDict()
+        offsets = array('I', [0])
+        fingerprints = array('Q')
+        code_indices = array('H')
+        for name in names:
+            for code, fingerprint in sorted(self._get_records(name)):
+                code_indices.append(codes.setdefault(code, len(codes)))
+                fingerprints.append(fingerprint)
+            offsets.append(len(fingerprints))
+        names_data = '\0'.join(chain(codes, names)).encode('utf-8')
+        header = self._header.pack(self.magic, self.version, len(codes), len(names), len(fingerprints), len(names_data))
+        import tempfile
+        handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+        with os.fdopen(handle, 'wb') as baseline_file:
+            baseline_file.write(header)
+            baseline_file.write(names_data)
+            for table in (offsets, fingerprints, code_indices):
+                if sys.byteorder == 'big':
+                    table.byteswap()
+                table.tofile(baseline_file)
+        os.replace(tmp_path, self.path)
+
+
+################################################################################
+# Daemon
+def is_daemon_supported():
+    """Return whether the daemon is supported on this platform, it requires Unix sockets."""
+    import socket
+    return hasattr(socket, 'AF_UNIX')
+
+
+def get_socket_path(options):
+    """Return path to the socket of the daemon based on command line options.
+
+    The socket is in the runtime directory of the user by default or in a directory of the user in the temporary
+    directory, so other users can't take its place.
+    """
+    if options['--socket']:
+        return options['--socket']
+    import tempfile
+    directory = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(tempfile.gettempdir(), 'polint-%s' % os.getuid())
+    return os.path.join(directory, 'polint.sock')
+
+
+def _peer_uid(connection):
+    """Return user ID of the peer of the Unix socket connection or `None` if it can't be found out."""
+    import socket
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = struct.Struct('3i')
+    return credentials.unpack(connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size))[1]
+
+
+class LintServer(object):
+    """Daemon which lints files for clients.
+
+    It keeps the validators loaded and caches the results in memory, so clients don't pay the startup costs.
+    Requests are handled one at a time and only requests of the user who runs the daemon are handled.
+
+    Request is a JSON object with command line arguments and working directory of the client terminated by a newline.
+    Response is a JSON object with the exit code and outputs terminated by a newline.
+
+    @ivar register: Validator register to be used
+    @ivar cache: Cache of the results
+    """
+
+    def __init__(self, path, register=REGISTER):
+        """Initialize the server.
+
+        @param path: Path to the socket, it's accessible only by the owner.
+        @param register: Validator register to be used
+        @type register: ValidatorRegister
+        """
+        import socketserver
+        self.register = register
+        self.cache = MemoryCache()
+        self._server = socketserver.UnixStreamServer(path, self._handle, bind_and_activate=False)
+        try:
+            # Create the socket with permissions for the owner only, so no one can connect before they're set.
+            umask = os.umask(0o177)
+            try:
+                self._server.server_bind()
+            finally:
+                os.umask(umask)
+            self._server.server_activate()
+        except BaseException:
+            self._server.server_close()
+            raise
+
+    def __enter__(self):
+        """Return the server itself."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the server."""
+        self.server_close()
+
+    def serve_forever(self):
+        """Handle requests until `shutdown` is called."""
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Stop the `serve_forever` loop and wait until it stops."""
+        self._server.shutdown()
+
+    def server_close(self):
+        """Close the socket."""
+        self._server.server_close()
+
+    def _handle(self, connection, dummy_address, dummy_server):
+        """Handle the request on the connection, it's called by the `socketserver` for each connection."""
+        import json
+        peer_uid = _peer_uid(connection)
+        if peer_uid is not None and peer_uid != os.getuid():
+            return
+        with connection.makefile('rb') as request_file:
+            request = json.loads(request_file.readline().decode('utf-8'))
+        connection.sendall(json.dumps(self.respond(request)).encode('utf-8') + b'\n')
+
+    def respond(self, request):
+        """Lint files for the request and return the response.
+
+        Errors, e.g. from malformed files, are reported in the response as they would be by the command itself.
+
+        @param request: Dictionary with command line arguments and working directory of the client
+        @return: Dictionary with the exit code and outputs
+        """
+        output = StringIO()
+        error_output = StringIO()
+        try:
+            os.chdir(request['cwd'])
+            options = parse_args(request['args'])
+            exit_code = run(options, output, register=self.register, cache=self.cache, error_output=error_output)
+        except SystemExit as error:
+            exit_code = error.code
+        except Exception:
+            import traceback
+            error_output.write(traceback.format_exc())
+            exit_code = 1
+        return {'exit_code': exit_code, 'output': output.getvalue(), 'error_output': error_output.getvalue()}
+
+
+def serve(path, register=REGISTER):
+    """Run the daemon until it's interrupted.
+
+    @param path: Path to the socket
+    @param register: Validator register to be used
+    @type register: ValidatorRegister
+    """
+    # Default directory of the socket in the temporary directory has to be created.
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+    if os.path.exists(path):
+        if os.stat(path).st_uid != os.getuid():
+            sys.exit('Socket %s is owned by another user' % path)
+        if forward(path, []) is not None:
+            sys.exit('Daemon is already running on %s' % path)
+        # Remove stale socket.
+        os.remove(path)
+    with LintServer(path, register=register) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(path)
+
+
+def forward(path, args, output=sys.stdout, error_output=None):
+    """Forward the linting to the daemon.
+
+    Only daemon run by the same user is used.
+
+    @param path: Path to the socket
+    @param args: Command line arguments
+    @param output: Standard output file object
+    @param error_output: Standard error output file object, `sys.stderr` by default
+    @return: Exit code or `None` if daemon isn't running.
+    """
+    import json
+    import socket
+    error_output = error_output or sys.stderr
+    request = {'args': args, 'cwd': os.getcwd()}
+    try:
+        if os.stat(path).st_uid != os.getuid():
+            error_output.write('Ignoring socket %s owned by another user\n' % path)
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            peer_uid = _peer_uid(client)
+            if peer_uid is not None and peer_uid != os.getuid():
+                error_output.write('Ignoring daemon on %s run by another user\n' % path)
+                return None
+            client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with client.makefile('rb') as response_file:
+                response = response_file.readline()
+    except OSError:
+        return None
+    if not response:
+        return None
+    response = json.loads(response.decode('utf-8'))
+    output.write(response['output'])
+    error_output.write(response['error_output'])
+    return response['exit_code']
+
+
+################################################################################
+# Polint command
+MSG_FORMAT = '%(filename)s:%(line)s: [%(error)s] %(description)s\n'
+
+LintError = namedtuple('LintError', ('filename', 'line', 'code', 'message', 'fingerprint'), defaults=(None, ))
+LintError.__doc__ = """Error found in a file.
+
+@ivar filename: Name of the linted file
+@ivar line: Line number of the failing entry
+@ivar code: Error code
+@ivar message: Text of the failing entry, if requested
+@ivar fingerprint: Hash of msgctxt and msgid of the failing entry, see `entry_key`, if requested
+"""
+
+
+class LintResult(object):
+    """Errors found in a file.
+
+    Errors are kept in a compact `ErrorList`, `LintError` records are created only while the result is iterated.
+    Otherwise the result behaves like a list of `LintError` records.
+
+    @ivar filename: Name of the linted file
+    @ivar errors: Errors found in the file, fingerprints are included if they're known.
+    @type errors: ErrorList
+    @ivar messages: Dictionary of (line, text) pairs of failing entries, if requested
+    """
+
+    __slots__ = ('filename', 'errors', 'messages')
+
+    def __init__(self, filename, errors=None, messages=None):
+        """Initialize the result.
+
+        @param filename: Name of the linted file
+        @type filename: text
+        @param errors: Errors found in the file, none by default.
+        @type errors: ErrorList
+        @param messages: Dictionary of (line, text) pairs of failing entries
+        @type messages: dict
+        """
+        self.filename = filename
+        self.errors = ErrorList(filename) if errors is None else errors
+        self.messages = messages or {}
+
+    def __len__(self):
+        """Return number of errors."""
+        return self.errors.error_count
+
+    def __iter__(self):
+        """Yield `LintError` records of the errors."""
+        filename = self.filename
+        messages = self.messages
+        for line, code, fingerprint in self.errors.records():
+            yield LintError(filename, line, code, messages.get(line), fingerprint or None)
+
+    def __getitem__(self, index):
+        """Return the error at the index or the errors in the slice.
+
+        Slices from the start are returned as `LintResult`, other slices as lists.
+        """
+        if isinstance(index, slice) and index.start is None and index.step is None:
+            if index.stop is None:
+                return self
+            return type(self)(self.filename, self.errors.head(index.stop), self.messages)
+        return list(self)[index]
+
+    def __eq__(self, other):
+        """Return whether the other result or list contains the same errors."""
+        if not isinstance(other, (LintResult, list, tuple)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        """Return representation of the result."""
+        return '<%s %s: %d errors>' % (type(self).__name__, self.filename, len(self))
+
+    def items(self):
+        """Yield (entry, [error_code, ...]) pairs of failing entries, see `ErrorList.items`."""
+        return self.errors.items()
+
+
+class IgnoreRules(object):
+    """Rules from .gitignore files.
+
+    Only a subset of gitignore syntax is supported: glob patterns, negation, directory only patterns and patterns
+    anchored to the directory of the .gitignore file.
+    """
+
+    filename = '.gitignore'
+
+    def __init__(self, rules=()):
+        """Initialize rules.
+
+        @param rules: Sequence of (base directory, pattern, negate, directory only) tuples.
+        """
+        self.rules = tuple(rules)
+
+    def extend(self, directory):
+        """Return rules extended by .gitignore file in directory, if there is any."""
+        try:
+            with open(os.path.join(directory, self.filename)) as gitignore:
+                lines = gitignore.read().splitlines()
+        except OSError:
+            return self
+        rules = list(self.rules)
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            pattern = line[1:] if negate else line
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            if pattern:
+                rules.append((directory, pattern, negate, dir_only))
+        return type(self)(rules)
+
+    def is_ignored(self, path, is_dir):
+        """Return whether path is ignored.
+
+        @param path: Path to the file or directory
+        @param is_dir: Whether path is a directory
+        """
+        ignored = False
+        for base, pattern, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if '/' in pattern:
+                matched = fnmatch.fnmatch(os.path.relpath(path, base).replace(os.sep, '/'), pattern.lstrip('/'))
+            else:
+                matched = fnmatch.fnmatch(os.path.basename(path), pattern)
+            if matched:
+                ignored = not negate
+        return ignored
+
+
+def _scan(directory):
+    """Return modification time of the directory and its entries sorted by name or `None` if it can't be read."""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as entries:
+            return mtime, sorted(entries, key=lambda e: e.name)
+    except OSError:
+        return None
+
+
+def _walk(directory, patterns, exclude_dirs, ignore, directories=None):
+    """Yield files in directory matching patterns.
+
+    Excluded and ignored directories are skipped without being searched.
+
+    @param directories: Dictionary to store (directory, (modification time, ignore rules)) pairs of searched
+        directories, if provided.
+    """
+    scanned = _scan(directory)
+    if scanned is None:
+        # Directory which can't be read is skipped, same as by `os.walk`.
+        return
+    mtime, entries = scanned
+    if directories is not None:
+        directories[directory] = (mtime, ignore)
+    if ignore is not None:
+        ignore = ignore.extend(directory)
+    for entry in entries:
+        if entry.is_dir():
+            # Do not follow symlinks, same as `os.walk`.
+            if entry.is_symlink() or any(fnmatch.fnmatch(entry.name, p) for p in exclude_dirs):
+                continue
+            if ignore is not None and (entry.name == '.git' or ignore.is_ignored(entry.path, True)):
+                continue
+            yield from _walk(entry.path, patterns, exclude_dirs, ignore, directories)
+        elif any(fnmatch.fnmatch(entry.name, p) for p in patterns):
+            if ignore is None or not ignore.is_ignored(entry.path, False):
+                yield entry.path
+
+
+def get_files(paths, patterns=('*.po', ), exclude_dirs=(), gitignore=False):
+    """Return only paths to files to be linted.
+
+    Files are yielded as they are found, so linting may start before the search is complete. Compiled MO catalogs are
+    linted as well, but only PO files are searched for by default.
+
+    @param paths: List of files or directories to be linted.
+    @param patterns: Patterns of files to be searched for in directories.
+    @param exclude_dirs: Patterns of directories which are not searched.
+    @param gitignore: Whether to skip files ignored by .gitignore files.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            yield from _walk(path, patterns, exclude_dirs, IgnoreRules() if gitignore else None)
+        else:
+            yield path
+
+
+def _stat(path):
+    """Return (modification time, size) of a file or `None` if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _is_under(path, directory):
+    """Return whether path is the directory or inside it."""
+    return path == directory or path.startswith(os.path.join(directory, ''))
+
+
+class Watcher(object):
+    """Watcher of files to be linted.
+
+    Files are polled for changes of their modification time or size. Directories are searched again only if their
+    modification time changes, i.e. if files are added or removed from them.
+    """
+
+    def __init__(self, paths, patterns=('*.po', ), exclude_dirs=(), gitignore=False):
+        """Initialize the watcher and search the directories.
+
+        @param paths: List of files or directories to be linted.
+        @param patterns: Patterns of files to be searched for in directories.
+        @param exclude_dirs: Patterns of directories which are not searched.
+        @param gitignore: Whether to skip files ignored by .gitignore files.
+        """
+        self.patterns = patterns
+        self.exclude_dirs = exclude_dirs
+        # Dictionary of (filename, (modification time, size)) pairs
+        self._files = OrderedDict()
+        # Dictionary of (directory, (modification time, ignore rules)) pairs
+        self._dirs = {}
+        self._explicit = set()
+        for path in paths:
+            if os.path.isdir(path):
+                for filename in _walk(path, patterns, exclude_dirs, IgnoreRules() if gitignore else None, self._dirs):
+                    self._files[filename] = None
+            else:
+                self._files[path] = None
+                self._explicit.add(path)
+
+    def _search(self, directory):
+        """Search the changed directory again and return lists of added and removed files."""
+        ignore = self._dirs[directory][1]
+        for searched in [d for d in self._dirs if _is_under(d, directory)]:
+            del self._dirs[searched]
+        found = set()
+        if os.path.isdir(directory):
+            found.update(_walk(directory, self.patterns, self.exclude_dirs, ignore, self._dirs))
+        known = {f for f in self._files if _is_under(f, directory) and f not in self._explicit}
+        return sorted(found - known), sorted(known - found)
+
+    def poll(self):
+        """Return lists of changed and removed files since the last poll.
+
+        All existing files are considered changed by the first poll.
+        """
+        changed_dirs = []
+        for directory in sorted(self._dirs):
+            if any(_is_under(directory, d) for d in changed_dirs):
+                continue
+            stat = _stat(directory)
+            if stat is None or stat[0] != self._dirs[directory][0]:
+                changed_dirs.append(directory)
+
+        removed = []
+        for directory in changed_dirs:
+            added, dir_removed = self._search(directory)
+            for filename in added:
+                self._files[filename] = None
+            for filename in dir_removed:
+                del self._files[filename]
+            removed.extend(dir_removed)
+
+        changed = []
+        for filename, old_stat in self._files.items():
+            stat = _stat(filename)
+            if stat != old_stat:
+                self._files[filename] = stat
+                if stat is None:
+                    removed.append(filename)
+                else:
+                    changed.append(filename)
+        return changed, removed
+
+
+def _git(*args):
+    """Run git command and return its output split on NUL characters."""
+    import subprocess
+    output = subprocess.run(('git', ) + args, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+    return [os.fsdecode(path) for path in output.split(b'\0') if path]
+
+
+def get_changed_files(ref):
+    """Return paths to files changed since the git reference, including untracked files.
+
+    Only the local git repository in current working directory is inspected.
+
+    @param ref: Git reference, e.g. commit or branch name
+    @type ref: text
+    @return: Set of real paths
+    @raises subprocess.CalledProcessError: If git command fails.
+    """
+    toplevel = _git('rev-parse', '--show-toplevel')[0].rstrip('\n')
+    changed = _git('diff', '--name-only', '--no-renames', '-z', ref, '--')
+    # List untracked files of the whole repository, not only those below the working directory.
+    changed.extend(_git('-C', toplevel, 'ls-files', '--others', '--exclude-standard', '-z'))
+    return {os.path.realpath(os.path.join(toplevel, path)) for path in changed}
+
+
+def filter_changed(filenames, changed):
+    """Yield only files which have changed.
+
+    @param filenames: Iterable of file names
+    @param changed: Set of real paths of changed files
+    """
+    for filename in filenames:
+        if os.path.realpath(filename) in changed:
+            yield filename
+
+
+def lint_file(filename, exclude=None, register=REGISTER, show_msg=False, cache=None, profile=None, executor=None,
+              parts=1, sort_moves=False, collation='codepoint', fix=False, index=None, max_errors=None,
+              fingerprints=False):
+    """Lint a single file and return the errors found.
+
+    The result contains only plain data, so it can be passed between processes.
+
+    @param filename: Name of the file to be linted
+    @type filename: text
+    @param exclude: Set of validators to exclude
+    @type exclude: Set of strings
+    @param register: Validator register to be used
+    @type register: ValidatorRegister
+    @param show_msg: Whether to include the text of the entry in the result
+    @type show_msg: bool
+    @param cache: Cache of the results
+    @type cache: ResultCache
+    @param profile: Profile to collect timing of validators
+    @type profile: Profile
+    @param executor: Executor which validates parts of the file, if it's split.
+    @type executor: concurrent.futures.Executor
+    @param parts: Number of parts the file is split into
+    @type parts: int
+    @param sort_moves: Whether to report entries which have to be moved to sort the file instead of entries which
+        aren't sorted.
+    @type sort_moves: bool
+    @param collation: Name of the collation used to find entries to be moved, see `COLLATIONS`.
+    @type collation: text
+    @param fix: Whether to fix errors which can be fixed, see `FIXABLE`. Errors which remain are returned. Compiled
+        catalogs are never fixed.
+    @type fix: bool
+    @param index: Index to be filled with entries of the file for cross-file validators
+    @type index: FileIndex
+    @param max_errors: Maximal number of errors returned, the validation stops once they're found.
+    @type max_errors: int
+    @param fingerprints: Whether to include fingerprints of the failing entries in the result, see `entry_key`.
+    @type fingerprints: bool
+    @rtype: LintResult
+    """
+    kwargs = {'exclude': exclude, 'register': register, 'show_msg': show_msg, 'cache': cache, 'profile': profile,
+              'executor': executor, 'parts': parts, 'sort_moves': sort_moves, 'collation': collation,
+              'fingerprints': fingerprints}
+    fix = fix and not _is_mo(filename)
+    # All errors are needed to find out which can be fixed.
+    result = _lint_file(filename, index=index, max_errors=None if fix else max_errors, **kwargs)
+    if fix:
+        fixable = {error.code for error in result if error.code in FIXABLE}
+        if fixable:
+            fix_file(filename, fixable, collation=collation)
+            if index is not None:
+                index.clear()
+            result = _lint_file(filename, index=index, max_errors=max_errors, **kwargs)
+    return result[:max_errors]
+
+
+def _lint_file(filename, exclude, register, show_msg, cache, profile, executor, parts, sort_moves, collation, index,
+               max_errors, fingerprints):
+    """Lint a single file and return the errors found, see `lint_file` for arguments.
+
+    Errors may exceed `max_errors`, results of the validation which was stopped aren't cached.
+    """
+    if cache is not None:
+        key = cache.get_key(filename, (c for c in register.validators if c not in (exclude or ())), show_msg,
+                            options={'sort_moves': sort_moves, 'collation': collation, 'fingerprints': fingerprints})
+        result = cache.get(key, filename)
+        if result is not None:
+            if index is not None:
+                # Cached results don't contain the index.
+                index.extend(index_file(filename))
+            return result
+
+    linter = Linter(filename, exclude=exclude, register=register, profile=profile, executor=executor, parts=parts,
+                    index=index, max_errors=max_errors, fingerprints=fingerprints)
+    linter.run_validators()
+    if sort_moves and not _is_mo(filename) and any(UNSORTED in codes for dummy, codes in linter.errors.lines()):
+        # Only files which aren't sorted are searched for entries to be moved.
+        linter.errors = linter.errors.replace(UNSORTED, find_misplaced(filename, collation))
+    messages = linter.get_messages(e.linenum for e in linter.errors) if show_msg and linter.errors else {}
+    if fingerprints:
+        _set_fingerprints(linter)
+    result = LintResult(filename, linter.errors, messages)
+
+    if cache is not None and not linter.is_stopped():
+        cache.set(key, result)
+    return result
+
+
+def _set_fingerprints(linter):
+    """Set fingerprints of entries which failed in the linter, if they're unknown.
+
+    Entries moved to sort the file don't have to fail the validation, their fingerprints are found in the file.
+    """
+    unknown = {line for line, dummy, fingerprint in linter.errors.records() if not fingerprint}
+    if unknown:
+        linter.errors.set_fingerprints(linter.get_fingerprints(unknown))
+
+
+def _lint_file_worker(filename, profile=False, index=False, **kwargs):
+    """Lint a single file in a worker process and return errors together with the profile and the sorted index.
+
+    @param profile: Whether to collect the profile
+    @param index: Whether to collect the index
+    @return: Tuple of (errors, profile, index), profile and index are `None` if not collected.
+    """
+    file_profile = Profile() if profile else None
+    errors, file_index = _lint_indexed(filename, index, profile=file_profile, **kwargs)
+    return errors, file_profile, file_index
+
+
+def _lint_indexed(filename, index, **kwargs):
+    """Lint a single file and return errors together with the sorted index.
+
+    @param index: Whether to collect the index
+    @param kwargs: Other arguments passed to `lint_file`
+    @return: Tuple of (errors, index), index is `None` if not collected.
+    """
+    file_index = FileIndex(filename) if index else None
+    errors = lint_file(filename, index=file_index, **kwargs)
+    if file_index is not None:
+        file_index.sort()
+    return errors, file_index
+
+
+class _ErrorBudget(object):
+    """Budget of errors yielded by `lint_files`.
+
+    @ivar remaining: Number of errors which may be yielded, unlimited if `None`.
+    @ivar fail_fast: Whether to stop after the first file with errors
+    @ivar exhausted: Whether the linting should stop
+    """
+
+    def __init__(self, max_errors=None, fail_fast=False):
+        """Initialize the budget.
+
+        @param max_errors: Maximal number of errors, unlimited by default.
+        @param fail_fast: Whether to stop after the first file with errors
+        """
+        self.remaining = max_errors
+        self.fail_fast = fail_fast
+        self.exhausted = False
+
+    def spend(self, errors):
+        """Return errors which fit into the budget and subtract them from it."""
+        if self.remaining is not None:
+            errors = errors[:self.remaining]
+            self.remaining -= len(errors)
+            if not self.remaining:
+                self.exhausted = True
+        if errors and self.fail_fast:
+            self.exhausted = True
+        return errors
+
+
+def lint_files(filenames, jobs=1, profile=None, split_size=None, cross_file=False, fail_fast=False, max_errors=None,
+               baseline=None, **kwargs):
+    """Lint files and yield the results in the order of `filenames`.
+
+    If cross-file validators are enabled, their errors are yielded once all files are linted, so a file may be yielded
+    twice. Once the linting stops due to `fail_fast` or `max_errors`, the remaining work is cancelled. Errors from
+    the baseline are neither yielded nor counted in `max_errors`.
+
+    @param filenames: Iterable of file names to be linted
+    @param jobs: Number of processes used for linting
+    @type jobs: int
+    @param profile: Profile to collect timing of validators
+    @type profile: Profile
+    @param split_size: Size in bytes of files which are split into parts linted in parallel, `None` to disable
+    @type split_size: int
+    @param cross_file: Whether to run cross-file validators
+    @type cross_file: bool
+    @param fail_fast: Whether to stop after the first file with errors
+    @type fail_fast: bool
+    @param max_errors: Maximal number of errors yielded in total, the linting stops once they're found.
+    @type max_errors: int
+    @param baseline: Baseline of errors which aren't yielded, their fingerprints are included in the errors.
+    @type baseline: Baseline
+    @param kwargs: Other arguments passed to `lint_file`
+    @return: Generator of (filename, errors) pairs
+    """
+    budget = _ErrorBudget(max_errors, fail_fast)
+    file_budget = budget
+    if baseline is not None:
+        kwargs['fingerprints'] = True
+        # Errors from the baseline may be found first, so files are linted with unlimited budget.
+        file_budget = _ErrorBudget()
+    indexes = [] if cross_file else None
+    results = _lint_files(filenames, jobs, profile, split_size, cross_file, file_budget, kwargs)
+    try:
+        for filename, errors, index in results:
+            if index is not None:
+                indexes.append(index)
+            yield filename, budget.spend(errors if baseline is None else baseline.filter(filename, errors))
+            if budget.exhausted:
+                return
+    finally:
+        results.close()
+    if cross_file:
+        for filename, errors in check_indexes(indexes, exclude=kwargs.get('exclude'),
+                                              register=kwargs.get('register', REGISTER),
+                                              fingerprints=baseline is not None):
+            yield filename, budget.spend(errors if baseline is None else baseline.filter(filename, errors))
+            if budget.exhausted:
+                return
+
+
+def _lint_files(filenames, jobs, profile, split_size, cross_file, budget, kwargs):
+    """Lint files and yield (filename, errors, sorted index) triples, see `lint_files` for arguments.
+
+    Each file is linted with the errors remaining in the budget. Work which wasn't collected is cancelled once
+    the generator is closed.
+    """
+    if jobs == 1:
+        for filename in filenames:
+            yield (filename, ) + _lint_indexed(filename, cross_file, profile=profile, max_errors=budget.remaining,
+                                               **kwargs)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    cancel = multiprocessing.Event()
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(cancel, )) as executor:
+        # Submit files as they come, but keep the number of pending results bounded.
+        pending = deque()
+        try:
+            for filename in filenames:
+                pending.append(_submit_file(executor, filename, jobs, profile, split_size, cross_file, budget, kwargs))
+                if len(pending) >= 2 * jobs:
+                    filename, dummy_future, result = pending.popleft()
+                    yield (filename, ) + result()
+            while pending:
+                filename, dummy_future, result = pending.popleft()
+                yield (filename, ) + result()
+        finally:
+            # Stop running workers and drop the files which weren't started yet.
+            cancel.set()
+            for dummy_filename, future, dummy_result in pending:
+                if future is not None:
+                    future.cancel()
+
+
+def _submit_file(executor, filename, jobs, profile, split_size, cross_file, budget, kwargs):
+    """Submit the file to be linted by the executor, see `lint_files` for arguments.
+
+    @return: Tuple of (filename, future, result), where `result` returns (errors, sorted index) of the file and
+        `future` is `None` for files split into parts.
+    """
+    stat = _stat(filename)
+    if split_size is not None and stat is not None and stat[1] > split_size:
+        # Split the huge file into parts, they are submitted once the previous results are collected.
+        return filename, None, partial(_lint_indexed, filename, cross_file, profile=profile, executor=executor,
+                                       parts=jobs, max_errors=budget.remaining, **kwargs)
+
+    def _result():
+        errors, file_profile, index = future.result()
+        if profile is not None:
+            profile.update(file_profile)
+        return errors, index
+
+    future = executor.submit(_lint_file_worker, filename, profile=profile is not None, index=cross_file,
+                             max_errors=budget.remaining, **kwargs)
+    return filename, future, _result
+
+
+async def async_lint_files(filenames, concurrency=1, executor=None, profile=None, **kwargs):
+    """Lint files in an executor and yield the results in the order of `filenames`.
+
+    Linting doesn't block the event loop, at most `concurrency` files are linted at once.
+
+    @param filenames: Iterable of file names to be linted
+    @param concurrency: Number of files linted at once
+    @type concurrency: int
+    @param executor: Executor which lints the files, a process pool is used by default.
+    @type executor: concurrent.futures.Executor
+    @param profile: Profile to collect timing of validators
+    @type profile: Profile
+    @param kwargs: Other arguments passed to `lint_file`
+    @return: Asynchronous generator of (filename, errors) pairs
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(concurrency)
+    worker = partial(_lint_file_worker, profile=profile is not None)
+
+    async def _result(future):
+        errors, file_profile, dummy_index = await future
+        if profile is not None:
+            profile.update(file_profile)
+        return errors
+
+    pending = deque()
+    try:
+        for filename in filenames:
+            pending.append((filename, loop.run_in_executor(executor, partial(worker, filename, **kwargs))))
+            if len(pending) >= concurrency:
+                filename, future = pending.popleft()
+                yield filename, await _result(future)
+        while pending:
+            filename, future = pending.popleft()
+            yield filename, await _result(future)
+    finally:
+        for dummy, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+class TextFormatter(object):
+    """Formatter of errors in human readable text format.
+
+    Output of each file is buffered and written at once when the file is finished.
+
+    @ivar output: File object to write to
+    @ivar register: Validator register which provides error descriptions
+    """
+
+    def __init__(self, output, register=REGISTER):
+        """Initialize the formatter.
+
+        @param output: File object to write to
+        @param register: Validator register which provides error descriptions
+        @type register: ValidatorRegister
+        """
+        self.output = output
+        self.register = register
+        self._error_defs = register.errors
+
+    def start(self):
+        """Start the output."""
+
+    def format_errors(self, errors):
+        """Yield strings representing errors found in a file.
+
+        @param errors: List of errors found in a file
+        @type errors: LintResult or [LintError, ...]
+        """
+        # Errors which don't refer to an entry in the file share line 0, but differ in messages.
+        for dummy_key, entry_errors in groupby(errors, key=lambda e: (e.line, e.message)):
+            message = None
+            for error in entry_errors:
+                msg_data = {'filename': error.filename, 'line': error.line, 'error': error.code,
+                            'description': self._error_defs[error.code]}
+                yield MSG_FORMAT % msg_data
+                message = error.message
+            if message is not None:
+                yield message
+
+    def write_file(self, errors):
+        """Write errors found in a file.
+
+        Errors are formatted as they're written, so the whole output is never kept in memory.
+
+        @param errors: List of errors found in a file
+        @type errors: LintResult or [LintError, ...]
+        """
+        if errors:
+            self.output.writelines(self.format_errors(errors))
+            self.output.flush()
+
+    def finish(self):
+        """Finish the output."""
+
+
+class JsonLinesFormatter(TextFormatter):
+    """Formatter of errors in JSON lines format, i.e. one JSON object per error."""
+
+    def format_errors(self, errors):
+        """Yield strings representing errors found in a file.
+
+        @param errors: List of errors found in a file
+        @type errors: LintResult or [LintError, ...]
+        """
+        import json
+        for error in errors:
+            data = {'filename': error.filename, 'line': error.line, 'code': error.code,
+                    'description': self._error_defs[error.code]}
+            if error.message is not None:
+                data['message'] = error.message
+            yield json.dumps(data) + '\n'
+
+
+class SarifFormatter(TextFormatter):
+    """Formatter of errors in SARIF format.
+
+    Results are written as they come, the SARIF document is completed by `finish`.
+    """
+
+    version = '2.1.0'
+    schema = 'https://json.schemastore.org/sarif-2.1.0.json'
+    _separator = '\n'
+
+    def start(self):
+        """Start the SARIF document."""
+        import json
+        rules = [{'id': code, 'shortDescription': {'text': description}}
+                 for code, description in self._error_defs.items()]
+        driver = {'name': 'polint', 'version': __version__, 'informationUri': 'https://github.com/ziima/polint',
+                  'rules': rules}
+        self.output.write('{"version": %s, "$schema": %s, "runs": [{"tool": %s, "results": ['
+                          % (json.dumps(self.version), json.dumps(self.schema), json.dumps({'driver': driver})))
+
+    def format_errors(self, errors):
+        """Yield strings representing errors found in a file.
+
+        @param errors: List of errors found in a file
+        @type errors: LintResult or [LintError, ...]
+        """
+        import json
+        for error in errors:
+            location = {'physicalLocation': {'artifactLocation': {'uri': error.filename},
+                                             'region': {'startLine': max(error.line, 1)}}}
+            result = {'ruleId': error.code, 'level': 'error', 'message': {'text': self._error_defs[error.code]},
+                      'locations': [location]}
+            yield self._separator
+            yield json.dumps(result)
+            self._separator = ',\n'
+
+    def finish(self):
+        """Finish the SARIF document."""
+        self.output.write('\n]}]}\n')
+
+
+FORMATTERS = OrderedDict((('text', TextFormatter), ('jsonl', JsonLinesFormatter), ('sarif', SarifFormatter)))
+
+
+def write_errors(output, errors, register=REGISTER):
+    """Write errors in the text format.
+
+    @param output: File object to write to
+    @param errors: List of errors found in a file
+    @type errors: LintResult or [LintError, ...]
+    @param register: Validator register which provides error descriptions
+    @type register: ValidatorRegister
+    """
+    TextFormatter(output, register=register).write_file(errors)
+
+
+def get_search_options(options):
+    """Return keyword arguments for `get_files` based on command line options."""
+    exclude_dirs = options['--exclude-dir'].split(',') if options['--exclude-dir'] else ()
+    return {'patterns': options['--include'].split(','), 'exclude_dirs': exclude_dirs,
+            'gitignore': options['--gitignore']}
+
+
+def get_filenames(options):
+    """Return files to be linted based on command line options."""
+    filenames = get_files(options['<path>'], **get_search_options(options))
+    if options['--changed-since']:
+        import subprocess
+        try:
+            filenames = filter_changed(filenames, get_changed_files(options['--changed-since']))
+        except subprocess.CalledProcessError as error:
+            sys.exit('Unable to get changed files: %s' % os.fsdecode(error.stderr).strip())
+        except OSError as error:
+            sys.exit('Unable to get changed files: %s' % error)
+    return filenames
+
+
+def get_cache(options, default=None):
+    """Return result cache based on command line options or `None` if cache is disabled.
+
+    @param default: Cache used if the cache directory isn't set.
+    """
+    if options['--no-cache']:
+        return None
+    if not options['--cache-dir']:
+        return default
+    try:
+        max_size = float(options['--cache-size']) * 1024 * 1024
+    except ValueError:
+        sys.exit('Invalid cache size: %s' % options['--cache-size'])
+    return ResultCache(options['--cache-dir'], max_size=max_size)
+
+
+def get_profile(options):
+    """Return profile based on command line options or `None` if profiling is disabled."""
+    if not options['--profile']:
+        return None
+    if options['--profile'] not in Profile.formats:
+        sys.exit('Invalid profile format: %s' % options['--profile'])
+    return Profile()
+
+
+def get_jobs(options):
+    """Return number of processes used for linting based on command line options."""
+    try:
+        jobs = int(options['--jobs'])
+    except ValueError:
+        jobs = -1
+    if jobs < 0:
+        sys.exit('Invalid number of jobs: %s' % options['--jobs'])
+    return jobs or os.cpu_count()
+
+
+def get_max_errors(options):
+    """Return maximal number of errors based on command line options or `None` if it's unlimited."""
+    if not options.get('--max-errors'):
+        return None
+    try:
+        max_errors = int(options['--max-errors'])
+    except ValueError:
+        max_errors = 0
+    if max_errors < 1:
+        sys.exit('Invalid maximal number of errors: %s' % options['--max-errors'])
+    return max_errors
+
+
+def get_baseline(options):
+    """Return baseline based on command line options or `None` if it isn't used.
+
+    Baseline is empty if its file doesn't exist yet.
+    """
+    if not options.get('--baseline'):
+        return None
+    if not os.path.exists(options['--baseline']):
+        return Baseline(options['--baseline'])
+    try:
+        return Baseline.load(options['--baseline'])
+    except (OSError, ValueError) as error:
+        sys.exit('Invalid baseline: %s' % error)
+
+
+def get_lint_options(options, register=REGISTER, cache=None):
+    """Return keyword arguments for `lint_file` based on command line options.
+
+    @param cache: Cache used if cache directory isn't set
+    """
+    if options.get('--ignore'):
+        exclude = {i for i in options['--ignore'].split(',')}
+    else:
+        exclude = None
+    collation = options.get('--collation') or 'codepoint'
+    if collation not in COLLATIONS:
+        sys.exit('Invalid collation: %s' % collation)
+    if collation == 'locale':
+        import locale
+        locale.setlocale(locale.LC_COLLATE, '')
+    register = load_plugins(register, exclude)
+    if collation != 'codepoint' and UNSORTED in register.validators:
+        register = register.copy()
+        register.replace(SortValidator(collation), UNSORTED)
+    return {'exclude': exclude, 'register': register, 'show_msg': options['--show-msg'],
+            'cache': get_cache(options, default=cache), 'profile': get_profile(options),
+            'sort_moves': bool(options.get('--sort-moves')), 'collation': collation, 'fix': bool(options.get('--fix'))}
+
+
+def get_formatter(options, output, register=REGISTER):
+    """Return output formatter based on command line options."""
+    if options['--format'] not in FORMATTERS:
+        sys.exit('Invalid output format: %s' % options['--format'])
+    return FORMATTERS[options['--format']](output, register=register)
+
+
+def run(options, output=sys.stdout, register=REGISTER, cache=None, error_output=None):
+    """Lint files based on command line options and return the exit code.
+
+    @param options: Parsed command line options
+    @param output: Standard output file object
+    @param register: Validator register to be used
+    @param cache: Cache used if cache directory isn't set
+    @param error_output: Standard error output file object, `sys.stderr` by default
+    """
+    jobs = get_jobs(options)
+    try:
+        split_size = float(options['--split-size']) * 1024 * 1024 or None
+    except ValueError:
+        sys.exit('Invalid split size: %s' % options['--split-size'])
+    lint_options = get_lint_options(options, register=register, cache=cache)
+    # Register with loaded plugins provides descriptions of their errors.
+    formatter = get_formatter(options, output, register=lint_options['register'])
+    max_errors = get_max_errors(options)
+    baseline = get_baseline(options)
+    # New baseline records all errors, none of them is reported.
+    recording = baseline is not None and not baseline.loaded
+    results = lint_files(get_filenames(options), jobs=jobs, split_size=split_size, cross_file=options['--cross-file'],
+                         fail_fast=options['--fail-fast'] and not recording,
+                         max_errors=None if recording else max_errors, baseline=baseline, **lint_options)
+    exit_code = int(_write_results(formatter, results, baseline if recording else None))
+    if lint_options['cache'] is not None:
+        lint_options['cache'].prune()
+    if lint_options['profile'] is not None:
+        lint_options['profile'].write(error_output or sys.stderr, options['--profile'])
+    return exit_code
+
+
+def _write_results(formatter, results, recording=None):
+    """Write results of `lint_files` by the formatter and return whether any errors were found.
+
+    @param recording: New baseline which records the errors, they aren't written then.
+    @type recording: Baseline
+    """
+    found = False
+    formatter.start()
+    for filename, errors in results:
+        if recording is not None:
+            recording.add(filename, errors)
+        elif errors:
+            found = True
+            formatter.write_file(errors)
+    formatter.finish()
+    if recording is not None:
+        recording.save()
+    return found
+
+
+def _report_changes(filename, reported, formatter, lint_options, error_output):
+    """Lint the changed file and write errors which weren't reported before.
+
+    Errors are matched by their codes and fingerprints of the entries, so errors of entries which only moved aren't
+    reported again.
+    """
+    try:
+        errors = lint_file(filename, fingerprints=True, **lint_options)
+    except IOError as error:
+        # File may be saved only partially.
+        error_output.write('%s\n' % error)
+        return
+    previous = reported.get(filename, Counter())
+    current = Counter()
+    new_errors = []
+    for error in errors:
+        key = (error.code, error.fingerprint)
+        current[key] += 1
+        # Entries may share the fingerprint, e.g. duplicates, so their errors are counted.
+        if current[key] > previous[key]:
+            new_errors.append(error)
+    formatter.write_file(new_errors)
+    reported[filename] = current
+
+
+def watch(options, output=sys.stdout, register=REGISTER, error_output=None, ticks=None):
+    """Lint files whenever they change until interrupted.
+
+    Only errors which weren't reported in the previous run on the file are written.
+
+    @param options: Parsed command line options
+    @param output: Standard output file object
+    @param register: Validator register to be used
+    @param error_output: Standard error output file object, `sys.stderr` by default
+    @param ticks: Number of checks for changes, unlimited by default. Mainly for tests.
+    """
+    try:
+        interval = float(options['--interval'])
+    except ValueError:
+        sys.exit('Invalid interval: %s' % options['--interval'])
+    lint_options = get_lint_options(options, register=register, cache=MemoryCache())
+    formatter = get_formatter(options, output, register=lint_options['register'])
+    watcher = Watcher(options['<path>'], **get_search_options(options))
+    # Dictionary of (filename, Counter({(code, fingerprint): count, ...})) pairs reported in the last run
+    reported = {}
+    formatter.start()
+    try:
+        for tick in count():
+            changed, removed = watcher.poll()
+            for filename in removed:
+                reported.pop(filename, None)
+            for filename in changed:
+                _report_changes(filename, reported, formatter, lint_options, error_output or sys.stderr)
+            if ticks is not None and tick + 1 >= ticks:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    formatter.finish()
+
+
+def _default_options():
+    """Return options from the usage as parsed from arguments without any options."""
+    options = {}
+    # Options are listed the same way as docopt expects them, each starts on a new line.
+    for block in re.split(r'\n(?=  -)', __doc__.partition('\nOptions:\n')[2]):
+        name, argument = re.match(r'\s*(?:-\w, )?(--[\w-]+)(=?)', block).groups()
+        default = re.search(r'\[default: (.*?)\]', block)
+        options[name] = (default and default.group(1)) if argument else False
+    return options
+
+
+def parse_args(args):
+    """Return options parsed from command line arguments.
+
+    Sole `--help` or `--version` options and plain paths are handled without loading the argument parser.
+
+    @param args: Command line arguments
+    @type args: [text, ...]
+    """
+    if len(args) == 1 and args[0] in ('-h', '--help', '--version'):
+        print(__version__ if args[0] == '--version' else __doc__.strip('\n'))
+        sys.exit()
+    if args and not any(arg.startswith('-') for arg in args):
+        options = _default_options()
+        options['<path>'] = list(args)
+        return options
+    from docopt import docopt
+    return docopt(__doc__, args, version=__version__)
+
+
+def main(args=None, output=sys.stdout, register=REGISTER):
+    """Run the polint.
+
+    @param args: Command line arguments. Mainly for tests.
+    @param output: Standard output file object. Mainly for tests.
+    @param register: Validator register to be used.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    options = parse_args(args)
+
+    if (options['--serve'] or options['--daemon']) and not is_daemon_supported():
+        sys.exit('Daemon is not supported on this platform')
+    if options['--serve']:
+        serve(get_socket_path(options), register=register)
+        sys.exit(0)
+    if options['--watch']:
+        watch(options, output, register=register)
+        sys.exit(0)
+    if options['--daemon']:
+        exit_code = forward(get_socket_path(options), args, output=output)
+        if exit_code is not None:
+            sys.exit(exit_code)
+    sys.exit(run(options, output, register=register))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+"""Test asynchronous API."""
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from polint import Profile, async_lint_files, lint_files
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+PATHS = [os.path.join(DATA, f) for f in ('invalid.po', 'simple_valid.po', 'empty.po', 'invalid.po')]
+
+
+class TestAsyncLintFiles(unittest.IsolatedAsyncioTestCase):
+    """Test `async_lint_files` function."""
+
+    async def _collect(self, *args, **kwargs):
+        return [result async for result in async_lint_files(*args, **kwargs)]
+
+    async def test_lint_files(self):
+        self.assertEqual(await self._collect(PATHS, concurrency=2), list(lint_files(PATHS)))
+
+    async def test_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            results = await self._collect(PATHS, executor=executor, exclude={'untranslated', 'location'},
+                                          show_msg=True)
+        self.assertEqual(results, list(lint_files(PATHS, exclude={'untranslated', 'location'}, show_msg=True)))
+
+    async def test_profile(self):
+        profile = Profile()
+        with ThreadPoolExecutor(1) as executor:
+            await self._collect(PATHS[:2], executor=executor, profile=profile)
+        self.assertEqual(sorted(profile.parse_times), sorted(PATHS[:2]))
+        self.assertIn('fuzzy', profile.validators)
+
+    async def test_close(self):
+        with ThreadPoolExecutor(1) as executor:
+            results = async_lint_files(PATHS, executor=executor)
+            filename, dummy_errors = await results.__anext__()
+            await results.aclose()
+        self.assertEqual(filename, PATHS[0])
@@ -0,0 +1,224 @@
+"""Test baseline of known errors."""
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from polib import POEntry
+
+from polint import Baseline, LintError, check_indexes, entry_key, index_file, lint_file, lint_files, main
+
+PO = r'''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Apple"
+msgstr ""
+
+#, fuzzy
+msgid "Pear"
+msgstr "Hruska"
+'''
+
+# Entries with errors are moved down and a new one is added.
+CHANGED = r'''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Almond"
+msgstr "Mandle"
+
+msgid "Apple"
+msgstr ""
+
+#, fuzzy
+msgid "Pear"
+msgstr "Hruska"
+
+msgid "Plum"
+msgstr ""
+'''
+
+APPLE = entry_key(POEntry(msgid='Apple'))
+PEAR = entry_key(POEntry(msgid='Pear'))
+PLUM = entry_key(POEntry(msgid='Plum'))
+
+
+class BaselineTestCase(unittest.TestCase):
+    """Base class for tests with a baseline."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'baseline.bin')
+        self.pofile = self._write('cs.po', PO)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as pofile:
+            pofile.write(content)
+        return path
+
+
+class TestFingerprints(BaselineTestCase):
+    """Test fingerprints of errors."""
+
+    def test_lint_file(self):
+        self.assertEqual(lint_file(self.pofile, fingerprints=True),
+                         [LintError(self.pofile, 5, 'untranslated', None, APPLE),
+                          LintError(self.pofile, 8, 'fuzzy', None, PEAR),
+                          LintError(self.pofile, 8, 'untranslated', None, PEAR)])
+        self.assertEqual({e.fingerprint for e in lint_file(self.pofile)}, {None})
+
+    def test_sort_moves(self):
+        # Entry which has to be moved doesn't fail any other validator.
+        pofile = self._write('de.po', 'msgid ""\nmsgstr ""\n\nmsgid "b"\nmsgstr "B"\n\nmsgid "a"\nmsgstr "A"\n\n'
+                                      'msgid "c"\nmsgstr "C"\n')
+        self.assertEqual(lint_file(pofile, sort_moves=True, fingerprints=True),
+                         [LintError(pofile, 4, 'unsorted', None, entry_key(POEntry(msgid='b')))])
+
+    def test_parts(self):
+        errors = lint_file(self.pofile, fingerprints=True)
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(lint_file(self.pofile, executor=executor, parts=2, fingerprints=True), errors)
+
+    def test_check_indexes(self):
+        template = self._write('messages.pot', PO)
+        pofile = self._write('cs.po', 'msgid "Pear"\nmsgstr "Hruska"\n\nmsgid "Pear"\nmsgstr "Hruska"\n')
+        indexes = [index_file(template), index_file(pofile)]
+        for index in indexes:
+            index.sort()
+        self.assertEqual(check_indexes(indexes, fingerprints=True),
+                         [(pofile, [LintError(pofile, 0, 'missing', '%s:5: missing entry\n' % template, APPLE),
+                                    LintError(pofile, 4, 'duplicate', None, PEAR)])])
+
+
+class TestBaseline(BaselineTestCase):
+    """Test `Baseline` class."""
+
+    def test_filter(self):
+        baseline = Baseline(self.path)
+        self.assertFalse(baseline.loaded)
+        baseline.add(self.pofile, lint_file(self.pofile, fingerprints=True))
+        changed = self._write('cs.po', CHANGED)
+        self.assertEqual(baseline.filter(changed, lint_file(changed, fingerprints=True)),
+                         [LintError(changed, 15, 'untranslated', None, PLUM)])
+        self.assertEqual(baseline.filter(changed, []), [])
+
+    def test_files(self):
+        # Files are identified by their paths relative to the baseline.
+        baseline = Baseline(self.path)
+        baseline.add(self.pofile, [LintError(self.pofile, 5, 'untranslated', None, APPLE)])
+        error = LintError('cs.po', 5, 'untranslated', None, APPLE)
+        self.assertEqual(baseline.filter(os.path.join(self.directory, '.', 'cs.po'), [error]), [])
+        self.assertEqual(baseline.filter(os.path.join(self.directory, 'de.po'), [error]), [error])
+        # Errors without fingerprints are always reported.
+        error = LintError(self.pofile, 5, 'untranslated', None)
+        self.assertEqual(baseline.filter(self.pofile, [error]), [error])
+
+    def test_save_load(self):
+        baseline = Baseline(self.path)
+        other = os.path.join(self.directory, 'locale', 'de.po')
+        baseline.add(self.pofile, [LintError(self.pofile, 5, 'untranslated', None, APPLE),
+                                   LintError(self.pofile, 9, 'fuzzy', None, PEAR),
+                                   LintError(self.pofile, 9, 'unknown', None)])
+        baseline.add(other, [LintError(other, 1, 'fuzzy', None, 2 ** 64 - 1)])
+        baseline.save()
+
+        loaded = Baseline.load(self.path)
+        self.assertTrue(loaded.loaded)
+        self.assertEqual(loaded.filter(other, [LintError(other, 3, 'fuzzy', None, 2 ** 64 - 1),
+                                               LintError(other, 3, 'untranslated', None, 2 ** 64 - 1)]),
+                         [LintError(other, 3, 'untranslated', None, 2 ** 64 - 1)])
+        self.assertEqual(loaded.filter(self.pofile, [LintError(self.pofile, 1, 'fuzzy', None, PEAR),
+                                                     LintError(self.pofile, 2, 'fuzzy', None, APPLE)]),
+                         [LintError(self.pofile, 2, 'fuzzy', None, APPLE)])
+
+        # Records of loaded files are kept once saved again.
+        loaded.add(self.pofile, [LintError(self.pofile, 2, 'fuzzy', None, APPLE)])
+        loaded.save()
+        loaded = Baseline.load(self.path)
+        self.assertEqual(loaded.filter(self.pofile, [LintError(self.pofile, 2, 'fuzzy', None, APPLE)]), [])
+        self.assertEqual(loaded.filter(other, [LintError(other, 3, 'fuzzy', None, 2 ** 64 - 1)]), [])
+
+    def test_empty(self):
+        Baseline(self.path).save()
+        baseline = Baseline.load(self.path)
+        error = LintError(self.pofile, 5, 'untranslated', None, APPLE)
+        self.assertEqual(baseline.filter(self.pofile, [error]), [error])
+
+    def test_invalid(self):
+        for content, message in ((b'POLINT', 'truncated'), (b'x' * 32, 'unknown format')):
+            with open(self.path, 'wb') as baseline_file:
+                baseline_file.write(content)
+            with self.assertRaisesRegex(ValueError, message):
+                Baseline.load(self.path)
+        baseline = Baseline(self.path)
+        baseline.add(self.pofile, [LintError(self.pofile, 5, 'untranslated', None, APPLE)])
+        baseline.save()
+        with open(self.path, 'r+b') as baseline_file:
+            baseline_file.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaisesRegex(ValueError, 'size of the file'):
+            Baseline.load(self.path)
+
+
+class TestLintFilesBaseline(BaselineTestCase):
+    """Test linting of files with a baseline."""
+
+    def setUp(self):
+        super().setUp()
+        self.baseline = Baseline(self.path)
+        self.baseline.add(self.pofile, lint_file(self.pofile, fingerprints=True))
+        self._write('cs.po', CHANGED)
+        self.expected = [(self.pofile, [LintError(self.pofile, 15, 'untranslated', None, PLUM)])]
+
+    def test_serial(self):
+        self.assertEqual(list(lint_files([self.pofile], baseline=self.baseline)), self.expected)
+
+    def test_jobs(self):
+        self.assertEqual(list(lint_files([self.pofile, self.pofile], jobs=2, split_size=1, baseline=self.baseline)),
+                         self.expected * 2)
+
+    def test_max_errors(self):
+        # Errors from the baseline don't count.
+        self.assertEqual(list(lint_files([self.pofile], max_errors=1, baseline=self.baseline)), self.expected)
+
+
+class TestMainBaseline(BaselineTestCase):
+    """Test --baseline option."""
+
+    def _main(self, *args):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([self.directory, '--baseline', self.path] + list(args), output=output)
+        return context.exception.code, output.getvalue()
+
+    def test_baseline(self):
+        # Baseline is created with the current errors.
+        self.assertEqual(self._main('--max-errors', '1', '--fail-fast'), (0, ''))
+        self.assertTrue(Baseline.load(self.path).loaded)
+        self.assertEqual(self._main(), (0, ''))
+
+        self._write('cs.po', CHANGED)
+        self.assertEqual(self._main('--jobs', '2'),
+                         (1, '%s:15: [untranslated] translation is missing\n' % self.pofile))
+
+    def test_cross_file(self):
+        # Entries missing from the translation are keyed by the template.
+        self._write('messages.pot', PO)
+        self._write('cs.po', 'msgid ""\nmsgstr ""\n')
+        self.assertEqual(self._main('--cross-file', '--include', '*.po,*.pot'), (0, ''))
+        self._write('messages.pot', CHANGED)
+        self.assertEqual(self._main('--cross-file', '--include', '*.po,*.pot'),
+                         (1, '%(po)s:0: [missing] entry from the template is missing\n%(pot)s:5: missing entry\n'
+                             '%(po)s:0: [missing] entry from the template is missing\n%(pot)s:15: missing entry\n'
+                             % {'po': self.pofile, 'pot': os.path.join(self.directory, 'messages.pot')}))
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as baseline_file:
+            baseline_file.write(b'invalid')
+        with self.assertRaises(SystemExit) as context:
+            main([self.pofile, '--baseline', self.path])
+        self.assertRegex(context.exception.code, '^Invalid baseline: ')
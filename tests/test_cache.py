@@ -0,0 +1,98 @@
+"""Test result cache."""
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from mock import patch
+
+from polint import ErrorList, LintError, LintResult, ResultCache, main
+
+INVALID = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+
+
+class TestResultCache(unittest.TestCase):
+    """Test `ResultCache` class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_key(self):
+        cache = ResultCache(self.directory)
+        key = cache.get_key(INVALID, ['fuzzy', 'obsolete'])
+        self.assertEqual(cache.get_key(INVALID, ['obsolete', 'fuzzy']), key)
+        self.assertNotEqual(cache.get_key(INVALID, ['fuzzy']), key)
+        self.assertNotEqual(cache.get_key(INVALID, ['fuzzy', 'obsolete'], show_msg=True), key)
+        self.assertNotEqual(cache.get_key(INVALID, ['fuzzy', 'obsolete'], options={'collation': 'casefold'}), key)
+
+    def test_key_content(self):
+        cache = ResultCache(self.directory)
+        filename = os.path.join(self.directory, 'test.po')
+        with open(filename, 'w') as pofile:
+            pofile.write('msgid "Source"\nmsgstr ""\n')
+        key = cache.get_key(filename, ['fuzzy'])
+        with open(filename, 'w') as pofile:
+            pofile.write('msgid "Source"\nmsgstr "Translation"\n')
+        self.assertNotEqual(cache.get_key(filename, ['fuzzy']), key)
+
+    def test_get_missing(self):
+        cache = ResultCache(self.directory)
+        self.assertIsNone(cache.get('missing', INVALID))
+
+    def test_set_get(self):
+        cache = ResultCache(self.directory)
+        errors = ErrorList()
+        errors.add(13, 'fuzzy')
+        errors.add(17, 'obsolete', 42)
+        errors.add(17, 'untranslated', 42)
+        cache.set('key', LintResult('old.po', errors, {17: 'message'}))
+        self.assertEqual(cache.get('key', 'new.po'),
+                         [LintError('new.po', 13, 'fuzzy', None), LintError('new.po', 17, 'obsolete', 'message', 42),
+                          LintError('new.po', 17, 'untranslated', 'message', 42)])
+
+    def test_prune(self):
+        cache = ResultCache(self.directory, max_size=60)
+        errors = ErrorList()
+        errors.add(13, 'fuzzy')
+        for index, key in enumerate(('first', 'second', 'third')):
+            cache.set(key, LintResult('test.po', errors))
+            os.utime(os.path.join(self.directory, key + '.json'), (index, index))
+        # Use the first result, so it's the most recent.
+        cache.get('first', 'test.po')
+
+        cache.prune()
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ['first.json', 'third.json'])
+
+
+class TestMainCache(unittest.TestCase):
+    """Test `main` function with cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _run(self, *args):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([INVALID, '--cache-dir', self.directory] + list(args), output=output)
+        self.assertEqual(context.exception.code, 1)
+        return output.getvalue()
+
+    def test_cached(self):
+        result = self._run('--show-msg')
+        with patch('polint.Linter', side_effect=AssertionError('Linter should not be called')):
+            self.assertEqual(self._run('--show-msg'), result)
+
+    def test_no_cache(self):
+        self._run()
+        with patch('polint.Linter', side_effect=AssertionError('Linter should not be called')):
+            with self.assertRaises(AssertionError):
+                self._run('--no-cache')
+
+    def test_invalid_size(self):
+        with self.assertRaises(SystemExit) as context:
+            main([INVALID, '--cache-dir', self.directory, '--cache-size', 'big'])
+        self.assertEqual(context.exception.code, 'Invalid cache size: big')
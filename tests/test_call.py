@@ -1,10 +1,22 @@
 """Test command calls."""
 
+import json
 import os
+import shutil
+import tempfile
 import unittest
 from io import StringIO
 
-from polint import get_files, main
+from docopt import docopt
+from mock import patch
+
+import polint
+from polint import IgnoreRules, ValidatorRegister, get_files, main, parse_args
+
+
+def invalidator(dummy):
+    """Return failure in every case."""
+    return False
 
 
 class TestGetFiles(unittest.TestCase):
@@ -31,6 +43,144 @@ class TestGetFiles(unittest.TestCase):
             [os.path.join(dirname, 'data', f) for f in ('empty.po', 'header_only.po', 'invalid.po', 'simple_valid.po')])
 
 
+class TestGetFilesTree(unittest.TestCase):
+    """Test `get_files` function on a directory tree."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for path in ('cs.po', 'messages.pot', 'build/cs.po', 'node_modules/lib/cs.po', 'locale/de.po',
+                     'locale/tmp/de.po'):
+            path = os.path.join(self.directory, *path.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def _path(self, path):
+        return os.path.join(self.directory, *path.split('/'))
+
+    def test_sorted(self):
+        self.assertEqual(
+            list(get_files([self.directory])),
+            [self._path(p) for p in ('build/cs.po', 'cs.po', 'locale/de.po', 'locale/tmp/de.po',
+                                     'node_modules/lib/cs.po')])
+
+    def test_patterns(self):
+        self.assertEqual(list(get_files([self.directory], patterns=['*.pot'])), [self._path('messages.pot')])
+
+    def test_exclude_dirs(self):
+        self.assertEqual(list(get_files([self.directory], exclude_dirs=['node_modules', 'b*'])),
+                         [self._path(p) for p in ('cs.po', 'locale/de.po', 'locale/tmp/de.po')])
+
+    def test_gitignore(self):
+        with open(self._path('.gitignore'), 'w') as gitignore:
+            gitignore.write('# Comment\n/build/\nnode_modules\n*.po\n!locale/*.po\n')
+        with open(self._path('locale/.gitignore'), 'w') as gitignore:
+            gitignore.write('tmp/\n')
+        self.assertEqual(list(get_files([self.directory], gitignore=True)), [self._path('locale/de.po')])
+
+    def test_unreadable(self):
+        # Directory which can't be read is skipped.
+        scandir = os.scandir
+
+        def _scandir(path):
+            if path == self._path('locale'):
+                raise PermissionError(13, 'Permission denied', path)
+            return scandir(path)
+
+        with patch('os.scandir', side_effect=_scandir):
+            self.assertEqual(list(get_files([self.directory])),
+                             [self._path(p) for p in ('build/cs.po', 'cs.po', 'node_modules/lib/cs.po')])
+
+
+class TestIgnoreRules(unittest.TestCase):
+    """Test `IgnoreRules` class."""
+
+    def test_no_file(self):
+        rules = IgnoreRules()
+        self.assertIs(rules.extend(os.path.dirname(__file__)), rules)
+
+    def test_is_ignored(self):
+        rules = IgnoreRules([('/base', '*.po', False, False), ('/base', 'keep.po', True, False),
+                             ('/base', 'dir', False, True), ('/base', '/sub/*.pot', False, False)])
+        self.assertTrue(rules.is_ignored('/base/sub/cs.po', False))
+        self.assertFalse(rules.is_ignored('/base/sub/keep.po', False))
+        self.assertTrue(rules.is_ignored('/base/dir', True))
+        self.assertFalse(rules.is_ignored('/base/dir', False))
+        self.assertTrue(rules.is_ignored('/base/sub/messages.pot', False))
+        self.assertFalse(rules.is_ignored('/base/other/sub/messages.pot', False))
+
+
+MOVES = r'''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "A"
+msgstr "a"
+
+msgid "X"
+msgstr "x"
+
+msgid "Y"
+msgstr "y"
+
+msgid "B"
+msgstr "b"
+
+msgid "C"
+msgstr "c"
+
+msgid "b"
+msgstr "b"
+'''
+
+
+class TestSortOptions(unittest.TestCase):
+    """Test options of the unsorted check."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'moves.po')
+        with open(self.path, 'w') as pofile:
+            pofile.write(MOVES)
+
+    def _lint(self, *args):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([self.path, '--ignore', 'location'] + list(args), output=output)
+        self.assertEqual(context.exception.code, 1)
+        return output.getvalue()
+
+    def test_default(self):
+        self.assertEqual(self._lint(), '%s:14: [unsorted] entry is not sorted\n' % self.path)
+
+    def test_sort_moves(self):
+        self.assertEqual(self._lint('--sort-moves'),
+                         '%s:8: [unsorted] entry is not sorted\n%s:11: [unsorted] entry is not sorted\n'
+                         % (self.path, self.path))
+
+    def test_collation(self):
+        self.assertEqual(self._lint('--sort-moves', '--collation', 'casefold'),
+                         '%s:8: [unsorted] entry is not sorted\n%s:11: [unsorted] entry is not sorted\n'
+                         '%s:17: [unsorted] entry is not sorted\n' % (self.path, self.path, self.path))
+
+    def test_collation_invalid(self):
+        with self.assertRaises(SystemExit) as context:
+            main([self.path, '--collation', 'unknown'])
+        self.assertEqual(context.exception.code, 'Invalid collation: unknown')
+
+
+class TestParseArgs(unittest.TestCase):
+    """Test `parse_args` function."""
+
+    def test_paths(self):
+        # Plain paths are parsed without docopt, the same way as by docopt.
+        for args in (['cs.po'], ['cs.po', 'locale']):
+            expected = docopt(polint.__doc__, args)
+            with patch('docopt.docopt', side_effect=AssertionError('docopt called')):
+                self.assertEqual(parse_args(args), expected)
+
+
 class TestMain(unittest.TestCase):
     """Test `main` function."""
 
@@ -121,3 +271,165 @@ class TestMain(unittest.TestCase):
                    'untranslated,location,fuzzy,obsolete,unsorted']
             main(cmd, output=output)
         self.assertEqual(context.exception.code, 0)
+
+    def test_jobs(self):
+        serial_output = StringIO()
+        paths = [os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'),
+                 os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po'),
+                 os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')]
+        with self.assertRaises(SystemExit):
+            main(paths + ['--show-msg'], output=serial_output)
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main(paths + ['--show-msg', '--jobs', '2'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(), serial_output.getvalue())
+
+    def test_jobs_custom_register(self):
+        reg = ValidatorRegister()
+        reg.register(invalidator, 'error', 'entry is invalid')
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po'), '--jobs', '2'], output=output,
+                 register=reg)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(), '%s:10: [error] entry is invalid\n'
+                         % os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po'))
+
+    def test_jobs_invalid(self):
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'empty.po'), '--jobs', 'many'])
+        self.assertEqual(context.exception.code, 'Invalid number of jobs: many')
+
+    def test_jobs_negative(self):
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'empty.po'), '--jobs', '-1'])
+        self.assertEqual(context.exception.code, 'Invalid number of jobs: -1')
+
+    def test_split_size(self):
+        serial_output = StringIO()
+        paths = [os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'),
+                 os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po')]
+        with self.assertRaises(SystemExit):
+            main(paths + ['--show-msg'], output=serial_output)
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main(paths + ['--show-msg', '--jobs', '2', '--split-size', '0.0001'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(), serial_output.getvalue())
+
+    def test_split_size_invalid(self):
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'empty.po'), '--split-size', 'huge'])
+        self.assertEqual(context.exception.code, 'Invalid split size: huge')
+
+    def test_fail_fast(self):
+        invalid = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        valid = os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po')
+        single_output = StringIO()
+        with self.assertRaises(SystemExit):
+            main([invalid], output=single_output)
+        for jobs in ('1', '2'):
+            output = StringIO()
+            with self.assertRaises(SystemExit) as context:
+                main([valid, invalid, invalid, invalid, '--fail-fast', '--jobs', jobs], output=output)
+            self.assertEqual(context.exception.code, 1)
+            self.assertEqual(output.getvalue(), single_output.getvalue())
+
+    def test_max_errors(self):
+        invalid = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        for jobs in ('1', '2'):
+            output = StringIO()
+            with self.assertRaises(SystemExit) as context:
+                main([invalid, invalid, invalid, '--max-errors', '10', '--jobs', jobs], output=output)
+            self.assertEqual(context.exception.code, 1)
+            lines = output.getvalue().splitlines()
+            self.assertEqual(len(lines), 10)
+            self.assertEqual(lines[8:], ['%s:13: [fuzzy] translation is fuzzy' % invalid,
+                                         '%s:13: [untranslated] translation is missing' % invalid])
+
+    def test_max_errors_invalid(self):
+        for value in ('many', '0'):
+            with self.assertRaises(SystemExit) as context:
+                main([os.path.join(os.path.dirname(__file__), 'data', 'empty.po'), '--max-errors', value])
+            self.assertEqual(context.exception.code, 'Invalid maximal number of errors: %s' % value)
+
+    def test_profile(self):
+        output = StringIO()
+        with patch('sys.stderr', new_callable=StringIO) as stderr:
+            with self.assertRaises(SystemExit) as context:
+                main([os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), '--profile', 'table'],
+                     output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn('invalid.po:13: [fuzzy] translation is fuzzy\n', output.getvalue())
+        self.assertIn('validator', stderr.getvalue())
+        self.assertIn('untranslated', stderr.getvalue())
+        self.assertIn('invalid.po', stderr.getvalue())
+
+    def test_profile_json_jobs(self):
+        paths = [os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'),
+                 os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po')]
+        with patch('sys.stderr', new_callable=StringIO) as stderr:
+            with self.assertRaises(SystemExit):
+                main(paths + ['--profile', 'json', '--jobs', '2'], output=StringIO())
+        profile = json.loads(stderr.getvalue())
+        self.assertEqual(list(profile['parse_times']), paths)
+        # Entries validated by the batch validator are counted in both files.
+        self.assertEqual(profile['validators']['untranslated']['calls'], 6)
+        self.assertEqual(profile['validators']['untranslated']['failures'], 3)
+
+    def test_profile_invalid(self):
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'empty.po'), '--profile', 'xml'])
+        self.assertEqual(context.exception.code, 'Invalid profile format: xml')
+
+    def test_format_jsonl(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), '--format', 'jsonl', '--ignore',
+                  'untranslated,location,unsorted'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()],
+                         [{'filename': filename, 'line': 13, 'code': 'fuzzy', 'description': 'translation is fuzzy'},
+                          {'filename': filename, 'line': 17, 'code': 'obsolete', 'description': 'entry is obsolete'}])
+
+    def test_format_jsonl_show_msg(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit):
+            main([os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), '--format', 'jsonl', '--ignore',
+                  'untranslated,location,unsorted,obsolete', '--show-msg'], output=output)
+        self.assertEqual(json.loads(output.getvalue())['message'],
+                         '#, fuzzy\nmsgid "Fuzzy source"\nmsgstr "Fuzzy translation"\n')
+
+    def test_format_sarif(self):
+        output = StringIO()
+        paths = [os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'),
+                 os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po'),
+                 os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')]
+        with self.assertRaises(SystemExit) as context:
+            main(paths + ['--format', 'sarif', '--ignore', 'untranslated,location,unsorted,obsolete'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        sarif = json.loads(output.getvalue())
+        self.assertEqual(sarif['version'], '2.1.0')
+        run = sarif['runs'][0]
+        self.assertEqual(run['tool']['driver']['name'], 'polint')
+        self.assertIn({'id': 'fuzzy', 'shortDescription': {'text': 'translation is fuzzy'}},
+                      run['tool']['driver']['rules'])
+        location = {'physicalLocation': {'artifactLocation': {'uri': paths[0]}, 'region': {'startLine': 13}}}
+        result = {'ruleId': 'fuzzy', 'level': 'error', 'message': {'text': 'translation is fuzzy'},
+                  'locations': [location]}
+        self.assertEqual(run['results'], [result, result])
+
+    def test_format_sarif_valid(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po'), '--format', 'sarif'],
+                 output=output)
+        self.assertEqual(context.exception.code, 0)
+        self.assertEqual(json.loads(output.getvalue())['runs'][0]['results'], [])
+
+    def test_format_invalid(self):
+        with self.assertRaises(SystemExit) as context:
+            main([os.path.join(os.path.dirname(__file__), 'data', 'empty.po'), '--format', 'xml'])
+        self.assertEqual(context.exception.code, 'Invalid output format: xml')
@@ -0,0 +1,235 @@
+"""Test cross-file validators."""
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from polib import POEntry
+
+from polint import (FileIndex, LintError, check_indexes, duplicate_validator, entry_key, inconsistent_validator,
+                    index_file, lint_files, main, missing_validator, translation_key)
+
+TEMPLATE = r'''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Apple"
+msgstr ""
+
+msgid "Pear"
+msgstr ""
+'''
+
+APP = r'''msgid ""
+msgstr ""
+"Language: cs\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Apple"
+msgstr "Jablko"
+
+msgctxt "fruit"
+msgid "Apple"
+msgstr "Jablko"
+
+msgid "Apple"
+msgstr "Jablko"
+
+#~ msgid "Apple"
+#~ msgstr "Jablko"
+'''
+
+TRANSLATION = r'''msgid ""
+msgstr ""
+"Language: cs\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Apple"
+msgstr "Jablko"
+
+msgid "Pear"
+msgstr "Hruska"
+'''
+
+LIB = r'''msgid ""
+msgstr ""
+"Language: cs\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Apple"
+msgstr "Jabko"
+
+#, fuzzy
+msgctxt "fruit"
+msgid "Apple"
+msgstr "Jabko"
+'''
+
+
+def _index(filename, entries, language=None):
+    index = FileIndex(filename)
+    index.update(entries)
+    index.language = language
+    index.sort()
+    return index
+
+
+class TestKeys(unittest.TestCase):
+    """Test `entry_key` and `translation_key` functions."""
+
+    def test_entry_key(self):
+        self.assertEqual(entry_key(POEntry(msgid='Apple')), entry_key(POEntry(msgid='Apple', msgstr='Jablko')))
+        self.assertNotEqual(entry_key(POEntry(msgid='Apple')), entry_key(POEntry(msgid='Apple', msgctxt='')))
+        self.assertNotEqual(entry_key(POEntry(msgid='Apple')), entry_key(POEntry(msgid='Pear')))
+
+    def test_translation_key(self):
+        self.assertEqual(translation_key(POEntry(msgid='Apple')), 0)
+        self.assertEqual(translation_key(POEntry(msgid='Apple', msgstr='Jablko', flags=['fuzzy'])), 0)
+        self.assertNotEqual(translation_key(POEntry(msgid='Apple', msgstr='Jablko')), 0)
+        self.assertNotEqual(translation_key(POEntry(msgid='Apple', msgid_plural='Apples',
+                                                    msgstr_plural={0: 'Jablko', 1: 'Jablka'})),
+                            translation_key(POEntry(msgid='Apple', msgid_plural='Apples',
+                                                    msgstr_plural={0: 'Jablka', 1: 'Jablko'})))
+
+
+class TestFileIndex(unittest.TestCase):
+    """Test `FileIndex` class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_index_file(self):
+        path = os.path.join(self.directory, 'cs.po')
+        with open(path, 'w') as pofile:
+            pofile.write(APP)
+        index = index_file(path)
+        self.assertEqual(index.language, 'cs')
+        self.assertFalse(index.is_template)
+        # Obsolete entry is skipped.
+        self.assertEqual(sorted(index.lines), [6, 9, 13])
+        self.assertEqual(list(index.keys), sorted(index.keys))
+
+    def test_template(self):
+        path = os.path.join(self.directory, 'messages.pot')
+        with open(path, 'w') as pofile:
+            pofile.write(TEMPLATE)
+        index = index_file(path)
+        self.assertIsNone(index.language)
+        self.assertTrue(index.is_template)
+
+    def test_extend(self):
+        index = FileIndex('cs.po')
+        index.update([POEntry(msgid='Apple', linenum=1)])
+        other = FileIndex('cs.po')
+        other.update([POEntry(msgid='Pear', linenum=4)])
+        index.extend(other)
+        self.assertEqual(list(index.lines), [1, 4])
+        index.clear()
+        self.assertEqual(list(index.items()), [])
+
+
+class TestCrossFileValidators(unittest.TestCase):
+    """Test cross-file validators."""
+
+    def test_duplicate(self):
+        index = _index('cs.po', [POEntry(msgid='Apple', linenum=1), POEntry(msgid='Pear', linenum=4),
+                                 POEntry(msgid='Apple', linenum=7), POEntry(msgid='Apple', msgctxt='c', linenum=10)])
+        self.assertEqual(list(duplicate_validator([index])), [('cs.po', 7)])
+
+    def test_missing(self):
+        template = _index('locale/messages.pot', [POEntry(msgid='Apple', linenum=1), POEntry(msgid='Pear', linenum=4)])
+        same_dir = _index('locale/cs.po', [POEntry(msgid='Pear', linenum=1)])
+        domain = _index('locale/de/LC_MESSAGES/messages.po', [POEntry(msgid='Apple', linenum=1)])
+        other = _index('other/cs.po', [])
+        # Errors point to the entries in the template.
+        self.assertEqual(list(missing_validator([template, same_dir, domain, other])),
+                         [('locale/cs.po', 0, 'locale/messages.pot:1: missing entry\n',
+                           entry_key(POEntry(msgid='Apple'))),
+                          ('locale/de/LC_MESSAGES/messages.po', 0, 'locale/messages.pot:4: missing entry\n',
+                           entry_key(POEntry(msgid='Pear')))])
+
+    def test_missing_no_template(self):
+        self.assertEqual(list(missing_validator([_index('cs.po', [])])), [])
+
+    def test_inconsistent(self):
+        first = _index('app/cs.po', [POEntry(msgid='Apple', msgstr='Jablko', linenum=1),
+                                     POEntry(msgid='Pear', msgstr='Hruska', linenum=4)], language='cs')
+        second = _index('lib/cs.po', [POEntry(msgid='Apple', msgstr='Jabko', linenum=1),
+                                      POEntry(msgid='Pear', msgstr='Hruska', linenum=4)], language='cs')
+        other_language = _index('lib/de.po', [POEntry(msgid='Apple', msgstr='Apfel', linenum=1)], language='de')
+        no_language = _index('lib/xx.po', [POEntry(msgid='Apple', msgstr='Xx', linenum=1)])
+        untranslated = _index('ui/cs.po', [POEntry(msgid='Apple', linenum=1)], language='cs')
+        self.assertEqual(list(inconsistent_validator([first, second, other_language, no_language, untranslated])),
+                         [('lib/cs.po', 1)])
+
+    def test_check_indexes(self):
+        first = _index('app/cs.po', [POEntry(msgid='Apple', msgstr='Jablko', linenum=1),
+                                     POEntry(msgid='Apple', msgstr='Jablko', linenum=4)], language='cs')
+        second = _index('lib/cs.po', [POEntry(msgid='Apple', msgstr='Jabko', linenum=1)], language='cs')
+        self.assertEqual(check_indexes([first, second]),
+                         [('app/cs.po', [LintError('app/cs.po', 4, 'duplicate', None)]),
+                          ('lib/cs.po', [LintError('lib/cs.po', 1, 'inconsistent', None)])])
+        self.assertEqual(check_indexes([first, second], exclude={'duplicate', 'inconsistent'}), [])
+
+
+class TestLintFilesCrossFile(unittest.TestCase):
+    """Test cross-file validation of linted files."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.paths = []
+        for path, content in (('app/messages.pot', TEMPLATE), ('app/cs.po', APP), ('lib/cs.po', LIB)):
+            path = os.path.join(self.directory, *path.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as pofile:
+                pofile.write(content)
+            self.paths.append(path)
+        self.expected = [
+            (self.paths[1], [LintError(self.paths[1], 0, 'missing', '%s:8: missing entry\n' % self.paths[0]),
+                             LintError(self.paths[1], 13, 'duplicate', None)]),
+            (self.paths[2], [LintError(self.paths[2], 6, 'inconsistent', None)])]
+
+    def test_serial(self):
+        results = list(lint_files(self.paths, cross_file=True, exclude={'untranslated', 'unsorted', 'fuzzy'}))
+        self.assertEqual(results[3:], self.expected)
+
+    def test_jobs(self):
+        results = list(lint_files(self.paths, jobs=2, cross_file=True, exclude={'untranslated', 'unsorted', 'fuzzy'}))
+        self.assertEqual(results[3:], self.expected)
+
+    def test_split(self):
+        results = list(lint_files(self.paths, jobs=2, split_size=1, cross_file=True,
+                                  exclude={'untranslated', 'unsorted', 'fuzzy'}))
+        self.assertEqual(results[3:], self.expected)
+
+    def test_disabled(self):
+        self.assertEqual(len(list(lint_files(self.paths))), 3)
+
+    def test_main(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([self.directory, '--cross-file', '--include', '*.po,*.pot',
+                  '--ignore', 'untranslated,unsorted,fuzzy,obsolete'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(),
+                         '%(app)s:0: [missing] entry from the template is missing\n'
+                         '%(template)s:8: missing entry\n'
+                         '%(app)s:13: [duplicate] entry is duplicate\n'
+                         '%(lib)s:6: [inconsistent] translation differs from other files\n'
+                         % {'template': self.paths[0], 'app': self.paths[1], 'lib': self.paths[2]})
+
+    def test_main_template(self):
+        # Entries of the template are not reported as untranslated.
+        directory = os.path.join(self.directory, 'ui')
+        os.mkdir(directory)
+        for filename, content in (('messages.pot', TEMPLATE), ('cs.po', TRANSLATION)):
+            with open(os.path.join(directory, filename), 'w') as pofile:
+                pofile.write(content)
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([directory, '--cross-file', '--include', '*.po,*.pot'], output=output)
+        self.assertEqual(context.exception.code, 0)
+        self.assertEqual(output.getvalue(), '')
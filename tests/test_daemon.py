@@ -0,0 +1,193 @@
+"""Test linting daemon."""
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from io import StringIO
+
+from mock import patch
+
+from polint import (ErrorList, LintError, LintResult, LintServer, MemoryCache, ValidatorRegister, _peer_uid, forward,
+                    get_socket_path, main)
+
+INVALID = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+
+
+def invalidator(dummy):
+    """Return failure in every case."""
+    return False
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Test `MemoryCache` class."""
+
+    def test_key(self):
+        cache = MemoryCache()
+        key = cache.get_key(INVALID, ['fuzzy', 'obsolete'])
+        self.assertEqual(cache.get_key(INVALID, ['obsolete', 'fuzzy']), key)
+        self.assertNotEqual(cache.get_key(INVALID, ['fuzzy']), key)
+        self.assertNotEqual(cache.get_key(INVALID, ['fuzzy', 'obsolete'], show_msg=True), key)
+
+    def test_set_get(self):
+        cache = MemoryCache()
+        self.assertIsNone(cache.get('key', 'new.po'))
+        errors = ErrorList()
+        errors.add(13, 'fuzzy')
+        cache.set('key', LintResult('old.po', errors))
+        self.assertEqual(cache.get('key', 'new.po'), [LintError('new.po', 13, 'fuzzy', None)])
+
+    def test_evict(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set('first', LintResult('test.po'))
+        cache.set('second', LintResult('test.po'))
+        cache.get('first', 'test.po')
+        cache.set('third', LintResult('test.po'))
+        self.assertEqual(cache.get('first', 'test.po'), [])
+        self.assertIsNone(cache.get('second', 'test.po'))
+        self.assertEqual(cache.get('third', 'test.po'), [])
+
+
+class TestSocketPath(unittest.TestCase):
+    """Test `get_socket_path` function."""
+
+    def test_option(self):
+        self.assertEqual(get_socket_path({'--socket': 'polint.sock'}), 'polint.sock')
+
+    def test_runtime_dir(self):
+        with patch.dict(os.environ, {'XDG_RUNTIME_DIR': '/run/user/1000'}):
+            self.assertEqual(get_socket_path({'--socket': None}), '/run/user/1000/polint.sock')
+
+    def test_temporary_dir(self):
+        with patch.dict(os.environ, {'XDG_RUNTIME_DIR': ''}):
+            self.assertEqual(get_socket_path({'--socket': None}),
+                             os.path.join(tempfile.gettempdir(), 'polint-%s' % os.getuid(), 'polint.sock'))
+
+
+class TestUnsupported(unittest.TestCase):
+    """Test platforms without Unix sockets."""
+
+    def setUp(self):
+        if hasattr(socket, 'AF_UNIX'):
+            af_unix = socket.AF_UNIX
+            del socket.AF_UNIX
+            self.addCleanup(setattr, socket, 'AF_UNIX', af_unix)
+
+    def test_import(self):
+        process = subprocess.run([sys.executable, '-c', 'import socket; del socket.AF_UNIX; import polint'],
+                                 cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual((process.returncode, process.stderr), (0, ''))
+
+    def test_main(self):
+        for args in (['--serve'], [INVALID, '--daemon']):
+            with self.assertRaises(SystemExit) as context:
+                main(args, output=StringIO())
+            self.assertEqual(context.exception.code, 'Daemon is not supported on this platform')
+
+
+class TestDaemon(unittest.TestCase):
+    """Test linting by the daemon."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'polint.sock')
+
+    def _start(self, register=None):
+        kwargs = {} if register is None else {'register': register}
+        server = LintServer(self.path, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_forward(self):
+        self._start()
+        output = StringIO()
+        self.assertEqual(forward(self.path, [INVALID], output=output), 1)
+        self.assertIn('invalid.po:13: [fuzzy] translation is fuzzy\n', output.getvalue())
+
+    def test_forward_cached(self):
+        server = self._start()
+        forward(self.path, [INVALID], output=StringIO())
+        output = StringIO()
+        with patch('polint.Linter', side_effect=AssertionError('Linter should not be called')):
+            self.assertEqual(forward(self.path, [INVALID], output=output), 1)
+        self.assertIn('invalid.po:13: [fuzzy] translation is fuzzy\n', output.getvalue())
+        self.assertEqual(len(server.cache._results), 1)
+
+    def test_forward_invalid_options(self):
+        self._start()
+        self.assertEqual(forward(self.path, [INVALID, '--jobs', 'many'], output=StringIO()),
+                         'Invalid number of jobs: many')
+
+    def test_forward_malformed(self):
+        self._start()
+        pofile = os.path.join(os.path.dirname(self.path), 'malformed.po')
+        with open(pofile, 'w') as malformed:
+            malformed.write('msgid "Apple\nmsgstr\n')
+        error_output = StringIO()
+        self.assertEqual(forward(self.path, [pofile], output=StringIO(), error_output=error_output), 1)
+        self.assertIn('Syntax error in po file', error_output.getvalue())
+
+    def test_forward_not_running(self):
+        self.assertIsNone(forward(self.path, [INVALID]))
+
+    def test_socket_permissions(self):
+        self._start()
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_forward_other_user(self):
+        # Socket owned by another user isn't used.
+        self._start()
+        error_output = StringIO()
+        with patch('polint.os.getuid', return_value=os.getuid() + 1):
+            self.assertIsNone(forward(self.path, [INVALID], output=StringIO(), error_output=error_output))
+        self.assertEqual(error_output.getvalue(), 'Ignoring socket %s owned by another user\n' % self.path)
+
+    @unittest.skipUnless(hasattr(socket, 'SO_PEERCRED'), 'requires SO_PEERCRED')
+    def test_handle_other_user(self):
+        # Requests of other users aren't handled.
+        server = self._start()
+        connection, client = socket.socketpair(socket.AF_UNIX)
+        with client:
+            with connection:
+                self.assertEqual(_peer_uid(connection), os.getuid())
+                # Request would fail, if it was read.
+                client.shutdown(socket.SHUT_WR)
+                with patch('polint.os.getuid', return_value=os.getuid() + 1):
+                    server._handle(connection, None, server)
+            self.assertEqual(client.recv(1024), b'')
+
+    def test_custom_register(self):
+        reg = ValidatorRegister()
+        reg.register(invalidator, 'error', 'entry is invalid')
+        self._start(register=reg)
+        output = StringIO()
+        self.assertEqual(forward(self.path, [os.path.join(os.path.dirname(__file__), 'data', 'simple_valid.po')],
+                                 output=output), 1)
+        self.assertIn('simple_valid.po:10: [error] entry is invalid\n', output.getvalue())
+
+    def test_main_daemon(self):
+        server = self._start()
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([INVALID, '--daemon', '--socket', self.path], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn('invalid.po:13: [fuzzy] translation is fuzzy\n', output.getvalue())
+        # Result is cached by the daemon
+        self.assertEqual(len(server.cache._results), 1)
+
+    def test_main_fallback(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([INVALID, '--daemon', '--socket', self.path], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn('invalid.po:13: [fuzzy] translation is fuzzy\n', output.getvalue())
@@ -0,0 +1,121 @@
+"""Test fixes of PO files."""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from io import StringIO
+
+from polint import fix_file, main
+
+CONTENT = r'''# Header comment
+msgid ""
+msgstr ""
+"Language: cs\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+
+#: source.py:12
+msgid "Source"
+msgstr "Translation"
+
+#~ msgid "Obsolete"
+#~ msgstr "Zastaralé"
+
+#, fuzzy
+msgctxt "context"
+msgid "Apple"
+msgstr "Jablko"
+
+msgid "Apple"
+msgstr "Jablko"
+'''
+
+
+class TestFixFile(unittest.TestCase):
+    """Test `fix_file` function."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'messages.po')
+        self._write(CONTENT)
+
+    def _write(self, content):
+        with open(self.path, 'w', encoding='utf-8') as pofile:
+            pofile.write(content)
+
+    def _read(self):
+        with open(self.path, encoding='utf-8') as pofile:
+            return pofile.read()
+
+    def test_fix_all(self):
+        fix_file(self.path, ['location', 'obsolete', 'unsorted'])
+        self.assertEqual(self._read(), r'''# Header comment
+msgid ""
+msgstr ""
+"Language: cs\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Apple"
+msgstr "Jablko"
+
+#, fuzzy
+msgctxt "context"
+msgid "Apple"
+msgstr "Jablko"
+
+msgid "Source"
+msgstr "Translation"
+''')
+
+    def test_fix_some(self):
+        fix_file(self.path, ['location'])
+        self.assertEqual(self._read(), CONTENT.replace('#: source.py:12\n', ''))
+
+    def test_external_sort(self):
+        msgids = ['Entry %02d' % (i * 7 % 20) for i in range(20)]
+        self._write(''.join('msgid "%s"\nmsgstr ""\n\n' % msgid for msgid in msgids))
+        fix_file(self.path, ['unsorted'], run_size=3)
+        self.assertEqual(self._read(), '\n'.join('msgid "%s"\nmsgstr ""\n' % msgid for msgid in sorted(msgids)))
+
+    def test_collation(self):
+        self._write('msgid "b"\nmsgstr ""\n\nmsgid "A"\nmsgstr ""\n\nmsgid "a"\nmsgstr ""\n')
+        fix_file(self.path, ['unsorted'], collation='casefold')
+        self.assertEqual(self._read(), 'msgid "A"\nmsgstr ""\n\nmsgid "a"\nmsgstr ""\n\nmsgid "b"\nmsgstr ""\n')
+
+    def test_mode(self):
+        os.chmod(self.path, 0o640)
+        fix_file(self.path, ['unsorted'])
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+        self.assertEqual(os.listdir(self.directory), ['messages.po'])
+
+
+class TestMainFix(unittest.TestCase):
+    """Test `--fix` option of the main function."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'messages.po')
+        with open(self.path, 'w', encoding='utf-8') as pofile:
+            pofile.write(CONTENT)
+
+    def test_fix(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([self.path, '--fix'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        expected = ('%(path)s:10: [fuzzy] translation is fuzzy\n'
+                    '%(path)s:10: [untranslated] translation is missing\n' % {'path': self.path})
+        self.assertEqual(output.getvalue(), expected)
+
+    def test_fix_ignored(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([self.path, '--fix', '--ignore', 'fuzzy,untranslated,unsorted'], output=output)
+        self.assertEqual(context.exception.code, 0)
+        with open(self.path, encoding='utf-8') as pofile:
+            content = pofile.read()
+        # Entries are not sorted, since the unsorted check is disabled.
+        self.assertEqual(content, CONTENT.replace('#: source.py:12\n', '').replace(
+            '#~ msgid "Obsolete"\n#~ msgstr "Zastaralé"\n\n', ''))
@@ -0,0 +1,75 @@
+"""Test git integration."""
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from io import StringIO
+
+from polint import filter_changed, get_changed_files, main
+
+CONTENT = 'msgid "Source"\nmsgstr "Translation"\n'
+
+
+class TestChangedFiles(unittest.TestCase):
+    """Test linting of changed files."""
+
+    def setUp(self):
+        self.directory = os.path.realpath(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+        self._git('init', '--quiet')
+        os.mkdir('locale')
+        for name in ('unchanged.po', 'modified.po', 'staged.po'):
+            self._write(os.path.join('locale', name), CONTENT)
+        self._git('add', '.')
+        self._git('commit', '--quiet', '-m', 'Initial')
+
+    def _git(self, *args):
+        subprocess.run(('git', '-c', 'user.name=Test', '-c', 'user.email=test@example.org') + args, check=True)
+
+    def _write(self, path, content):
+        with open(path, 'w') as pofile:
+            pofile.write(content)
+
+    def test_get_changed_files(self):
+        self._write(os.path.join('locale', 'modified.po'), CONTENT + '\n#, fuzzy\nmsgid "Tree"\nmsgstr ""\n')
+        self._write(os.path.join('locale', 'staged.po'), '')
+        self._git('add', os.path.join('locale', 'staged.po'))
+        self._write(os.path.join('locale', 'untracked.po'), CONTENT)
+
+        changed = get_changed_files('HEAD')
+
+        self.assertEqual(changed, {os.path.join(self.directory, 'locale', n)
+                                   for n in ('modified.po', 'staged.po', 'untracked.po')})
+
+    def test_get_changed_files_subdirectory(self):
+        # Untracked files outside of the working directory are found as well.
+        os.mkdir('other')
+        self._write(os.path.join('locale', 'untracked.po'), CONTENT)
+        os.chdir('other')
+
+        changed = get_changed_files('HEAD')
+
+        self.assertEqual(changed, {os.path.join(self.directory, 'locale', 'untracked.po')})
+
+    def test_filter_changed(self):
+        changed = {os.path.join(self.directory, 'locale', 'modified.po')}
+        filenames = [os.path.join('locale', 'unchanged.po'), os.path.join('locale', 'modified.po')]
+        self.assertEqual(list(filter_changed(filenames, changed)), [os.path.join('locale', 'modified.po')])
+
+    def test_main(self):
+        self._write(os.path.join('locale', 'modified.po'), CONTENT + '\n#, fuzzy\nmsgid "Tree"\nmsgstr ""\n')
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main(['locale', '--changed-since', 'HEAD', '--ignore', 'untranslated'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(),
+                         os.path.join('locale', 'modified.po') + ':4: [fuzzy] translation is fuzzy\n')
+
+    def test_main_unknown_ref(self):
+        with self.assertRaises(SystemExit) as context:
+            main(['locale', '--changed-since', 'unknown'])
+        self.assertIn('Unable to get changed files: ', context.exception.code)
@@ -1,11 +1,14 @@
 """Test Linter."""
 import os
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event
 
-from mock import sentinel
+from mock import patch, sentinel
 from polib import POEntry
 
-from polint import Linter, Status, ValidatorRegister
+from polint import (ErrorList, Linter, LintError, LintResult, Profile, Status, ValidatorRegister, _init_worker,
+                    apply_validator, fuse_validators, sort_validator, split_file)
 
 
 def invalidator(dummy):
@@ -13,6 +16,26 @@ def invalidator(dummy):
     return False
 
 
+def validator(dummy):
+    """Return success in every case."""
+    return True
+
+
+def first_validator(status):
+    """Return failure for the first entry."""
+    return status.previous is not None
+
+
+def msgstr_validator(status):
+    """Return failure for entries without translation."""
+    return status.entry.msgstr != ''
+
+
+def odd_batch_validator(entries, previous):
+    """Return every odd entry as failed."""
+    return [i for i, entry in enumerate(entries) if entry.linenum % 2]
+
+
 class TestStatus(unittest.TestCase):
     """Test `Status` class."""
 
@@ -46,7 +69,7 @@ class TestLinter(unittest.TestCase):
 
         linter.run_validators()
 
-        self.assertEqual(linter.errors, {})
+        self.assertEqual(dict(linter.errors.items()), {})
 
     def test_no_validators(self):
         reg = ValidatorRegister()
@@ -54,7 +77,7 @@ class TestLinter(unittest.TestCase):
 
         linter.run_validators()
 
-        self.assertEqual(linter.errors, {})
+        self.assertEqual(dict(linter.errors.items()), {})
 
     def test_run_validators(self):
         reg = ValidatorRegister()
@@ -64,7 +87,7 @@ class TestLinter(unittest.TestCase):
         linter.run_validators()
 
         entry = POEntry(msgid="Source", msgstr="Translation")
-        self.assertEqual(linter.errors, {entry: ['error']})
+        self.assertEqual([(str(e), errors) for e, errors in linter.errors.items()], [(str(entry), ['error'])])
 
     def test_exclude(self):
         reg = ValidatorRegister()
@@ -74,4 +97,293 @@ class TestLinter(unittest.TestCase):
 
         linter.run_validators()
 
-        self.assertEqual(linter.errors, {})
+        self.assertEqual(dict(linter.errors.items()), {})
+
+    def test_profile(self):
+        reg = ValidatorRegister()
+        reg.register(invalidator, 'error', 'entry in invalid')
+        reg.register(validator, 'valid', 'entry in invalid')
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        profile = Profile()
+        linter = Linter(filename, register=reg, profile=profile)
+
+        linter.run_validators()
+
+        self.assertEqual(len(linter.errors), 5)
+        self.assertEqual(list(profile.validators), ['error', 'valid'])
+        self.assertEqual(profile.validators['error'][0], 5)
+        self.assertEqual(profile.validators['error'][2], 5)
+        self.assertEqual(profile.validators['valid'][0], 5)
+        self.assertEqual(profile.validators['valid'][2], 0)
+        self.assertEqual(list(profile.parse_times), [filename])
+
+    def test_batch(self):
+        reg = ValidatorRegister()
+        reg.register_batch(odd_batch_validator, 'odd', 'entry is odd')
+        reg.register(invalidator, 'error', 'entry in invalid')
+        linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), register=reg)
+        linter.chunk_size = 2
+
+        linter.run_validators()
+
+        self.assertEqual([(e.linenum, errors) for e, errors in linter.errors.items()],
+                         [(10, ['error']), (13, ['odd', 'error']), (17, ['odd', 'error']), (20, ['error']),
+                          (23, ['odd', 'error'])])
+
+    def test_parts(self):
+        reg = ValidatorRegister()
+        reg.register(sort_validator, 'unsorted', 'entry is not sorted')
+        reg.register(first_validator, 'first', 'entry is first')
+        reg.register_batch(odd_batch_validator, 'odd', 'entry is odd')
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        profile = Profile()
+        with ProcessPoolExecutor(2) as executor:
+            linter = Linter(filename, register=reg, profile=profile, executor=executor, parts=3)
+            linter.run_validators()
+
+        # Entry on line 20 is the first entry of the last part, but it's compared to its predecessor.
+        self.assertEqual([(e.linenum, errors) for e, errors in linter.errors.items()],
+                         [(10, ['first']), (13, ['unsorted', 'odd']), (17, ['odd']), (23, ['unsorted', 'odd'])])
+        self.assertEqual(profile.validators['unsorted'][0], 5)
+        self.assertEqual(profile.validators['odd'][0], 5)
+        self.assertEqual(list(profile.parse_times), [filename])
+
+    def test_max_errors(self):
+        reg = ValidatorRegister()
+        reg.register(invalidator, 'error', 'entry in invalid')
+        linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), register=reg, max_errors=3)
+        linter.chunk_size = 2
+
+        linter.run_validators()
+
+        # Validation stops after the chunk which exceeds the errors.
+        self.assertEqual([e.linenum for e in linter.errors], [10, 13, 17, 20])
+        self.assertTrue(linter.is_stopped())
+
+    def test_max_errors_parts(self):
+        reg = ValidatorRegister()
+        reg.register(invalidator, 'error', 'entry in invalid')
+        with ProcessPoolExecutor(2) as executor:
+            linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), register=reg,
+                            executor=executor, parts=3, max_errors=1)
+            linter.run_validators()
+
+        # Parts which follow the part with errors are not merged.
+        self.assertEqual([e.linenum for e in linter.errors], [10, 13, 17])
+
+    def test_cancel(self):
+        reg = ValidatorRegister()
+        reg.register(invalidator, 'error', 'entry in invalid')
+        cancel = Event()
+        self.addCleanup(_init_worker, None)
+        _init_worker(cancel)
+        cancel.set()
+        linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), register=reg)
+        linter.chunk_size = 2
+
+        linter.run_validators()
+
+        # Validation stops after the first chunk once linting is cancelled.
+        self.assertEqual([e.linenum for e in linter.errors], [10, 13])
+
+    def test_fields(self):
+        reg = ValidatorRegister()
+        reg.register(msgstr_validator, 'msgstr', 'entry is not translated', fields=('msgstr', ))
+        linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), register=reg)
+
+        linter.run_validators()
+
+        self.assertEqual([(e.linenum, errors) for e, errors in linter.errors.items()], [(20, ['msgstr'])])
+
+    def test_fields_undeclared(self):
+        reg = ValidatorRegister()
+        reg.register(msgstr_validator, 'msgstr', 'entry is not translated', fields=('flags', ))
+        linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), register=reg)
+
+        with self.assertRaisesRegex(AttributeError, 'Field msgstr of the entry was not parsed'):
+            linter.run_validators()
+
+    def test_get_messages(self):
+        linter = Linter(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'))
+        self.assertEqual(linter.get_messages([13, 23]),
+                         {13: '#, fuzzy\nmsgid "Fuzzy source"\nmsgstr "Fuzzy translation"\n',
+                          23: '#: source.file:42\nmsgid "Location"\nmsgstr "Location"\n'})
+
+
+class TestSplitFile(unittest.TestCase):
+    """Test `split_file` function."""
+
+    def test_single_part(self):
+        self.assertEqual(split_file(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), 1),
+                         [(0, None, 1)])
+
+    def test_parts(self):
+        self.assertEqual(split_file(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), 3),
+                         [(0, 257, 1), (257, 413, 10), (413, None, 20)])
+
+    def test_too_many_parts(self):
+        # Files are split only between entries.
+        self.assertEqual(split_file(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'), 10),
+                         [(0, 257, 1), (257, 352, 10), (352, 445, 17), (445, None, 23)])
+
+    def test_no_boundaries(self):
+        self.assertEqual(split_file(os.path.join(os.path.dirname(__file__), 'data', 'header_only.po'), 3),
+                         [(0, None, 1)])
+
+
+class TestErrorList(unittest.TestCase):
+    """Test `ErrorList` class."""
+
+    def test_empty(self):
+        errors = ErrorList()
+        self.assertFalse(errors)
+        self.assertEqual(len(errors), 0)
+        self.assertEqual(list(errors), [])
+        self.assertEqual(list(errors.items()), [])
+
+    def test_add(self):
+        errors = ErrorList()
+        errors.add(10, 'fuzzy')
+        errors.add(10, 'untranslated')
+        errors.add(15, 'untranslated')
+        errors.add(20, 'obsolete')
+        self.assertTrue(errors)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(errors.error_count, 4)
+        self.assertEqual([e.linenum for e in errors], [10, 15, 20])
+        self.assertEqual(list(errors.lines()), [(10, ['fuzzy', 'untranslated']), (15, ['untranslated']),
+                                                (20, ['obsolete'])])
+
+    def test_replace(self):
+        errors = ErrorList()
+        errors.add(10, 'fuzzy')
+        errors.add(10, 'unsorted')
+        errors.add(15, 'unsorted')
+        errors.add(20, 'obsolete')
+        errors = errors.replace('unsorted', [5, 20])
+        self.assertEqual(list(errors.lines()), [(5, ['unsorted']), (10, ['fuzzy']), (20, ['obsolete', 'unsorted'])])
+
+    def test_records(self):
+        errors = ErrorList()
+        errors.add(10, 'fuzzy', 42)
+        errors.add(10, 'untranslated', 42)
+        errors.add(15, 'untranslated')
+        self.assertEqual(list(errors.records()), [(10, 'fuzzy', 42), (10, 'untranslated', 42), (15, 'untranslated', 0)])
+        errors.set_fingerprints({10: 7, 15: 8})
+        self.assertEqual(list(errors.records()), [(10, 'fuzzy', 42), (10, 'untranslated', 42), (15, 'untranslated', 8)])
+
+    def test_head(self):
+        errors = ErrorList()
+        errors.add(10, 'fuzzy')
+        errors.add(10, 'untranslated')
+        errors.add(15, 'untranslated')
+        head = errors.head(2)
+        self.assertEqual(len(head), 1)
+        self.assertEqual(list(head.lines()), [(10, ['fuzzy', 'untranslated'])])
+        self.assertEqual(errors.error_count, 3)
+        head.add(20, 'obsolete')
+        self.assertEqual(list(head.lines()), [(10, ['fuzzy', 'untranslated']), (20, ['obsolete'])])
+        self.assertEqual([e.linenum for e in errors], [10, 15])
+
+    def test_messages(self):
+        errors = ErrorList(os.path.join(os.path.dirname(__file__), 'data', 'invalid.po'))
+        errors.add(13, 'fuzzy')
+        errors.add(23, 'location')
+        with patch.object(Linter, 'get_messages', autospec=True, side_effect=Linter.get_messages) as get_messages:
+            self.assertEqual([str(e) for e in errors],
+                             ['#, fuzzy\nmsgid "Fuzzy source"\nmsgstr "Fuzzy translation"\n',
+                              '#: source.file:42\nmsgid "Location"\nmsgstr "Location"\n'])
+        # Texts of all entries are read at once.
+        self.assertEqual(get_messages.call_count, 1)
+
+
+class TestLintResult(unittest.TestCase):
+    """Test `LintResult` class."""
+
+    def setUp(self):
+        errors = ErrorList()
+        errors.add(10, 'fuzzy', 42)
+        errors.add(10, 'untranslated', 42)
+        errors.add(15, 'untranslated')
+        self.result = LintResult('cs.po', errors, {15: 'message'})
+        self.expected = [LintError('cs.po', 10, 'fuzzy', None, 42), LintError('cs.po', 10, 'untranslated', None, 42),
+                         LintError('cs.po', 15, 'untranslated', 'message')]
+
+    def test_empty(self):
+        result = LintResult('cs.po')
+        self.assertFalse(result)
+        self.assertEqual(len(result), 0)
+        self.assertEqual(result, [])
+
+    def test_errors(self):
+        self.assertTrue(self.result)
+        self.assertEqual(len(self.result), 3)
+        self.assertEqual(list(self.result), self.expected)
+        self.assertEqual(self.result, self.expected)
+        self.assertNotEqual(self.result, self.expected[:2])
+        self.assertEqual([(e.linenum, codes) for e, codes in self.result.items()],
+                         [(10, ['fuzzy', 'untranslated']), (15, ['untranslated'])])
+
+    def test_slice(self):
+        self.assertIs(self.result[:None], self.result)
+        head = self.result[:2]
+        self.assertIsInstance(head, LintResult)
+        self.assertEqual(head, self.expected[:2])
+        self.assertEqual(self.result[1:], self.expected[1:])
+        self.assertEqual(self.result[-1], self.expected[-1])
+
+
+class TestApplyValidator(unittest.TestCase):
+    """Test `apply_validator` function."""
+
+    def test_entry_validator(self):
+        entries = [POEntry(msgid='B'), POEntry(msgid='A'), POEntry(msgid='C')]
+        self.assertEqual(apply_validator(lambda s: s.previous is None or s.previous.msgid < s.entry.msgid, entries),
+                         [1])
+        self.assertEqual(apply_validator(lambda s: s.previous is None or s.previous.msgid < s.entry.msgid, entries,
+                                         previous=POEntry(msgid='D')),
+                         [0, 1])
+
+    def test_batch_validator(self):
+        entries = [POEntry(msgid='B'), POEntry(msgid='A')]
+        self.assertEqual(apply_validator(lambda e, p: (i for i, e in enumerate(e) if e.msgid == 'A'), entries,
+                                         batch=True),
+                         [1])
+
+
+class TestFuseValidators(unittest.TestCase):
+    """Test `fuse_validators` function."""
+
+    def test_fuse(self):
+        entries = [POEntry(msgid='a', linenum=1), POEntry(msgid='b', msgstr='B', linenum=2)]
+        fused = fuse_validators([invalidator, first_validator, msgstr_validator])
+        self.assertEqual(fused(entries, None), ([0, 1], [0], [0]))
+        self.assertEqual(fused(entries, entries[1]), ([0, 1], [], [0]))
+
+    def test_empty(self):
+        self.assertEqual(fuse_validators([])([POEntry(msgid='a')], None), ())
+
+
+class TestProfile(unittest.TestCase):
+    """Test `Profile` class."""
+
+    def test_update(self):
+        profile = Profile()
+        profile.add_validator('error', 2, 0.5, 1)
+        profile.add_parse_time('first.po', 0.25)
+        other = Profile()
+        other.add_validator('error', 3, 0.25, 0)
+        other.add_validator('other', 1, 0.5, 1)
+        other.add_parse_time('second.po', 0.5)
+
+        profile.update(other)
+
+        self.assertEqual(profile.validators, {'error': [5, 0.75, 1], 'other': [1, 0.5, 1]})
+        self.assertEqual(profile.parse_times, {'first.po': 0.25, 'second.po': 0.5})
+
+    def test_as_dict(self):
+        profile = Profile()
+        profile.add_validator('error', 2, 0.5, 1)
+        profile.add_parse_time('first.po', 0.25)
+        self.assertEqual(profile.as_dict(), {'validators': {'error': {'calls': 2, 'time': 0.5, 'failures': 1}},
+                                             'parse_times': {'first.po': 0.25}})
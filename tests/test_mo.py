@@ -0,0 +1,170 @@
+"""Test linting of compiled catalogs."""
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from io import StringIO
+
+import polib
+
+from polint import (Linter, LintError, MOCatalog, _hashpjw, index_file, lint_file, lint_files, main,
+                    mo_duplicate_batch_validator, mo_sort_batch_validator)
+
+HEADER = b'Language: cs\nContent-Type: text/plain; charset=UTF-8\n'
+
+
+def _mo_content(messages, hash_size=0, byte_order='<'):
+    """Return content of the MO file with the messages.
+
+    @param messages: List of (original, translation) pairs of raw strings
+    @param hash_size: Size of the hash table, no hash table by default.
+    """
+    count = len(messages)
+    originals_offset = 28
+    translations_offset = originals_offset + 8 * count
+    hash_offset = translations_offset + 8 * count
+    strings_offset = hash_offset + 4 * hash_size
+    tables = []
+    strings = b''
+    for position in (0, 1):
+        table = []
+        for message in messages:
+            table.extend((len(message[position]), strings_offset + len(strings)))
+            strings += message[position] + b'\x00'
+        tables.append(table)
+    hash_table = [0] * hash_size
+    for index, (original, dummy) in enumerate(messages):
+        value = _hashpjw(original.split(b'\x00')[0])
+        slot = value % hash_size if hash_size else 0
+        while hash_size and hash_table[slot]:
+            slot = (slot + 1 + value % (hash_size - 2)) % hash_size
+        if hash_size:
+            hash_table[slot] = index + 1
+    integers = [0x950412de, 0, count, originals_offset, translations_offset, hash_size, hash_offset]
+    integers += tables[0] + tables[1] + hash_table
+    return struct.pack('%s%dI' % (byte_order, len(integers)), *integers) + strings
+
+
+class MOTestCase(unittest.TestCase):
+    """Base class for tests with MO files."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _write(self, messages, name='cs.mo', **kwargs):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as mofile:
+            mofile.write(_mo_content(messages, **kwargs))
+        return path
+
+
+class TestMOCatalog(MOTestCase):
+    """Test `MOCatalog` class."""
+
+    messages = [(b'', HEADER), (b'Apple\x00Apples', b'Jablko\x00Jablka\x00'), (b'fruit\x04Pear', b'Hru\xc5\xa1ka')]
+
+    def test_entries(self):
+        for hash_size, byte_order in ((0, '<'), (7, '<'), (7, '>')):
+            catalog = MOCatalog(self._write(self.messages, hash_size=hash_size, byte_order=byte_order))
+            self.assertEqual(len(catalog), 3)
+            self.assertEqual(catalog.encoding, 'UTF-8')
+            self.assertEqual(catalog.header.msgstr, HEADER.decode())
+            apple, pear = list(catalog)
+            self.assertEqual((apple.linenum, apple.msgid, apple.msgid_plural, apple.msgctxt, apple.msgstr),
+                             (2, 'Apple', 'Apples', None, ''))
+            self.assertEqual(apple.msgstr_plural, {0: 'Jablko', 1: 'Jablka', 2: ''})
+            self.assertFalse(apple.translated())
+            self.assertEqual((pear.linenum, pear.msgid, pear.msgctxt, pear.msgstr), (3, 'Pear', 'fruit', 'Hruška'))
+            self.assertTrue(pear.translated())
+            self.assertEqual(pear.key, b'fruit\x04Pear')
+            self.assertEqual(str(pear), 'msgctxt "fruit"\nmsgid "Pear"\nmsgstr "Hruška"\n')
+
+    def test_lookup(self):
+        for hash_size in (0, 7):
+            catalog = MOCatalog(self._write(self.messages, hash_size=hash_size))
+            self.assertEqual(catalog.lookup(b''), 0)
+            self.assertEqual(catalog.lookup(b'Apple'), 1)
+            self.assertEqual(catalog.lookup(b'fruit\x04Pear'), 2)
+            self.assertIsNone(catalog.lookup(b'Pear'))
+
+    def test_polib(self):
+        pofile = polib.POFile()
+        pofile.metadata = {'Content-Type': 'text/plain; charset=UTF-8'}
+        pofile.append(polib.POEntry(msgid='Pear', msgstr='Hruška'))
+        pofile.append(polib.POEntry(msgid='Apple', msgstr='Jablko', msgctxt='fruit'))
+        path = os.path.join(self.directory, 'cs.mo')
+        pofile.save_as_mofile(path)
+        catalog = MOCatalog(path)
+        self.assertEqual([(e.msgctxt, e.msgid, e.msgstr) for e in catalog],
+                         [(None, 'Pear', 'Hruška'), ('fruit', 'Apple', 'Jablko')])
+
+    def test_invalid(self):
+        path = os.path.join(self.directory, 'cs.mo')
+        with open(path, 'wb') as mofile:
+            mofile.write(b'msgid ""\nmsgstr ""\n\nmsgid "Apple"\nmsgstr "Jablko"\n')
+        with self.assertRaisesRegex(IOError, 'invalid magic number'):
+            MOCatalog(path)
+
+    def test_truncated(self):
+        path = self._write(self.messages)
+        with open(path, 'r+b') as mofile:
+            mofile.truncate(40)
+        with self.assertRaisesRegex(IOError, 'exceeds the file'):
+            MOCatalog(path)
+
+
+class TestMOValidators(MOTestCase):
+    """Test validators of compiled catalogs."""
+
+    def test_sort(self):
+        catalog = MOCatalog(self._write([(b'', HEADER), (b'b', b'B'), (b'a', b'A'), (b'c', b'C'), (b'c', b'C')]))
+        entries = list(catalog)
+        self.assertEqual(mo_sort_batch_validator(entries, None), [1, 3])
+        self.assertEqual(mo_sort_batch_validator(entries[2:], entries[0]), [1])
+        self.assertEqual(mo_sort_batch_validator(entries[1:3], None), [])
+
+    def test_duplicate(self):
+        messages = [(b'', HEADER), (b'a', b'A'), (b'b', b'B'), (b'a\x00as', b'A\x00As'), (b'ctx\x04a', b'A')]
+        for hash_size in (0, 11):
+            catalog = MOCatalog(self._write(messages, hash_size=hash_size))
+            self.assertEqual(mo_duplicate_batch_validator(list(catalog), None), [2])
+
+
+class TestLintMO(MOTestCase):
+    """Test linting of compiled catalogs."""
+
+    def setUp(self):
+        super().setUp()
+        self.path = self._write([(b'', HEADER), (b'Pear', b'Hruska'), (b'Apple', b''), (b'Pear', b'Hruska')],
+                                hash_size=7)
+
+    def test_linter(self):
+        linter = Linter(self.path)
+        linter.run_validators()
+        self.assertEqual([(e.linenum, errors) for e, errors in linter.errors.items()],
+                         [(3, ['untranslated', 'unsorted']), (4, ['duplicate'])])
+
+    def test_lint_file(self):
+        self.assertEqual(lint_file(self.path, exclude={'unsorted'}, show_msg=True),
+                         [LintError(self.path, 3, 'untranslated', 'msgid "Apple"\nmsgstr ""\n'),
+                          LintError(self.path, 4, 'duplicate', 'msgid "Pear"\nmsgstr "Hruska"\n')])
+
+    def test_index(self):
+        index = index_file(self.path)
+        self.assertEqual(index.language, 'cs')
+        self.assertEqual(sorted(index.lines), [2, 3, 4])
+
+    def test_cross_file(self):
+        # Duplicates are reported only once, by the cross-file validator.
+        results = list(lint_files([self.path], cross_file=True, fix=True, sort_moves=True, exclude={'untranslated'}))
+        self.assertEqual(results, [(self.path, [LintError(self.path, 3, 'unsorted', None)]),
+                                   (self.path, [LintError(self.path, 4, 'duplicate', None)])])
+
+    def test_main(self):
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([self.directory, '--include', '*.mo', '--ignore', 'untranslated,unsorted'], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(), '%s:4: [duplicate] entry is duplicate\n' % self.path)
@@ -0,0 +1,223 @@
+"""Test PO file parser."""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import polib
+from mock import patch
+
+from polint import EntryStream, MappedEntry, MappedEntryStream, detect_encoding, open_stream
+
+CONTENT = r'''# Translation file header comment
+msgid ""
+msgstr ""
+"Project-Id-Version: parser-tests\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+
+# Translator comment
+#. Extracted comment
+#: source.py:12 other.py:7 no_line.py
+#, fuzzy, python-format
+#| msgid "Old %s"
+msgid "Source %s"
+msgstr "Translation %s"
+msgid "Entry without blank line"
+msgstr ""
+"Multi "
+"line"
+
+msgctxt "context"
+msgid "Apple"
+msgid_plural "Apples"
+msgstr[0] "Jablko"
+msgstr[1] ""
+"Jablka"
+
+msgid "Quote \"escaped\""
+msgstr "Uvozovky \"escaped\""
+
+#~| msgid "Older"
+#~ msgid "Obsolete"
+#~ msgstr "Zastaralé"
+
+# Trailing comment
+'''
+
+
+def _as_tuples(entries):
+    return [(e.linenum, str(e), e.obsolete, e.msgctxt, e.flags, e.occurrences) for e in entries]
+
+
+class TestEntryStream(unittest.TestCase):
+    """Test `EntryStream` class."""
+
+    def test_content(self):
+        stream = EntryStream(CONTENT)
+        self.assertEqual(_as_tuples(stream), _as_tuples(polib.pofile(CONTENT)))
+        self.assertEqual(stream.header.msgstr,
+                         'Project-Id-Version: parser-tests\nContent-Type: text/plain; charset=UTF-8\n')
+        self.assertEqual(stream.header_comment, polib.pofile(CONTENT).header)
+
+    def test_data_files(self):
+        dirname = os.path.join(os.path.dirname(__file__), 'data')
+        for filename in ('empty.po', 'header_only.po', 'invalid.po', 'simple_valid.po'):
+            path = os.path.join(dirname, filename)
+            self.assertEqual(_as_tuples(EntryStream(path)), _as_tuples(polib.pofile(path)))
+
+    def test_lazy(self):
+        entries = iter(EntryStream(CONTENT))
+        self.assertEqual(next(entries).msgid, 'Source %s')
+
+    def test_no_header(self):
+        content = 'msgid "Source"\nmsgstr "Translation"\n'
+        self.assertEqual(_as_tuples(EntryStream(content)), _as_tuples(polib.pofile(content)))
+
+    def test_part(self):
+        path = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        stream = EntryStream(path, start=257, end=413, first_line=10)
+        self.assertEqual(_as_tuples(stream), _as_tuples(polib.pofile(path))[:3])
+        self.assertIsNone(stream.header)
+
+    def test_syntax_error(self):
+        with self.assertRaisesRegex(IOError, r'Syntax error in po file \(line 2\)'):
+            list(EntryStream('msgid "Source"\nunknown "Translation"\n'))
+
+    def test_unescaped_quote(self):
+        with self.assertRaisesRegex(IOError, 'unescaped double quote found'):
+            list(EntryStream('msgid "Sou"rce"\nmsgstr "Translation"\n'))
+
+    def test_invalid_transition(self):
+        with self.assertRaisesRegex(IOError, r'Syntax error in po file \(line 1\)'):
+            list(EntryStream('msgstr "Translation"\n'))
+
+
+class TestMappedEntryStream(unittest.TestCase):
+    """Test `MappedEntryStream` class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _write(self, content, encoding='utf-8'):
+        path = os.path.join(self.directory, 'messages.po')
+        with open(path, 'w', encoding=encoding) as pofile:
+            pofile.write(content)
+        return path
+
+    def test_file(self):
+        path = self._write(CONTENT)
+        stream = MappedEntryStream(path)
+        self.assertEqual(_as_tuples(stream), _as_tuples(polib.pofile(path)))
+        self.assertEqual(stream.header.msgstr,
+                         'Project-Id-Version: parser-tests\nContent-Type: text/plain; charset=UTF-8\n')
+        self.assertEqual(stream.header_comment, polib.pofile(path).header)
+
+    def test_fields(self):
+        path = self._write(CONTENT)
+        for entry, expected in zip(MappedEntryStream(path), polib.pofile(path)):
+            self.assertEqual(entry.tcomment, expected.tcomment)
+            self.assertEqual(entry.comment, expected.comment)
+            self.assertEqual(entry.msgid_plural, expected.msgid_plural)
+            self.assertEqual(entry.msgstr_plural, expected.msgstr_plural)
+            self.assertEqual(entry.previous_msgid, expected.previous_msgid)
+            self.assertEqual(entry.translated(), expected.translated())
+
+    def test_data_files(self):
+        dirname = os.path.join(os.path.dirname(__file__), 'data')
+        for filename in ('empty.po', 'header_only.po', 'invalid.po', 'simple_valid.po'):
+            path = os.path.join(dirname, filename)
+            self.assertEqual(_as_tuples(MappedEntryStream(path)), _as_tuples(polib.pofile(path)))
+
+    def test_content(self):
+        self.assertEqual(_as_tuples(MappedEntryStream(CONTENT)), _as_tuples(polib.pofile(CONTENT)))
+
+    def test_lazy(self):
+        entry = next(iter(MappedEntryStream(self._write(CONTENT))))
+        self.assertNotIn('msgstr', vars(entry))
+        self.assertEqual(entry.msgid, 'Source %s')
+        self.assertEqual(vars(entry)['msgid'], 'Source %s')
+        self.assertNotIn('msgstr', vars(entry))
+
+    def test_parsed_fields(self):
+        path = self._write(CONTENT)
+        stream = MappedEntryStream(path, fields=['flags'])
+        entries = list(stream)
+        self.assertEqual([(e.linenum, e.obsolete, e.flags) for e in entries],
+                         [(e.linenum, e.obsolete, e.flags) for e in polib.pofile(path)])
+        self.assertEqual(entries[0].msgid, 'Source %s')
+        with self.assertRaisesRegex(AttributeError, 'Field msgstr of the entry was not parsed'):
+            entries[0].msgstr
+        self.assertEqual(stream.header.msgid, '')
+
+    def test_decode_error(self):
+        entry = next(iter(MappedEntryStream(self._write(CONTENT))))
+        with patch.object(MappedEntry, '_decode_field', side_effect=AttributeError('decoder')):
+            with self.assertRaisesRegex(RuntimeError, 'Field msgstr of the entry failed to decode') as context:
+                entry.msgstr
+        self.assertIsInstance(context.exception.__cause__, AttributeError)
+
+    def test_part(self):
+        path = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        stream = MappedEntryStream(path, start=257, end=413, first_line=10)
+        self.assertEqual(_as_tuples(stream), _as_tuples(polib.pofile(path))[:3])
+
+    def test_pickle(self):
+        entry = next(iter(MappedEntryStream(self._write(CONTENT))))
+        restored = pickle.loads(pickle.dumps(entry))
+        self.assertIsInstance(restored, polib.POEntry)
+        self.assertEqual(str(restored), str(entry))
+
+    def test_encoding(self):
+        content = CONTENT.replace('UTF-8', 'ISO-8859-2')
+        path = self._write(content, encoding='iso-8859-2')
+        self.assertEqual(_as_tuples(MappedEntryStream(path)), _as_tuples(polib.pofile(path)))
+
+    def test_incompatible_encoding(self):
+        # Shift JIS encodes some characters with backslash bytes.
+        content = CONTENT.replace('UTF-8', 'Shift_JIS').replace('Zastaralé', '\u30bd\u30fc\u30b9')
+        path = self._write(content, encoding='shift_jis')
+        self.assertEqual(_as_tuples(MappedEntryStream(path)), _as_tuples(polib.pofile(path)))
+
+    def test_syntax_error(self):
+        with self.assertRaisesRegex(IOError, r'Syntax error in po file .*messages.po \(line 2\)'):
+            list(MappedEntryStream(self._write('msgid "Source"\nunknown "Translation"\n')))
+
+    def test_unescaped_quote(self):
+        with self.assertRaisesRegex(IOError, 'unescaped double quote found'):
+            list(MappedEntryStream(self._write('msgid "Sou"rce"\nmsgstr "Translation"\n')))
+
+
+class TestOpenStream(unittest.TestCase):
+    """Test `open_stream` function."""
+
+    def test_stream(self):
+        path = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        for fields, stream_class in ((None, EntryStream), (('flags', 'msgstr', 'occurrences'), EntryStream),
+                                     (('flags', ), MappedEntryStream), (('msgid', 'msgctxt'), MappedEntryStream),
+                                     ((), MappedEntryStream)):
+            stream = open_stream(path, fields=fields)
+            self.assertIs(type(stream), stream_class)
+            self.assertEqual([(e.linenum, e.msgid) for e in stream], [(e.linenum, e.msgid) for e in polib.pofile(path)])
+
+    def test_part(self):
+        path = os.path.join(os.path.dirname(__file__), 'data', 'invalid.po')
+        expected = [(e.linenum, e.msgid) for e in polib.pofile(path)][:3]
+        for fields in (None, ()):
+            stream = open_stream(path, start=257, end=413, first_line=10, fields=fields)
+            self.assertEqual([(e.linenum, e.msgid) for e in stream], expected)
+
+
+class TestDetectEncoding(unittest.TestCase):
+    """Test `detect_encoding` function."""
+
+    def test_charset(self):
+        self.assertEqual(detect_encoding(b'"Content-Type: text/plain; charset=ISO-8859-2\\n"\n'), 'ISO-8859-2')
+
+    def test_unknown_charset(self):
+        self.assertEqual(detect_encoding(b'"Content-Type: text/plain; charset=unknown\\n"\n'),
+                         polib.default_encoding)
+
+    def test_no_charset(self):
+        self.assertEqual(detect_encoding(b'msgid ""\nmsgstr ""\n'), polib.default_encoding)
@@ -0,0 +1,109 @@
+"""Test third-party validators from entry points."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from io import StringIO
+
+from mock import patch
+
+from polint import REGISTER, _may_have_entry_points, get_plugins, load_plugins, main
+
+PLUGIN = '''
+def shout_validator(status):
+    return not status.entry.msgid.isupper()
+
+
+def register(register):
+    register.register(shout_validator, 'shout', 'source is upper case')
+
+
+def broken(register):
+    pass
+'''
+
+ENTRY_POINTS = '''[polint.validators]
+shout = polint_test_plugin:register
+
+[polint.test_broken]
+broken = polint_test_plugin:broken
+'''
+
+CONTENT = '''msgid "HELLO"
+msgstr "AHOJ"
+'''
+
+
+class TestPlugins(unittest.TestCase):
+    """Test loading of third-party validators."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        with open(os.path.join(self.directory, 'polint_test_plugin.py'), 'w') as plugin:
+            plugin.write(PLUGIN)
+        dist_info = os.path.join(self.directory, 'polint_test_plugin-1.0.dist-info')
+        os.mkdir(dist_info)
+        with open(os.path.join(dist_info, 'METADATA'), 'w') as metadata:
+            metadata.write('Metadata-Version: 2.1\nName: polint-test-plugin\nVersion: 1.0\n')
+        with open(os.path.join(dist_info, 'entry_points.txt'), 'w') as entry_points:
+            entry_points.write(ENTRY_POINTS)
+        patcher = patch.object(sys, 'path', [self.directory] + sys.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(sys.modules.pop, 'polint_test_plugin', None)
+
+    def test_may_have_entry_points(self):
+        self.assertTrue(_may_have_entry_points('polint.validators'))
+        self.assertFalse(_may_have_entry_points('polint.unknown'))
+
+    def test_may_have_entry_points_egg(self):
+        egg = os.path.join(self.directory, 'polint_test_egg-1.0-py3.egg')
+        os.makedirs(os.path.join(egg, 'EGG-INFO'))
+        with open(os.path.join(egg, 'EGG-INFO', 'PKG-INFO'), 'w') as metadata:
+            metadata.write('Metadata-Version: 1.1\nName: polint-test-egg\nVersion: 1.0\n')
+        with open(os.path.join(egg, 'EGG-INFO', 'entry_points.txt'), 'w') as entry_points:
+            entry_points.write('[polint.test_egg]\negg = polint_test_egg:register\n')
+        with patch.object(sys, 'path', [egg]):
+            self.assertTrue(_may_have_entry_points('polint.test_egg'))
+            self.assertEqual([e.name for e in get_plugins('polint.test_egg')], ['egg'])
+        self.assertFalse(_may_have_entry_points('polint.test_egg'))
+
+    def test_get_plugins(self):
+        self.assertEqual([p.name for p in get_plugins()], ['shout'])
+        self.assertEqual(get_plugins('polint.unknown'), [])
+
+    def test_load_plugins(self):
+        register = load_plugins(REGISTER)
+        self.assertIsNot(register, REGISTER)
+        self.assertEqual(register.errors['shout'], 'source is upper case')
+        self.assertNotIn('shout', REGISTER.validators)
+        # Registered plugins are not loaded again.
+        self.assertIs(load_plugins(register), register)
+
+    def test_excluded(self):
+        self.assertIs(load_plugins(REGISTER, exclude={'shout'}), REGISTER)
+        self.assertNotIn('polint_test_plugin', sys.modules)
+
+    def test_broken(self):
+        with self.assertRaisesRegex(ValueError, 'Plugin polint_test_plugin:broken did not register validator for '
+                                                'broken.'):
+            load_plugins(REGISTER, group='polint.test_broken')
+
+    def test_main(self):
+        path = os.path.join(self.directory, 'cs.po')
+        with open(path, 'w') as pofile:
+            pofile.write(CONTENT)
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([path], output=output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(output.getvalue(), '%s:0: [shout] source is upper case\n' % path)
+
+        sys.modules.pop('polint_test_plugin')
+        output = StringIO()
+        with self.assertRaises(SystemExit) as context:
+            main([path, '--ignore', 'shout'], output=output)
+        self.assertEqual(context.exception.code, 0)
+        self.assertNotIn('polint_test_plugin', sys.modules)
@@ -9,6 +9,11 @@ def test_callback(dummy):
     raise NotImplementedError
 
 
+def other_callback(dummy):
+    """Do nothing, used to replace `test_callback`."""
+    raise NotImplementedError
+
+
 class TestValidatorRegister(unittest.TestCase):
     """Test `ValidatorRegister`."""
 
@@ -28,3 +33,64 @@ class TestValidatorRegister(unittest.TestCase):
         reg.register(test_callback, 'error', 'entry is invalid')
         with self.assertRaises(ValueError):
             reg.register(test_callback, 'error', 'entry is broken')
+
+    def test_register_batch(self):
+        reg = ValidatorRegister()
+        reg.register(test_callback, 'error', 'entry is invalid')
+        reg.register_batch(test_callback, 'batch', 'entries are invalid')
+        self.assertEqual(reg.errors, {'error': 'entry is invalid', 'batch': 'entries are invalid'})
+        self.assertEqual(reg.validators, {'error': test_callback, 'batch': test_callback})
+        self.assertFalse(reg.is_batch('error'))
+        self.assertTrue(reg.is_batch('batch'))
+
+    def test_batch_already_registered(self):
+        reg = ValidatorRegister()
+        reg.register(test_callback, 'error', 'entry is invalid')
+        with self.assertRaises(ValueError):
+            reg.register_batch(test_callback, 'error', 'entry is broken')
+        self.assertFalse(reg.is_batch('error'))
+
+    def test_fields(self):
+        reg = ValidatorRegister()
+        reg.register(test_callback, 'error', 'entry is invalid', fields=('msgid', ))
+        reg.register_batch(test_callback, 'batch', 'entries are invalid', fields=['flags', 'msgid'])
+        reg.register(test_callback, 'other', 'entry is other')
+        self.assertEqual(reg.get_fields(['error']), {'msgid'})
+        self.assertEqual(reg.get_fields(['error', 'batch']), {'msgid', 'flags'})
+        self.assertEqual(reg.get_fields([]), set())
+        self.assertIsNone(reg.get_fields(['error', 'other']))
+
+    def test_unknown_fields(self):
+        reg = ValidatorRegister()
+        with self.assertRaisesRegex(ValueError, 'Unknown fields unknown.'):
+            reg.register(test_callback, 'error', 'entry is invalid', fields=('msgid', 'unknown'))
+        self.assertEqual(reg.validators, {})
+
+    def test_replace(self):
+        reg = ValidatorRegister()
+        reg.register(test_callback, 'error', 'entry is invalid', fields=('msgid', ))
+        reg.replace(other_callback, 'error')
+        self.assertEqual(reg.validators, {'error': other_callback})
+        self.assertEqual(reg.errors, {'error': 'entry is invalid'})
+        self.assertEqual(reg.get_fields(['error']), {'msgid'})
+        with self.assertRaises(KeyError):
+            reg.replace(other_callback, 'unknown')
+
+    def test_copy(self):
+        reg = ValidatorRegister()
+        reg.register_batch(test_callback, 'error', 'entry is invalid')
+        copy = reg.copy()
+        copy.replace(other_callback, 'error')
+        copy.register(test_callback, 'other', 'entry is other')
+        self.assertEqual(reg.validators, {'error': test_callback})
+        self.assertEqual(copy.validators, {'error': other_callback, 'other': test_callback})
+        self.assertTrue(copy.is_batch('error'))
+
+    def test_register_cross_file(self):
+        reg = ValidatorRegister()
+        reg.register_cross_file(test_callback, 'error', 'entries are invalid')
+        self.assertEqual(reg.validators, {'error': test_callback})
+        self.assertTrue(reg.is_cross_file('error'))
+        self.assertFalse(reg.is_batch('error'))
+        self.assertEqual(reg.get_fields(['error']), set())
+        self.assertTrue(reg.copy().is_cross_file('error'))
@@ -0,0 +1,81 @@
+"""Test startup of the command isn't slowed down by imports."""
+import ast
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules which are imported lazily, only by runs which need them
+LAZY_MODULES = ('asyncio', 'concurrent.futures', 'docopt', 'hashlib', 'json', 'locale', 'mmap', 'pickle', 'polib',
+                'socket', 'socketserver', 'subprocess', 'tempfile', 'unicodedata')
+# Prints modules from LAZY_MODULES which were actually loaded
+SCRIPT = '''
+import sys
+sys.argv = ['polint'] + %(args)r
+import polint
+try:
+    polint.main()
+except SystemExit:
+    pass
+loaded = [n for n in %(modules)r if n in sys.modules]
+sys.stderr.write('loaded: %%r\\n' %% loaded)
+'''
+# Lints the file in many threads at once, before any of the modules is imported
+THREADS_SCRIPT = '''
+import sys, threading
+from concurrent.futures import ThreadPoolExecutor
+import polint
+barrier = threading.Barrier(16)
+def lint(filename):
+    barrier.wait()
+    return len(list(polint.EntryStream(filename))), len(polint.lint_file(filename, fingerprints=True))
+with ThreadPoolExecutor(16) as executor:
+    sys.stdout.write('%%r\\n' %% set(executor.map(lint, [%(filename)r] * 16)))
+'''
+
+
+def _startup(*args):
+    """Run polint in a new interpreter and return modules loaded and import time of polint in microseconds."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                              SCRIPT % {'args': list(args), 'modules': LAZY_MODULES}],
+                             cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    import_time = None
+    loaded = None
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and line.split('|')[-1].strip() == 'polint':
+            import_time = int(line.split('|')[1])
+        elif line.startswith('loaded: '):
+            loaded = ast.literal_eval(line[len('loaded: '):])
+    return loaded, import_time
+
+
+class TestStartup(unittest.TestCase):
+    """Test modules imported at startup."""
+
+    def test_version(self):
+        loaded, import_time = _startup('--version')
+        self.assertEqual(loaded, [], 'import of polint took %s us' % import_time)
+
+    def test_help(self):
+        loaded, import_time = _startup('--help')
+        self.assertEqual(loaded, [], 'import of polint took %s us' % import_time)
+
+    def test_lint(self):
+        loaded, import_time = _startup(os.path.join('tests', 'data', 'invalid.po'))
+        self.assertEqual(loaded, ['polib'], 'import of polint took %s us' % import_time)
+
+    def test_options(self):
+        loaded, import_time = _startup('--fail-fast', os.path.join('tests', 'data', 'invalid.po'))
+        self.assertEqual(loaded, ['docopt', 'polib'], 'import of polint took %s us' % import_time)
+
+
+class TestThreads(unittest.TestCase):
+    """Test modules imported on demand are safe to use from threads."""
+
+    def test_threads(self):
+        filename = os.path.join('tests', 'data', 'invalid.po')
+        for dummy in range(5):
+            process = subprocess.run([sys.executable, '-c', THREADS_SCRIPT % {'filename': filename}], cwd=ROOT,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            self.assertEqual((process.stdout, process.stderr), ('{(5, 8)}\n', ''))
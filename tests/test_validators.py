@@ -1,10 +1,14 @@
 """Tests for individual validators."""
+import os
+import shutil
+import tempfile
 import unittest
 
 from polib import POEntry
 
-from polint import (Status, fuzzy_validator, no_location_validator, obsolete_validator, sort_validator,
-                    untranslated_validator)
+from polint import (SortValidator, Status, find_misplaced, fuzzy_batch_validator, fuzzy_validator,
+                    no_location_batch_validator, no_location_validator, obsolete_batch_validator, obsolete_validator,
+                    sort_batch_validator, sort_validator, untranslated_batch_validator, untranslated_validator)
 
 
 class TestFuzzyValidator(unittest.TestCase):
@@ -131,3 +135,84 @@ class TestSortValidator(unittest.TestCase):
         status.step(first)
         status.step(second)
         self.assertTrue(sort_validator(status))
+
+
+class TestBatchValidators(unittest.TestCase):
+    """Test batch validators."""
+
+    def test_fuzzy(self):
+        entries = [POEntry(msgid="Source", msgstr="Translation"),
+                   POEntry(msgid="Source", msgstr="Translation", flags=['another', 'fuzzy'])]
+        self.assertEqual(fuzzy_batch_validator(entries, None), [1])
+
+    def test_obsolete(self):
+        entries = [POEntry(msgid="Source", msgstr="Translation", obsolete=True),
+                   POEntry(msgid="Source", msgstr="Translation")]
+        self.assertEqual(obsolete_batch_validator(entries, None), [0])
+
+    def test_untranslated(self):
+        entries = [POEntry(msgid="Source", msgstr="Translation"), POEntry(msgid="Source", msgstr=""),
+                   POEntry(msgid="Source", msgstr="Translation", flags=['fuzzy'])]
+        self.assertEqual(untranslated_batch_validator(entries, None), [1, 2])
+
+    def test_no_location(self):
+        entries = [POEntry(msgid="Source", msgstr="Translation", occurrences=[('source.py', 1)]),
+                   POEntry(msgid="Source", msgstr="Translation")]
+        self.assertEqual(no_location_batch_validator(entries, None), [0])
+
+    def test_sort_first(self):
+        entries = [POEntry(msgid="Second"), POEntry(msgid="First"), POEntry(msgid="First", msgctxt="abbrev."),
+                   POEntry(msgid="First", msgctxt="abbrev.")]
+        self.assertEqual(sort_batch_validator(entries, None), [1, 3])
+
+    def test_sort_previous(self):
+        entries = [POEntry(msgid="First"), POEntry(msgid="Second")]
+        self.assertEqual(sort_batch_validator(entries, POEntry(msgid="Third")), [0])
+        self.assertEqual(sort_batch_validator(entries, POEntry(msgid="A")), [])
+
+
+class TestSortCollation(unittest.TestCase):
+    """Test `SortValidator` with collations."""
+
+    def test_codepoint(self):
+        entries = [POEntry(msgid="Apple"), POEntry(msgid="banana"), POEntry(msgid="Cherry")]
+        self.assertEqual(SortValidator()(entries, None), [2])
+
+    def test_casefold(self):
+        entries = [POEntry(msgid="Apple"), POEntry(msgid="banana"), POEntry(msgid="Cherry"), POEntry(msgid="cherry")]
+        self.assertEqual(SortValidator('casefold')(entries, None), [])
+        self.assertEqual(SortValidator('casefold')(entries, POEntry(msgid="apricot")), [0])
+
+    def test_unknown(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown collation unknown.'):
+            SortValidator('unknown')
+
+
+class TestFindMisplaced(unittest.TestCase):
+    """Test `find_misplaced` function."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _write(self, *msgids):
+        path = os.path.join(self.directory, 'messages.po')
+        with open(path, 'w') as pofile:
+            pofile.write('msgid ""\nmsgstr ""\n\n')
+            for msgid in msgids:
+                pofile.write('msgid "%s"\nmsgstr ""\n\n' % msgid)
+        return path
+
+    def test_sorted(self):
+        self.assertEqual(find_misplaced(self._write('A', 'B', 'C')), [])
+
+    def test_moved(self):
+        # Entry "D" was moved to the beginning, only it has to be moved back.
+        self.assertEqual(find_misplaced(self._write('D', 'A', 'B', 'C')), [4])
+        # Entries "X" and "Y" were inserted at the wrong place.
+        self.assertEqual(find_misplaced(self._write('A', 'X', 'Y', 'B', 'C')), [7, 10])
+
+    def test_collation(self):
+        path = self._write('a', 'b', 'C', 'd')
+        self.assertEqual(find_misplaced(path), [10])
+        self.assertEqual(find_misplaced(path, 'casefold'), [])
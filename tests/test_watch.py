@@ -0,0 +1,148 @@
+"""Test watch mode."""
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from docopt import docopt
+from mock import patch
+
+import polint
+from polint import Watcher, watch
+
+CONTENT = 'msgid "Source"\nmsgstr "Translation"\n'
+FUZZY = CONTENT + '\n#, fuzzy\nmsgid "Tree"\nmsgstr "Strom"\n'
+
+
+class TestWatcher(unittest.TestCase):
+    """Test `Watcher` class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self._write('cs.po', CONTENT)
+        self._write('locale/de.po', CONTENT)
+
+    def _path(self, path):
+        return os.path.join(self.directory, *path.split('/'))
+
+    def _write(self, path, content):
+        path = self._path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as pofile:
+            pofile.write(content)
+
+    def _touch_dir(self, path):
+        # Make sure the modification time changes regardless of the file system resolution.
+        os.utime(self._path(path), ns=(0, 0))
+
+    def test_first_poll(self):
+        watcher = Watcher([self.directory])
+        self.assertEqual(watcher.poll(), ([self._path('cs.po'), self._path('locale/de.po')], []))
+        self.assertEqual(watcher.poll(), ([], []))
+
+    def test_changed(self):
+        watcher = Watcher([self.directory])
+        watcher.poll()
+        self._write('locale/de.po', FUZZY)
+        self.assertEqual(watcher.poll(), ([self._path('locale/de.po')], []))
+
+    def test_added(self):
+        watcher = Watcher([self.directory])
+        watcher.poll()
+        self._write('locale/fr.po', CONTENT)
+        self._write('locale/new/it.po', CONTENT)
+        self._write('locale/ignored.txt', CONTENT)
+        self._touch_dir('locale')
+
+        with patch('polint._walk', wraps=polint._walk) as walk_mock:
+            self.assertEqual(watcher.poll(), ([self._path('locale/fr.po'), self._path('locale/new/it.po')], []))
+        # Only the changed directory is searched.
+        self.assertEqual(walk_mock.call_args_list[0][0][0], self._path('locale'))
+
+    def test_removed(self):
+        watcher = Watcher([self.directory])
+        watcher.poll()
+        os.remove(self._path('locale/de.po'))
+        self._touch_dir('locale')
+        self.assertEqual(watcher.poll(), ([], [self._path('locale/de.po')]))
+
+    def test_removed_directory(self):
+        watcher = Watcher([self.directory])
+        watcher.poll()
+        shutil.rmtree(self._path('locale'))
+        self._touch_dir('')
+        self.assertEqual(watcher.poll(), ([], [self._path('locale/de.po')]))
+
+    def test_unreadable(self):
+        watcher = Watcher([self.directory])
+        watcher.poll()
+        self._write('locale/fr.po', CONTENT)
+        self._touch_dir('locale')
+        scandir = os.scandir
+
+        def _scandir(path):
+            if path == self._path('locale'):
+                raise PermissionError(13, 'Permission denied', path)
+            return scandir(path)
+
+        # Files of the directory which can't be read are removed, the rest is still watched.
+        with patch('os.scandir', side_effect=_scandir):
+            self.assertEqual(watcher.poll(), ([], [self._path('locale/de.po')]))
+        self._write('cs.po', FUZZY)
+        self.assertEqual(watcher.poll(), ([self._path('cs.po')], []))
+
+    def test_explicit_file(self):
+        watcher = Watcher([self._path('cs.po')])
+        self.assertEqual(watcher.poll(), ([self._path('cs.po')], []))
+        os.remove(self._path('cs.po'))
+        self.assertEqual(watcher.poll(), ([], [self._path('cs.po')]))
+        self._write('cs.po', CONTENT)
+        self.assertEqual(watcher.poll(), ([self._path('cs.po')], []))
+
+
+class TestWatch(unittest.TestCase):
+    """Test `watch` function."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, 'cs.po')
+        with open(self.filename, 'w') as pofile:
+            pofile.write(FUZZY)
+
+    def test_watch(self):
+        changes = iter([FUZZY + '\n#, fuzzy\nmsgid "Zebra"\nmsgstr "Zebra"\n', '...'])
+
+        def _change(dummy):
+            with open(self.filename, 'w') as pofile:
+                pofile.write(next(changes))
+
+        output = StringIO()
+        error_output = StringIO()
+        options = docopt(polint.__doc__, ['--watch', self.directory, '--ignore', 'untranslated'])
+        with patch('polint.time.sleep', side_effect=_change):
+            watch(options, output=output, error_output=error_output, ticks=3)
+
+        self.assertEqual(output.getvalue(),
+                         '%(file)s:4: [fuzzy] translation is fuzzy\n%(file)s:8: [fuzzy] translation is fuzzy\n'
+                         % {'file': self.filename})
+        self.assertIn('Syntax error in po file', error_output.getvalue())
+
+    def test_watch_moved(self):
+        # Errors of entries which only moved aren't reported again.
+        changes = iter(['#. Comment\n' + FUZZY + '\n#, fuzzy\nmsgid "Zebra"\nmsgstr "Zebra"\n'])
+
+        def _change(dummy):
+            with open(self.filename, 'w') as pofile:
+                pofile.write(next(changes))
+
+        output = StringIO()
+        options = docopt(polint.__doc__, ['--watch', self.directory, '--ignore', 'untranslated'])
+        with patch('polint.time.sleep', side_effect=_change):
+            watch(options, output=output, error_output=StringIO(), ticks=2)
+
+        self.assertEqual(output.getvalue(),
+                         '%(file)s:4: [fuzzy] translation is fuzzy\n%(file)s:9: [fuzzy] translation is fuzzy\n'
+                         % {'file': self.filename})